@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'Paquetería Internacional',
-    'version': '19.0.1.0.0',
+    'version': '19.0.1.1.0',
     'category': 'Operations/Inventory',
     'summary': 'Sistema de envío de paquetes México-Cuba',
     'description': """
@@ -30,6 +30,9 @@
         'data/provincia_data.xml',
         'data/recepcion_sequence.xml',
         'data/envio_sequence.xml',
+        'data/tarifa_data.xml',
+        'data/regla_aduanal_data.xml',
+        'data/ir_cron_data.xml',
         
         # Vistas
         'views/fecha_envio_views.xml',
@@ -37,7 +40,18 @@
         'views/recepcion_views.xml',
         'views/envio_views.xml',
         'views/maleta_views.xml',
+        'views/maleta_viaje_views.xml',
         'views/provincia_views.xml',
+        'views/tarifa_views.xml',
+        'views/regla_aduanal_views.xml',
+        'views/envio_analisis_views.xml',
+        'views/cliente_views.xml',
+        'views/perfilado_views.xml',
+        
+        # Asistentes
+        'wizard/envio_importar_views.xml',
+        'wizard/recepcion_convertir_views.xml',
+        
         'views/menu.xml',
     ],
     'installable': True,
@@ -0,0 +1,4 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+from . import main
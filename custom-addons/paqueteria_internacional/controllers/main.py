@@ -0,0 +1,42 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Endpoints JSON de paquetería."""
+
+from odoo import http
+from odoo.http import request
+
+
+class PaqueteriaController(http.Controller):
+    """Endpoints usados por el mostrador para agilizar la captura."""
+
+    @http.route('/paqueteria/clientes/autocompletar', type='jsonrpc', auth='user')
+    def autocompletar_clientes(self, texto, limit=10):
+        """Sugiere remitentes del directorio mientras se escribe.
+
+        Args:
+            texto: Inicio del nombre o teléfono del remitente
+            limit: Cantidad máxima de sugerencias
+
+        Returns:
+            list: Remitentes con provincia habitual y destinatarios
+                frecuentes (ver paqueteria.cliente.autocompletar)
+        """
+        return request.env['paqueteria.cliente'].autocompletar(
+            texto, limit=min(int(limit), 50)
+        )
+
+    @http.route('/paqueteria/recepciones/lote', type='jsonrpc', auth='user')
+    def recibir_lote(self, recepciones):
+        """Registra en una sola llamada las recepciones capturadas sin conexión.
+
+        Args:
+            recepciones: Lista de recepciones con su clave de
+                idempotencia y fotos en base64 (ver
+                paqueteria.recepcion.recibir_lote)
+
+        Returns:
+            list: Clave, id, número REC y si fue creada en esta llamada,
+                en el mismo orden recibido
+        """
+        return request.env['paqueteria.recepcion'].recibir_lote(recepciones)
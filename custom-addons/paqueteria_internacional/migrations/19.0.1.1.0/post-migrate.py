@@ -0,0 +1,14 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Agrupa las distribuciones existentes en viajes de maletas."""
+
+from odoo import SUPERUSER_ID, api
+
+
+def migrate(cr, version):
+    """Asigna su viaje a las distribuciones creadas antes de los viajes."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['paqueteria.envio.maleta'].search(
+        [('viaje_id', '=', False)]
+    )._asignar_viajes()
@@ -2,7 +2,14 @@
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
 
 from . import constants
+from . import perfilado
+from . import ir_sequence
+from . import ir_attachment
 from . import provincia
+from . import vigencia_mixin
+from . import contacto_mixin
+from . import tarifa
+from . import regla_aduanal
 from . import articulo
 from . import recepcion
 from . import fecha_envio
@@ -10,3 +17,6 @@ from . import envio
 from . import envio_articulo
 from . import envio_maleta
 from . import maleta
+from . import maleta_viaje
+from . import cliente
+from . import envio_analisis
@@ -0,0 +1,474 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Directorio de clientes construido a partir de envíos y recepciones."""
+
+import logging
+import re
+from collections import defaultdict
+from datetime import timedelta
+
+from odoo import api, fields, models
+from odoo.tools import SQL, escape_psql, split_every
+from odoo.tools.sql import create_index
+from .normalizacion import normalizar_nombre, normalizar_telefono
+
+_logger = logging.getLogger(__name__)
+
+# Parámetro con la marca de tiempo de la última actualización del directorio
+PARAMETRO_ULTIMA_ACTUALIZACION = 'paqueteria.directorio.ultima_actualizacion'
+
+# Solapamiento con la actualización anterior (ver envio_analisis)
+MARGEN_ACTUALIZACION = timedelta(minutes=5)
+
+# Texto con forma de teléfono: dígitos y separadores habituales
+_ES_TELEFONO = re.compile(r'[\d\s+\-().]+')
+
+# Tablas de origen del directorio y condición de sus filas (alias ``t``).
+# Una recepción convertida en envío ya se cuenta por su envío
+TABLAS_ORIGEN = [
+    ('envio', 'paqueteria_envio', SQL('TRUE')),
+    ('recepcion', 'paqueteria_recepcion', SQL(
+        'NOT EXISTS (SELECT 1 FROM paqueteria_envio e WHERE e.recepcion_id = t.id)'
+    )),
+]
+
+# Claves de remitente que dejaron de usarse en algún registro
+TABLA_POR_ACTUALIZAR = 'paqueteria_cliente_por_actualizar'
+
+
+class PaqueteriaCliente(models.Model):
+    """Remitente frecuente identificado por nombre y teléfono normalizados.
+
+    El directorio no se captura a mano: se construye agregando los
+    envíos y recepciones existentes y un cron lo mantiene al día con
+    los registros modificados desde la última corrida. Los remitentes
+    renombrados o eliminados se anotan por trigger para recalcular
+    también la clave que dejaron, y desaparecen del directorio cuando
+    ya no les queda ningún registro. Permite autocompletar remitentes
+    con sus destinatarios habituales mediante búsquedas por prefijo
+    indexadas.
+    """
+
+    _name = 'paqueteria.cliente'
+    _description = 'Cliente (Remitente)'
+    _order = 'cantidad_envios desc, name'
+
+    name = fields.Char(
+        string='Nombre',
+        required=True,
+        help='Nombre del remitente tal como se capturó más recientemente'
+    )
+
+    telefono = fields.Char(
+        string='Teléfono',
+        help='Teléfono del remitente tal como se capturó más recientemente'
+    )
+
+    nombre_normalizado = fields.Char(
+        string='Nombre Normalizado',
+        required=True,
+        help='Nombre en minúsculas y sin acentos (parte de la clave)'
+    )
+
+    telefono_digitos = fields.Char(
+        string='Teléfono (Dígitos)',
+        required=True,
+        default='',
+        help='Teléfono solo con dígitos (parte de la clave)'
+    )
+
+    provincia_id = fields.Many2one(
+        'paqueteria.provincia',
+        string='Provincia Habitual',
+        ondelete='set null',
+        help='Provincia de destino más frecuente del remitente'
+    )
+
+    cantidad_envios = fields.Integer(
+        string='Envíos',
+        help='Cantidad de envíos registrados para el remitente'
+    )
+
+    ultima_actividad = fields.Datetime(
+        string='Última Actividad',
+        help='Última vez que se registró o modificó un envío o recepción '
+             'del remitente'
+    )
+
+    destinatario_ids = fields.One2many(
+        'paqueteria.cliente.destinatario',
+        'cliente_id',
+        string='Destinatarios Habituales',
+        help='Personas a las que envía el remitente, de la más frecuente '
+             'a la menos frecuente'
+    )
+
+    _sql_constraints = [
+        (
+            'cliente_clave_unique',
+            'UNIQUE(nombre_normalizado, telefono_digitos)',
+            'Ya existe un cliente con ese nombre y teléfono',
+        ),
+    ]
+
+    def init(self):
+        """Crea los índices de prefijo y los triggers de claves abandonadas.
+
+        Al modificar el remitente de un envío o recepción, o al
+        eliminarlo, un trigger por sentencia anota la clave anterior en
+        paqueteria_cliente_por_actualizar para que el cron la recalcule
+        aunque ya ningún registro modificado la tenga.
+        """
+        for campo in ('nombre_normalizado', 'telefono_digitos'):
+            create_index(
+                self.env.cr,
+                '%s_%s_prefijo_index' % (self._table, campo),
+                self._table,
+                ['%s text_pattern_ops' % campo],
+            )
+
+        self.env.cr.execute(SQL(
+            """
+            CREATE TABLE IF NOT EXISTS %(por_actualizar)s (
+                nombre VARCHAR NOT NULL,
+                telefono VARCHAR NOT NULL,
+                PRIMARY KEY (nombre, telefono)
+            );
+
+            CREATE OR REPLACE FUNCTION paqueteria_cliente_anotar()
+            RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'UPDATE' THEN
+                    INSERT INTO %(por_actualizar)s (nombre, telefono)
+                    SELECT DISTINCT a.remitente_nombre_normalizado,
+                           COALESCE(a.remitente_telefono_digitos, '')
+                      FROM anteriores a
+                      JOIN nuevas n ON n.id = a.id
+                     WHERE a.remitente_nombre_normalizado <> ''
+                       AND (n.remitente_nombre_normalizado
+                                IS DISTINCT FROM a.remitente_nombre_normalizado
+                            OR COALESCE(n.remitente_telefono_digitos, '')
+                                <> COALESCE(a.remitente_telefono_digitos, ''))
+                    ON CONFLICT DO NOTHING;
+                ELSE
+                    INSERT INTO %(por_actualizar)s (nombre, telefono)
+                    SELECT DISTINCT remitente_nombre_normalizado,
+                           COALESCE(remitente_telefono_digitos, '')
+                      FROM anteriores
+                     WHERE remitente_nombre_normalizado <> ''
+                    ON CONFLICT DO NOTHING;
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+            """,
+            por_actualizar=SQL.identifier(TABLA_POR_ACTUALIZAR),
+        ))
+        for _origen, tabla, _condicion in TABLAS_ORIGEN:
+            self.env.cr.execute(SQL(
+                """
+                DROP TRIGGER IF EXISTS %(update)s ON %(tabla)s;
+                DROP TRIGGER IF EXISTS %(delete)s ON %(tabla)s;
+                CREATE TRIGGER %(update)s
+                    AFTER UPDATE ON %(tabla)s
+                    REFERENCING OLD TABLE AS anteriores NEW TABLE AS nuevas
+                    FOR EACH STATEMENT
+                    EXECUTE FUNCTION paqueteria_cliente_anotar();
+                CREATE TRIGGER %(delete)s
+                    AFTER DELETE ON %(tabla)s
+                    REFERENCING OLD TABLE AS anteriores
+                    FOR EACH STATEMENT
+                    EXECUTE FUNCTION paqueteria_cliente_anotar();
+                """,
+                tabla=SQL.identifier(tabla),
+                update=SQL.identifier('%s_cliente_anotar_update' % tabla),
+                delete=SQL.identifier('%s_cliente_anotar_delete' % tabla),
+            ))
+
+    # ========== AUTOCOMPLETADO ==========
+
+    @api.model
+    def autocompletar(self, texto, limit=10, limite_destinatarios=3):
+        """Busca remitentes cuyo nombre o teléfono empieza por el texto.
+
+        Si el texto es un teléfono (solo dígitos y separadores) busca
+        por prefijo de teléfono; si no, por prefijo de nombre sin
+        acentos ni mayúsculas. Usa dos consultas indexadas: clientes y
+        sus destinatarios.
+
+        Args:
+            texto: Lo escrito por el usuario
+            limit: Cantidad máxima de remitentes
+            limite_destinatarios: Destinatarios habituales por remitente
+
+        Returns:
+            list: Diccionarios con el remitente, su provincia habitual y
+                sus destinatarios más frecuentes
+        """
+        nombre = normalizar_nombre(texto)
+        digitos = normalizar_telefono(texto)
+        if digitos and _ES_TELEFONO.fullmatch(texto):
+            dominio = [('telefono_digitos', '=like', escape_psql(digitos) + '%')]
+        elif len(nombre) >= 2:
+            dominio = [('nombre_normalizado', '=like', escape_psql(nombre) + '%')]
+        else:
+            return []
+
+        clientes = self.search_fetch(
+            dominio, ['name', 'telefono', 'provincia_id', 'cantidad_envios'],
+            limit=limit,
+        )
+        destinatarios = defaultdict(list)
+        for destinatario in self.env['paqueteria.cliente.destinatario'].search_fetch(
+            [('cliente_id', 'in', clientes.ids)],
+            ['cliente_id', 'name', 'telefono', 'provincia_id'],
+        ):
+            if len(destinatarios[destinatario.cliente_id.id]) < limite_destinatarios:
+                destinatarios[destinatario.cliente_id.id].append({
+                    'nombre': destinatario.name,
+                    'telefono': destinatario.telefono or '',
+                    'provincia_id': destinatario.provincia_id.id,
+                    'provincia': destinatario.provincia_id.name or '',
+                })
+
+        return [
+            {
+                'id': cliente.id,
+                'nombre': cliente.name,
+                'telefono': cliente.telefono or '',
+                'provincia_id': cliente.provincia_id.id,
+                'provincia': cliente.provincia_id.name or '',
+                'cantidad_envios': cliente.cantidad_envios,
+                'destinatarios': destinatarios[cliente.id],
+            }
+            for cliente in clientes
+        ]
+
+    # ========== CONSTRUCCIÓN DEL DIRECTORIO ==========
+
+    @api.model
+    def _cron_actualizar_directorio(self, tamano_lote=1000):
+        """Incorpora al directorio los envíos y recepciones modificados.
+
+        La primera corrida (sin marca de tiempo previa) recorre todo el
+        historial y los clientes ya guardados; las siguientes solo los
+        remitentes con registros modificados desde la corrida anterior,
+        que encuentra por los índices de write_date, y las claves que
+        los triggers anotaron al renombrar o eliminar remitentes.
+
+        Args:
+            tamano_lote: Remitentes agregados por consulta
+
+        Returns:
+            int: Cantidad de remitentes actualizados
+        """
+        self.check_access('write')
+        parametros = self.env['ir.config_parameter'].sudo()
+        valor = parametros.get_param(PARAMETRO_ULTIMA_ACTUALIZACION)
+        self.env.cr.execute(SQL("SELECT now() AT TIME ZONE 'UTC'"))
+        marca = self.env.cr.fetchone()[0]
+
+        for modelo in ('paqueteria.envio', 'paqueteria.recepcion'):
+            self.env[modelo].flush_model()
+
+        if valor:
+            desde = fields.Datetime.to_datetime(valor) - MARGEN_ACTUALIZACION
+            filtro = SQL('write_date >= %s', desde)
+        else:
+            filtro = SQL('TRUE')
+
+        # Solo se consumen las claves anotadas visibles; las que anote
+        # una transacción concurrente quedan para la siguiente corrida
+        self.env.cr.execute(SQL(
+            'DELETE FROM %s RETURNING nombre, telefono',
+            SQL.identifier(TABLA_POR_ACTUALIZAR),
+        ))
+        claves = set(self.env.cr.fetchall())
+        if not valor:
+            self.env.cr.execute(SQL(
+                'SELECT nombre_normalizado, telefono_digitos FROM paqueteria_cliente'
+            ))
+            claves.update(self.env.cr.fetchall())
+        self.env.cr.execute(SQL(' UNION ').join(
+            SQL(
+                "SELECT DISTINCT remitente_nombre_normalizado, "
+                "COALESCE(remitente_telefono_digitos, '') "
+                "FROM %s WHERE %s AND remitente_nombre_normalizado <> ''",
+                SQL.identifier(tabla), filtro,
+            )
+            for _origen, tabla, _condicion in TABLAS_ORIGEN
+        ))
+        claves.update(self.env.cr.fetchall())
+        claves = sorted(claves)
+
+        for lote in split_every(tamano_lote, claves, list):
+            self._agregar_remitentes(lote)
+
+        parametros.set_param(
+            PARAMETRO_ULTIMA_ACTUALIZACION, fields.Datetime.to_string(marca)
+        )
+        self.invalidate_model()
+        self.env['paqueteria.cliente.destinatario'].invalidate_model()
+        _logger.info('Directorio de clientes: %s remitentes actualizados', len(claves))
+        return len(claves)
+
+    @api.model
+    def _agregar_remitentes(self, claves):
+        """Recalcula desde el historial los remitentes indicados.
+
+        Los remitentes sin ningún envío o recepción con su clave se
+        eliminan del directorio junto con sus destinatarios.
+
+        Args:
+            claves: Lista de (nombre_normalizado, telefono_digitos)
+        """
+        claves_sql = SQL(
+            '(VALUES %s) AS claves(nombre, telefono)',
+            SQL(', ').join(SQL('(%s, %s)', *clave) for clave in claves),
+        )
+        fuentes = SQL(' UNION ALL ').join(
+            SQL(
+                """
+                SELECT %(origen)s AS origen,
+                       t.remitente_nombre, t.remitente_nombre_normalizado AS r_nombre,
+                       t.remitente_telefono,
+                       COALESCE(t.remitente_telefono_digitos, '') AS r_telefono,
+                       t.destinatario_nombre,
+                       t.destinatario_nombre_normalizado AS d_nombre,
+                       t.destinatario_telefono,
+                       COALESCE(t.destinatario_telefono_digitos, '') AS d_telefono,
+                       t.provincia_id, t.write_date
+                  FROM %(tabla)s t
+                  JOIN %(claves)s
+                    ON claves.nombre = t.remitente_nombre_normalizado
+                   AND claves.telefono = COALESCE(t.remitente_telefono_digitos, '')
+                 WHERE %(condicion)s
+                """,
+                origen=origen,
+                tabla=SQL.identifier(tabla),
+                claves=claves_sql,
+                condicion=condicion,
+            )
+            for origen, tabla, condicion in TABLAS_ORIGEN
+        )
+
+        self.env.cr.execute(SQL(
+            """
+            WITH fuentes AS (%(fuentes)s)
+            INSERT INTO paqueteria_cliente
+                   (name, telefono, nombre_normalizado, telefono_digitos,
+                    provincia_id, cantidad_envios, ultima_actividad,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT (array_agg(remitente_nombre ORDER BY write_date DESC))[1],
+                   (array_agg(remitente_telefono ORDER BY write_date DESC))[1],
+                   r_nombre, r_telefono,
+                   mode() WITHIN GROUP (ORDER BY provincia_id),
+                   COUNT(*) FILTER (WHERE origen = 'envio'),
+                   MAX(write_date),
+                   %(uid)s, now() AT TIME ZONE 'UTC',
+                   %(uid)s, now() AT TIME ZONE 'UTC'
+              FROM fuentes
+             GROUP BY r_nombre, r_telefono
+            ON CONFLICT (nombre_normalizado, telefono_digitos) DO UPDATE
+               SET name = EXCLUDED.name,
+                   telefono = EXCLUDED.telefono,
+                   provincia_id = EXCLUDED.provincia_id,
+                   cantidad_envios = EXCLUDED.cantidad_envios,
+                   ultima_actividad = EXCLUDED.ultima_actividad,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+            RETURNING id
+            """,
+            fuentes=fuentes,
+            uid=self.env.uid,
+        ))
+        cliente_ids = [fila[0] for fila in self.env.cr.fetchall()]
+
+        self.env.cr.execute(SQL(
+            """
+            DELETE FROM paqueteria_cliente c
+             USING %(claves)s
+             WHERE c.nombre_normalizado = claves.nombre
+               AND c.telefono_digitos = claves.telefono
+               AND c.id <> ALL(%(ids)s);
+
+            DELETE FROM paqueteria_cliente_destinatario
+             WHERE cliente_id = ANY(%(ids)s);
+
+            WITH fuentes AS (%(fuentes)s)
+            INSERT INTO paqueteria_cliente_destinatario
+                   (cliente_id, name, telefono, nombre_normalizado,
+                    telefono_digitos, provincia_id, cantidad,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT c.id,
+                   (array_agg(f.destinatario_nombre ORDER BY f.write_date DESC))[1],
+                   (array_agg(f.destinatario_telefono ORDER BY f.write_date DESC))[1],
+                   f.d_nombre, f.d_telefono,
+                   mode() WITHIN GROUP (ORDER BY f.provincia_id),
+                   COUNT(*),
+                   %(uid)s, now() AT TIME ZONE 'UTC',
+                   %(uid)s, now() AT TIME ZONE 'UTC'
+              FROM fuentes f
+              JOIN paqueteria_cliente c
+                ON c.nombre_normalizado = f.r_nombre
+               AND c.telefono_digitos = f.r_telefono
+             WHERE f.d_nombre <> ''
+             GROUP BY c.id, f.d_nombre, f.d_telefono
+            """,
+            claves=claves_sql,
+            ids=cliente_ids,
+            fuentes=fuentes,
+            uid=self.env.uid,
+        ))
+
+
+class PaqueteriaClienteDestinatario(models.Model):
+    """Destinatario habitual de un remitente del directorio."""
+
+    _name = 'paqueteria.cliente.destinatario'
+    _description = 'Destinatario Habitual'
+    _order = 'cliente_id, cantidad desc, name'
+
+    cliente_id = fields.Many2one(
+        'paqueteria.cliente',
+        string='Remitente',
+        required=True,
+        index=True,
+        ondelete='cascade',
+        help='Remitente que envía a este destinatario'
+    )
+
+    name = fields.Char(
+        string='Nombre',
+        required=True,
+        help='Nombre del destinatario tal como se capturó más recientemente'
+    )
+
+    telefono = fields.Char(
+        string='Teléfono',
+        help='Teléfono del destinatario en Cuba'
+    )
+
+    nombre_normalizado = fields.Char(
+        string='Nombre Normalizado',
+        help='Nombre en minúsculas y sin acentos'
+    )
+
+    telefono_digitos = fields.Char(
+        string='Teléfono (Dígitos)',
+        help='Teléfono solo con dígitos'
+    )
+
+    provincia_id = fields.Many2one(
+        'paqueteria.provincia',
+        string='Provincia',
+        ondelete='set null',
+        help='Provincia de destino más frecuente del destinatario'
+    )
+
+    cantidad = fields.Integer(
+        string='Veces',
+        help='Cantidad de envíos y recepciones del remitente a este '
+             'destinatario. Una recepción convertida en envío cuenta una vez'
+    )
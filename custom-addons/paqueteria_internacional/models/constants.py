@@ -51,6 +51,12 @@ TIPOS_CLIENTE = [
     ('vip', 'VIP'),
 ]
 
+# Zonas tarifarias de destino en Cuba
+ZONAS_TARIFA = [
+    ('habana', 'La Habana'),
+    ('resto', 'Resto de Cuba'),
+]
+
 # Formas de pago
 FORMAS_PAGO = [
     ('efectivo', 'Efectivo'),
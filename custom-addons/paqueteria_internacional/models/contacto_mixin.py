@@ -0,0 +1,259 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Búsqueda aproximada de remitentes y destinatarios."""
+
+from odoo import api, fields, models
+from odoo.tools import SQL, escape_psql
+from odoo.tools.sql import create_index, drop_index
+from .normalizacion import normalizar_nombre, normalizar_telefono
+
+# Operador de similitud de pg_trgm; se pasa como fragmento SQL sin
+# parámetros para que el signo % no se confunda con un marcador
+OPERADOR_SIMILITUD = SQL('%%')
+
+# Columnas normalizadas con índice de trigramas
+CAMPOS_CONTACTO_NORMALIZADOS = [
+    'remitente_nombre_normalizado',
+    'destinatario_nombre_normalizado',
+    'remitente_telefono_digitos',
+    'destinatario_telefono_digitos',
+]
+
+# Columnas originales con índice B-tree del ORM (index=True)
+CAMPOS_CONTACTO_ORIGINALES = ['remitente_nombre', 'destinatario_nombre']
+
+
+class PaqueteriaContactoMixin(models.AbstractModel):
+    """Remitente y destinatario normalizados para búsquedas rápidas.
+
+    Lo comparten envíos y recepciones. Guarda los nombres sin acentos
+    ni mayúsculas y los teléfonos solo con dígitos, con índices de
+    trigramas (pg_trgm), y ofrece una búsqueda ordenada por similitud.
+    Requiere que el modelo defina remitente_nombre, remitente_telefono,
+    destinatario_nombre y destinatario_telefono.
+    """
+
+    _name = 'paqueteria.contacto.mixin'
+    _description = 'Contacto Normalizado para Búsquedas'
+
+    remitente_nombre_normalizado = fields.Char(
+        string='Remitente (Normalizado)',
+        compute='_compute_contacto_normalizado',
+        store=True,
+        help='Nombre del remitente en minúsculas y sin acentos'
+    )
+
+    destinatario_nombre_normalizado = fields.Char(
+        string='Destinatario (Normalizado)',
+        compute='_compute_contacto_normalizado',
+        store=True,
+        help='Nombre del destinatario en minúsculas y sin acentos'
+    )
+
+    remitente_telefono_digitos = fields.Char(
+        string='Teléfono Remitente (Dígitos)',
+        compute='_compute_contacto_normalizado',
+        store=True,
+        help='Teléfono del remitente solo con dígitos'
+    )
+
+    destinatario_telefono_digitos = fields.Char(
+        string='Teléfono Destinatario (Dígitos)',
+        compute='_compute_contacto_normalizado',
+        store=True,
+        help='Teléfono del destinatario solo con dígitos'
+    )
+
+    contacto_busqueda = fields.Char(
+        string='Remitente o Destinatario',
+        compute='_compute_contacto_busqueda',
+        search='_search_contacto_busqueda',
+        help='Busca por nombre (sin importar acentos ni mayúsculas, '
+             'tolerando errores de escritura) o por teléfono'
+    )
+
+    def init(self):
+        """Crea los índices de trigramas de las columnas normalizadas.
+
+        Los nombres originales solo conservan su índice B-tree: una
+        versión anterior les puso índices de trigramas que duplicaban
+        los de las columnas normalizadas, y como tienen el mismo nombre
+        que el B-tree el ORM no los reemplaza al actualizar.
+        """
+        super().init()
+        # El registro también inicializa el mixin abstracto, que no tiene tabla
+        if self._abstract:
+            return
+        self._restaurar_indices_originales()
+        if not self.env.registry.has_trigram:
+            return
+        for campo in CAMPOS_CONTACTO_NORMALIZADOS:
+            create_index(
+                self.env.cr,
+                '%s_%s_trgm_index' % (self._table, campo),
+                self._table,
+                ['%s gin_trgm_ops' % campo],
+                method='gin',
+            )
+
+    def _restaurar_indices_originales(self):
+        """Cambia por B-tree los índices GIN que quedaron en los nombres."""
+        cr = self.env.cr
+        for campo in CAMPOS_CONTACTO_ORIGINALES:
+            indice = '%s__%s_index' % (self._table, campo)
+            cr.execute(SQL(
+                """
+                SELECT 1 FROM pg_indexes
+                 WHERE tablename = %s AND indexname = %s
+                   AND indexdef ILIKE %s
+                """,
+                self._table, indice, '% USING gin %',
+            ))
+            if cr.rowcount:
+                drop_index(cr, indice, self._table)
+                create_index(cr, indice, self._table, [campo])
+
+    # ========== COMPUTED METHODS ==========
+
+    @api.depends(
+        'remitente_nombre', 'destinatario_nombre',
+        'remitente_telefono', 'destinatario_telefono',
+    )
+    def _compute_contacto_normalizado(self):
+        """Normaliza nombres y teléfonos del remitente y destinatario."""
+        for record in self:
+            record.remitente_nombre_normalizado = normalizar_nombre(
+                record.remitente_nombre
+            )
+            record.destinatario_nombre_normalizado = normalizar_nombre(
+                record.destinatario_nombre
+            )
+            record.remitente_telefono_digitos = normalizar_telefono(
+                record.remitente_telefono
+            )
+            record.destinatario_telefono_digitos = normalizar_telefono(
+                record.destinatario_telefono
+            )
+
+    def _compute_contacto_busqueda(self):
+        """Campo solo de búsqueda: no tiene valor propio."""
+        self.contacto_busqueda = False
+
+    def _search_contacto_busqueda(self, operator, value):
+        """Permite usar la búsqueda aproximada desde las vistas.
+
+        Devuelve la búsqueda como subconsulta, sin materializar los ids
+        que coinciden, para que un texto corto sobre una tabla grande no
+        se convierta en una lista IN enorme.
+        """
+        if operator not in ('ilike', '=') or not isinstance(value, str):
+            return NotImplemented
+        query = self._search([])
+        busqueda = self._sql_contacto(value, query.table)
+        if busqueda is None:
+            return [('id', 'in', [])]
+        query.add_where(busqueda[0])
+        return [('id', 'in', query)]
+
+    # ========== BÚSQUEDA ==========
+
+    @api.model
+    def buscar_contacto(self, texto, limit=20):
+        """Busca por remitente o destinatario, ordenando por similitud.
+
+        Los nombres se comparan sin acentos ni mayúsculas y toleran
+        errores de escritura; si el texto tiene dígitos se comparan
+        también con los teléfonos.
+
+        Args:
+            texto: Nombre o teléfono a buscar
+            limit: Cantidad máxima de resultados
+
+        Returns:
+            Recordset con los registros más parecidos primero
+        """
+        ids = self._buscar_contacto_ids(texto, limit=limit)
+        permitidos = set(self.search([('id', 'in', ids)]).ids)
+        return self.browse([id_ for id_ in ids if id_ in permitidos])
+
+    @api.model
+    def _buscar_contacto_ids(self, texto, limit=20):
+        """Ejecuta la búsqueda aproximada y devuelve ids por relevancia."""
+        busqueda = self._sql_contacto(texto, self._table)
+        if busqueda is None:
+            return []
+
+        condicion, puntaje = busqueda
+        self.env.cr.execute(SQL(
+            """
+            SELECT id
+              FROM %(tabla)s
+             WHERE %(condicion)s
+             ORDER BY %(puntaje)s DESC, id DESC
+             %(limite)s
+            """,
+            tabla=SQL.identifier(self._table),
+            condicion=condicion,
+            puntaje=puntaje,
+            limite=SQL('LIMIT %s', limit) if limit else SQL(),
+        ))
+        return [fila[0] for fila in self.env.cr.fetchall()]
+
+    @api.model
+    def _sql_contacto(self, texto, tabla):
+        """Arma la condición y el puntaje de la búsqueda aproximada.
+
+        Args:
+            texto: Nombre o teléfono a buscar
+            tabla: Alias de la tabla del modelo en la consulta
+
+        Returns:
+            tuple: (condición, puntaje) como SQL, o None si el texto no
+                tiene nada que buscar
+        """
+        nombre = normalizar_nombre(texto)
+        digitos = normalizar_telefono(texto)
+        if not nombre:
+            return None
+
+        self.flush_model(CAMPOS_CONTACTO_NORMALIZADOS)
+        columna = {
+            campo: SQL.identifier(tabla, campo)
+            for campo in CAMPOS_CONTACTO_NORMALIZADOS
+        }
+        remitente = columna['remitente_nombre_normalizado']
+        destinatario = columna['destinatario_nombre_normalizado']
+        patron = '%%%s%%' % escape_psql(nombre)
+        condiciones = [
+            SQL('%s LIKE %s', remitente, patron),
+            SQL('%s LIKE %s', destinatario, patron),
+        ]
+        puntaje = [SQL('0')]
+        if self.env.registry.has_trigram:
+            condiciones += [
+                SQL('%s %s %s', remitente, OPERADOR_SIMILITUD, nombre),
+                SQL('%s %s %s', destinatario, OPERADOR_SIMILITUD, nombre),
+            ]
+            puntaje += [
+                SQL('similarity(%s, %s)', remitente, nombre),
+                SQL('similarity(%s, %s)', destinatario, nombre),
+            ]
+        if len(digitos) >= 3:
+            telefono_remitente = columna['remitente_telefono_digitos']
+            telefono_destinatario = columna['destinatario_telefono_digitos']
+            patron_digitos = '%%%s%%' % digitos
+            condiciones += [
+                SQL('%s LIKE %s', telefono_remitente, patron_digitos),
+                SQL('%s LIKE %s', telefono_destinatario, patron_digitos),
+            ]
+            puntaje.append(SQL(
+                "CASE WHEN %s LIKE %s OR %s LIKE %s THEN 1 ELSE 0 END",
+                telefono_remitente, patron_digitos,
+                telefono_destinatario, patron_digitos,
+            ))
+
+        return (
+            SQL('(%s)', SQL(' OR ').join(condiciones)),
+            SQL('GREATEST(%s)', SQL(', ').join(puntaje)),
+        )
@@ -0,0 +1,71 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Motor de empaque de envíos en maletas por capacidad de peso.
+
+Funciones puras, sin acceso al ORM: reciben pesos y capacidades y
+devuelven la asignación. Los pesos se manejan internamente en
+centésimas de libra para evitar errores de redondeo al dividir envíos.
+"""
+
+
+def empacar(pendientes, capacidades):
+    """Distribuye pesos pendientes en maletas (first-fit decreasing).
+
+    Los envíos se procesan del más pesado al más liviano. Cada envío va
+    completo a la primera maleta donde cabe; si no cabe entero en
+    ninguna, se divide llenando las maletas con espacio en su orden.
+
+    Args:
+        pendientes: Iterable de (envio_id, peso) con el peso por asignar
+        capacidades: Iterable de (maleta_id, capacidad_libre) en el
+            orden en que se deben llenar las maletas
+
+    Returns:
+        tuple: (lineas, sin_asignar) donde lineas es una lista de
+            (envio_id, maleta_id, peso) y sin_asignar un dict
+            envio_id → peso que no cupo en ninguna maleta
+    """
+    maletas = [
+        [maleta_id, _a_centesimas(capacidad)]
+        for maleta_id, capacidad in capacidades
+        if _a_centesimas(capacidad) > 0
+    ]
+    envios = sorted(
+        (
+            (_a_centesimas(peso), envio_id)
+            for envio_id, peso in pendientes
+            if _a_centesimas(peso) > 0
+        ),
+        key=lambda envio: envio[0],
+        reverse=True,
+    )
+
+    lineas = []
+    sin_asignar = {}
+    for peso, envio_id in envios:
+        maleta = next((m for m in maletas if m[1] >= peso), None)
+        if maleta:
+            maleta[1] -= peso
+            lineas.append((envio_id, maleta[0], peso / 100.0))
+            continue
+
+        # No cabe entero: dividir entre las maletas con espacio
+        for maleta in maletas:
+            if not peso:
+                break
+            parte = min(peso, maleta[1])
+            if parte:
+                maleta[1] -= parte
+                peso -= parte
+                lineas.append((envio_id, maleta[0], parte / 100.0))
+        if peso:
+            sin_asignar[envio_id] = peso / 100.0
+        maletas = [maleta for maleta in maletas if maleta[1]]
+
+    return lineas, sin_asignar
+
+
+def _a_centesimas(peso):
+    """Convierte libras a centésimas de libra enteras."""
+    return int(round((peso or 0.0) * 100))
@@ -5,10 +5,17 @@
 
 import logging
 import math
+import time
+from contextlib import contextmanager
+
+import psycopg2
 
 from odoo import _, api, fields, models
-from odoo.exceptions import ValidationError
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools import split_every
+from odoo.tools.sql import create_index, drop_index
 from .constants import ESTADOS_MEXICO, FORMAS_PAGO, TIPOS_CLIENTE
+from .perfilado import perfilar
 
 _logger = logging.getLogger(__name__)
 
@@ -20,12 +27,13 @@ class PaqueteriaEnvio(models.Model):
     la distribución en maletas. Calcula automáticamente:
     - Peso a cobrar (máximo entre peso etiqueta y volumétrico)
     - Embalaje ($50 por cada 10 lb o fracción)
-    - Tarifas dinámicas según tipo de cliente y provincia
+    - Tarifas configurables según tipo de cliente y zona de destino
     - Impuestos aduanales de artículos
     - Total a cobrar consolidado
     """
     
     _name = 'paqueteria.envio'
+    _inherit = 'paqueteria.contacto.mixin'
     _description = 'Envío de Paquete'
     _order = 'fecha_envio_id desc, name desc'
     
@@ -44,7 +52,19 @@ class PaqueteriaEnvio(models.Model):
     recepcion_importar_id = fields.Many2one(
         'paqueteria.recepcion',
         string='Importar desde Recepción',
-        help='Selecciona una recepción para copiar sus datos automáticamente'
+        domain=[('enviada', '=', False)],
+        help='Selecciona una recepción para copiar sus datos automáticamente. '
+             'Solo se ofrecen las que aún no tienen envío'
+    )
+    
+    recepcion_id = fields.Many2one(
+        'paqueteria.recepcion',
+        string='Recepción de Origen',
+        readonly=True,
+        copy=False,
+        ondelete='restrict',
+        help='Recepción a partir de la cual se creó este envío. Una '
+             'recepción solo puede convertirse en un envío'
     )
     
     # ========== REMITENTE (MÉXICO) ==========
@@ -66,7 +86,7 @@ class PaqueteriaEnvio(models.Model):
         string='Tipo de Cliente',
         required=True,
         default='normal',
-        help='VIP tiene tarifa preferencial: La Habana $140/lb, Resto $170/lb'
+        help='VIP tiene tarifa preferencial (ver Configuración → Tarifas)'
     )
     
     # ========== DESTINATARIO (CUBA) ==========
@@ -195,13 +215,15 @@ class PaqueteriaEnvio(models.Model):
     
     maleta_count = fields.Integer(
         string='Maletas',
-        compute='_compute_maleta_count',
+        compute='_compute_peso_distribuido',
+        store=True,
         help='Cantidad de maletas en las que se distribuyó este envío'
     )
     
     peso_distribuido = fields.Float(
         string='Peso Distribuido (lb)',
         compute='_compute_peso_distribuido',
+        store=True,
         digits=(10, 2),
         help='Suma de pesos ya distribuidos en maletas'
     )
@@ -209,8 +231,10 @@ class PaqueteriaEnvio(models.Model):
     peso_pendiente = fields.Float(
         string='Peso Pendiente (lb)',
         compute='_compute_peso_distribuido',
+        store=True,
         digits=(10, 2),
-        help='Peso que aún falta por distribuir en maletas'
+        help='Peso que aún falta por distribuir en maletas. Los envíos '
+             'con peso pendiente forman la cola de empaque de su fecha'
     )
     
     # ========== CONTROL ==========
@@ -238,9 +262,38 @@ class PaqueteriaEnvio(models.Model):
         help='Fecha de envío programada para este paquete'
     )
     
+    def init(self):
+        """Crea los índices de la cola de empaque y de los cambios recientes."""
+        super().init()
+        # recepcion_id ya queda indexada por su restricción UNIQUE
+        drop_index(self.env.cr, 'paqueteria_envio__recepcion_id_index', self._table)
+        create_index(
+            self.env.cr,
+            'paqueteria_envio_pendiente_empacar_index',
+            self._table,
+            ['fecha_envio_id', 'peso_pendiente'],
+            where='peso_pendiente > 0',
+        )
+        # Los crons incrementales buscan los envíos modificados recientemente
+        create_index(
+            self.env.cr,
+            'paqueteria_envio_write_date_index',
+            self._table,
+            ['write_date'],
+        )
+    
+    _sql_constraints = [
+        (
+            'recepcion_id_unique',
+            'UNIQUE(recepcion_id)',
+            'Esta recepción ya fue convertida en un envío',
+        ),
+    ]
+    
     # ========== MÉTODOS COMPUTADOS ==========
     
     @api.depends('peso_etiqueta', 'peso_volumen')
+    @perfilar
     def _compute_peso_cobrar(self):
         """Calcula el peso a cobrar como el máximo entre pesos.
         
@@ -256,20 +309,34 @@ class PaqueteriaEnvio(models.Model):
                 record.peso_volumen or 0
             )
 
-    @api.depends('maleta_distribucion_ids.peso_en_maleta')
-    def _compute_maleta_count(self):
-        """Cuenta en cuántas maletas está distribuido el envío."""
-        for record in self:
-            record.maleta_count = len(record.maleta_distribucion_ids)
-    
     @api.depends('maleta_distribucion_ids.peso_en_maleta', 'peso_cobrar')
+    @perfilar
     def _compute_peso_distribuido(self):
-        """Calcula peso distribuido y peso pendiente por distribuir."""
-        for record in self:
-            record.peso_distribuido = sum(
-                record.maleta_distribucion_ids.mapped('peso_en_maleta')
+        """Calcula maletas, peso distribuido y peso pendiente por distribuir.
+        
+        Los envíos guardados se resuelven con una sola consulta agrupada
+        sobre las distribuciones, para todo el lote a recalcular. Los
+        envíos en edición (formulario) suman sus líneas en memoria.
+        """
+        guardados = self.filtered('id')
+        distribucion = {
+            envio.id: (cantidad, peso)
+            for envio, cantidad, peso in self.env['paqueteria.envio.maleta']._read_group(
+                [('envio_id', 'in', guardados.ids)],
+                ['envio_id'],
+                ['__count', 'peso_en_maleta:sum'],
             )
-            record.peso_pendiente = record.peso_cobrar - record.peso_distribuido
+        } if guardados else {}
+        
+        for record in self:
+            if record.id:
+                cantidad, peso = distribucion.get(record.id, (0, 0.0))
+            else:
+                lineas = record.maleta_distribucion_ids
+                cantidad, peso = len(lineas), sum(lineas.mapped('peso_en_maleta'))
+            record.maleta_count = cantidad
+            record.peso_distribuido = peso
+            record.peso_pendiente = record.peso_cobrar - peso
     
     @api.onchange('recepcion_importar_id')
     def _onchange_recepcion_importar(self):
@@ -284,20 +351,36 @@ class PaqueteriaEnvio(models.Model):
         if self.recepcion_importar_id:
             recepcion = self.recepcion_importar_id
             
-            # Copiar todos los datos
-            self.remitente_nombre = recepcion.remitente_nombre
-            self.remitente_telefono = recepcion.remitente_telefono
-            self.destinatario_nombre = recepcion.destinatario_nombre
-            self.destinatario_telefono = recepcion.destinatario_telefono
-            self.provincia_id = recepcion.provincia_id.id
-            self.peso_etiqueta = recepcion.peso_etiqueta
-            self.admin_id = recepcion.admin_id.id
-            self.estado_mexico = recepcion.estado_mexico
+            # Copiar todos los datos y recordar la recepción de origen
+            self.update(self._valores_desde_recepcion(recepcion))
             
             # Limpiar el campo auxiliar
             self.recepcion_importar_id = False
     
+    @api.model
+    def _valores_desde_recepcion(self, recepcion):
+        """Valores de envío copiados de una recepción.
+        
+        Args:
+            recepcion: Registro de paqueteria.recepcion
+        
+        Returns:
+            dict: Valores para crear o actualizar el envío
+        """
+        return {
+            'recepcion_id': recepcion.id,
+            'remitente_nombre': recepcion.remitente_nombre,
+            'remitente_telefono': recepcion.remitente_telefono,
+            'destinatario_nombre': recepcion.destinatario_nombre,
+            'destinatario_telefono': recepcion.destinatario_telefono,
+            'provincia_id': recepcion.provincia_id.id,
+            'peso_etiqueta': recepcion.peso_etiqueta,
+            'admin_id': recepcion.admin_id.id,
+            'estado_mexico': recepcion.estado_mexico,
+        }
+    
     @api.depends('peso_cobrar')
+    @perfilar
     def _compute_embalaje(self):
         """Calcula embalaje: $50 por cada 10 lb o fracción.
         
@@ -313,30 +396,36 @@ class PaqueteriaEnvio(models.Model):
             else:
                 record.embalaje = 0.0
     
-    @api.depends('tipo_cliente', 'provincia_id')
+    @api.depends('tipo_cliente', 'provincia_id', 'fecha_envio_id')
+    @perfilar
     def _compute_tarifa(self):
         """Calcula tarifa por libra según tipo de cliente y provincia.
         
-        Tarifas:
-        - VIP + La Habana: $140/lb
-        - VIP + Resto: $170/lb
-        - Normal + La Habana: $150/lb
-        - Normal + Resto: $180/lb
+        La tarifa se toma de la matriz paqueteria.tarifa según el tipo
+        de cliente, la zona tarifaria de la provincia y la fecha de envío
+        (hoy si el envío aún no tiene fecha asignada). La matriz se lee
+        de caché, por lo que el costo es el mismo para 10 o 100,000
+        registros.
+        
+        Mover la fecha de envío a otro día no pasa por aquí: la fecha
+        reprecia sus envíos en SQL (ver paqueteria.fecha.envio.write).
+        Cambiar la zona de una provincia no reprecia envíos registrados.
         """
+        Tarifa = self.env['paqueteria.tarifa']
+        hoy = fields.Date.context_today(self)
         for record in self:
             if not record.provincia_id:
                 record.tarifa_por_lb = 0.0
                 continue
             
-            # Verificar si es La Habana
-            es_habana = record.provincia_id.name.lower() == 'la habana'
-            
-            if record.tipo_cliente == 'vip':
-                record.tarifa_por_lb = 140.0 if es_habana else 170.0
-            else:  # normal
-                record.tarifa_por_lb = 150.0 if es_habana else 180.0
+            record.tarifa_por_lb = Tarifa._obtener_tarifa(
+                record.tipo_cliente,
+                record.provincia_id.zona_tarifa,
+                record.fecha_envio_id.fecha or hoy,
+            )
 
     @api.depends('articulo_ids.subtotal')
+    @perfilar
     def _compute_impuesto_aduanal(self):
         """Calcula el impuesto aduanal total sumando todos los artículos."""
         for record in self:
@@ -351,6 +440,7 @@ class PaqueteriaEnvio(models.Model):
         'impuesto_aduanal',
         'costo_documentos'
     )
+    @perfilar
     def _compute_totales(self):
         """Calcula subtotal y total a cobrar del envío.
         
@@ -372,9 +462,15 @@ class PaqueteriaEnvio(models.Model):
     # ========== CRUD METHODS ==========
     
     @api.model_create_multi
+    @perfilar
     def create(self, vals_list):
         """Crea envíos generando número de secuencia automático.
         
+        Los números de todos los envíos sin nombre se reservan en un solo
+        bloque, de modo que crear N envíos cuesta una llamada a la
+        secuencia y no N. Los envíos creados se suman a los totales de
+        sus fechas con un solo UPDATE.
+        
         Args:
             vals_list: Lista de diccionarios con valores para crear
             
@@ -384,23 +480,346 @@ class PaqueteriaEnvio(models.Model):
         Raises:
             ValidationError: Si no se puede generar número de envío
         """
-        for vals in vals_list:
-            if vals.get('name', 'Nuevo') == 'Nuevo':
-                sequence = self.env['ir.sequence'].next_by_code(
-                    'paqueteria.envio'
+        pendientes = [
+            vals for vals in vals_list
+            if vals.get('name', 'Nuevo') == 'Nuevo'
+        ]
+        if pendientes:
+            numeros = self.env['ir.sequence']._reservar_bloque(
+                'paqueteria.envio', len(pendientes)
+            )
+            if len(numeros) < len(pendientes):
+                raise ValidationError(
+                    _('No se pudo generar el número de envío. '
+                      'Verifique que la secuencia esté configurada.')
                 )
-                if not sequence:
-                    raise ValidationError(
-                        _('No se pudo generar el número de envío. '
-                          'Verifique que la secuencia esté configurada.')
-                    )
-                vals['name'] = sequence
-                
-                _logger.info(
-                    'Creando envío %s para %s → %s',
-                    sequence,
-                    vals.get('remitente_nombre'),
-                    vals.get('destinatario_nombre')
+            for vals, numero in zip(pendientes, numeros):
+                vals['name'] = numero
+            
+            _logger.info(
+                'Creando %d envío(s): %s → %s',
+                len(pendientes),
+                numeros[0],
+                numeros[-1],
+            )
+        
+        records = super(
+            PaqueteriaEnvio, self.with_context(paqueteria_totales_en_curso=True)
+        ).create(vals_list).with_env(self.env)
+        if not self.env.context.get('paqueteria_totales_en_curso'):
+            self.env['paqueteria.fecha.envio']._aplicar_deltas(
+                {}, records._leer_totales_fecha()
+            )
+        return records
+    
+    @perfilar
+    def write(self, vals):
+        """Modifica envíos actualizando los totales de sus fechas.
+        
+        La diferencia entre el estado previo y el posterior de cada
+        envío (incluido el cambio de fecha) se registra como delta de
+        las fechas afectadas. Un cambio de fecha mueve además sus
+        distribuciones al viaje de cada maleta en la nueva fecha.
+        """
+        with self._mantener_totales_fecha() as envios:
+            resultado = super(PaqueteriaEnvio, envios).write(vals)
+        if 'fecha_envio_id' in vals:
+            self.maleta_distribucion_ids._asignar_viajes()
+        return resultado
+    
+    @perfilar
+    def unlink(self):
+        """Elimina envíos descontándolos de los totales de sus fechas."""
+        with self._mantener_totales_fecha() as envios:
+            return super(PaqueteriaEnvio, envios).unlink()
+    
+    # ========== TOTALES DE FECHA ==========
+    
+    def _leer_totales_fecha(self):
+        """Devuelve los valores del envío que alimentan los totales de fecha.
+        
+        Returns:
+            dict: id de envío → (fecha_envio_id, forma_pago, peso_cobrar,
+                total_cobrar)
+        """
+        return {
+            record.id: (
+                record.fecha_envio_id.id,
+                record.forma_pago,
+                record.peso_cobrar,
+                record.total_cobrar,
+            )
+            for record in self
+        }
+    
+    @contextmanager
+    def _mantener_totales_fecha(self):
+        """Aplica a las fechas la diferencia producida dentro del bloque.
+        
+        Las operaciones anidadas (ej: líneas de artículos creadas dentro
+        del write de un envío) se ejecutan con el contexto
+        ``paqueteria_totales_en_curso`` y no vuelven a aplicar deltas.
+        
+        Yields:
+            Recordset de envíos con el contexto de operación en curso
+        """
+        if self.env.context.get('paqueteria_totales_en_curso'):
+            yield self
+            return
+        
+        antes = self._leer_totales_fecha()
+        yield self.with_context(paqueteria_totales_en_curso=True)
+        despues = self.exists()._leer_totales_fecha()
+        self.env['paqueteria.fecha.envio']._aplicar_deltas(antes, despues)
+    
+    # ========== COLA DE EMPAQUE ==========
+    
+    @api.model
+    def _dominio_cola_empaque(self, fecha_envio=None):
+        """Dominio de los envíos con peso pendiente de empacar.
+        
+        Coincide con el índice parcial creado en init(), de modo que la
+        cola se obtiene con una sola consulta indexada.
+        
+        Args:
+            fecha_envio: Fecha de envío opcional para acotar la cola
+        
+        Returns:
+            list: Dominio de búsqueda
+        """
+        dominio = [('peso_pendiente', '>', 0)]
+        if fecha_envio:
+            dominio.append(('fecha_envio_id', 'in', fecha_envio.ids))
+        return dominio
+    
+    # ========== IMPORTACIÓN MASIVA ==========
+    
+    @api.model
+    def importar_lote(self, filas, valores_comunes=None, tamano_lote=500,
+                      primera_fila=1):
+        """Importa envíos en bloque a partir de filas ya leídas.
+        
+        Cada fila es un diccionario cuyas claves son los nombres de
+        CAMPOS_IMPORTACION, o una tupla (número de fila, diccionario)
+        cuando quien lee el archivo ya numeró las filas.
+        
+        Las filas se validan primero en memoria y luego se crean con un
+        ``create()`` por lote; si un lote falla se reintenta fila por
+        fila para aislar los registros con error sin abortar el resto de
+        la importación.
+        
+        Args:
+            filas: Iterable de diccionarios (o tuplas número, diccionario)
+                con los datos de cada envío
+            valores_comunes: Valores aplicados a todas las filas (ej:
+                fecha_envio_id), las columnas de la fila tienen prioridad
+            tamano_lote: Cantidad de envíos creados por llamada a create()
+            primera_fila: Número con el que se reporta la primera fila
+                cuando las filas no traen su propio número
+            
+        Returns:
+            dict: Resultado con las claves:
+                - envios: Recordset de envíos creados
+                - errores: Lista de tuplas (número de fila, mensaje)
+                - total_filas: Cantidad de filas procesadas
+                - segundos: Duración total de la importación
+                - filas_por_segundo: Rendimiento de la importación
+        """
+        inicio = time.perf_counter()
+        valores_comunes = dict(valores_comunes or {})
+        provincias = self._mapa_provincias_importacion()
+        
+        errores = []
+        preparados = []
+        total_filas = 0
+        for numero_fila, fila in enumerate(filas, start=primera_fila):
+            if isinstance(fila, tuple):
+                numero_fila, fila = fila
+            total_filas += 1
+            try:
+                vals = self._preparar_vals_importacion(
+                    fila, valores_comunes, provincias
                 )
+            except ValidationError as error:
+                errores.append((numero_fila, error.args[0]))
+                continue
+            preparados.append((numero_fila, vals))
+        
+        envio_ids = []
+        for lote in split_every(tamano_lote, preparados):
+            try:
+                with self.env.cr.savepoint():
+                    envio_ids += self.create(
+                        [vals for _numero, vals in lote]
+                    ).ids
+            except (UserError, psycopg2.Error):
+                # Reintentar fila por fila para aislar las que fallan
+                for numero_fila, vals in lote:
+                    try:
+                        with self.env.cr.savepoint():
+                            envio_ids += self.create(vals).ids
+                    except (UserError, psycopg2.Error) as error:
+                        mensaje = (
+                            error.args[0] if isinstance(error, UserError)
+                            else str(error).strip()
+                        )
+                        errores.append((numero_fila, mensaje))
+        
+        segundos = time.perf_counter() - inicio
+        filas_por_segundo = total_filas / segundos if segundos else 0.0
+        errores.sort()
+        
+        _logger.info(
+            'Importación de envíos: %d filas, %d creados, %d con error '
+            'en %.2f s (%.1f filas/s)',
+            total_filas,
+            len(envio_ids),
+            len(errores),
+            segundos,
+            filas_por_segundo,
+        )
         
-        return super().create(vals_list)
\ No newline at end of file
+        return {
+            'envios': self.browse(envio_ids),
+            'errores': errores,
+            'total_filas': total_filas,
+            'segundos': segundos,
+            'filas_por_segundo': filas_por_segundo,
+        }
+    
+    @api.model
+    def _mapa_provincias_importacion(self):
+        """Devuelve un mapa nombre/código en minúsculas → id de provincia."""
+        mapa = {}
+        provincias = self.env['paqueteria.provincia'].search_read(
+            [], ['name', 'code']
+        )
+        for provincia in provincias:
+            mapa[provincia['name'].strip().lower()] = provincia['id']
+            if provincia['code']:
+                mapa[provincia['code'].strip().lower()] = provincia['id']
+        return mapa
+    
+    @api.model
+    def _preparar_vals_importacion(self, fila, valores_comunes, provincias):
+        """Valida una fila de importación y la convierte en valores de create.
+        
+        Args:
+            fila: Diccionario con los datos de la fila
+            valores_comunes: Valores por defecto para todas las filas
+            provincias: Mapa devuelto por _mapa_provincias_importacion
+            
+        Returns:
+            dict: Valores listos para create()
+            
+        Raises:
+            ValidationError: Si la fila tiene datos faltantes o inválidos
+        """
+        vals = dict(valores_comunes)
+        
+        for campo in CAMPOS_IMPORTACION_TEXTO:
+            valor = _texto_importacion(fila.get(campo))
+            if valor:
+                vals[campo] = valor
+        
+        for campo in ('remitente_nombre', 'destinatario_nombre'):
+            if not vals.get(campo):
+                raise ValidationError(
+                    _('Falta el valor de la columna "%s".', campo)
+                )
+        
+        provincia = _texto_importacion(fila.get('provincia')).lower()
+        if provincia:
+            if provincia not in provincias:
+                raise ValidationError(
+                    _('Provincia "%s" no encontrada.', fila.get('provincia'))
+                )
+            vals['provincia_id'] = provincias[provincia]
+        if not vals.get('provincia_id'):
+            raise ValidationError(_('Falta la provincia de destino.'))
+        
+        for campo, opciones in CAMPOS_IMPORTACION_SELECCION.items():
+            valor = _texto_importacion(fila.get(campo)).lower()
+            if not valor:
+                continue
+            clave = opciones.get(valor)
+            if not clave:
+                raise ValidationError(
+                    _('Valor "%(valor)s" no válido para "%(campo)s".',
+                      valor=fila.get(campo), campo=campo)
+                )
+            vals[campo] = clave
+        if not vals.get('estado_mexico'):
+            raise ValidationError(_('Falta el estado de México.'))
+        
+        for campo in CAMPOS_IMPORTACION_NUMERICOS:
+            valor = _texto_importacion(fila.get(campo)).replace(',', '.')
+            if not valor:
+                continue
+            try:
+                numero = float(valor)
+            except ValueError:
+                raise ValidationError(
+                    _('Valor "%(valor)s" no numérico en "%(campo)s".',
+                      valor=fila.get(campo), campo=campo)
+                ) from None
+            if numero < 0:
+                raise ValidationError(
+                    _('El valor de "%s" no puede ser negativo.', campo)
+                )
+            vals[campo] = numero
+        
+        if not (vals.get('peso_etiqueta') or vals.get('peso_volumen')):
+            raise ValidationError(
+                _('Se requiere peso en etiqueta o peso por volumen.')
+            )
+        
+        return vals
+
+
+# ========== COLUMNAS DE IMPORTACIÓN ==========
+
+CAMPOS_IMPORTACION_TEXTO = (
+    'remitente_nombre',
+    'remitente_telefono',
+    'destinatario_nombre',
+    'destinatario_telefono',
+)
+
+CAMPOS_IMPORTACION_NUMERICOS = (
+    'peso_central',
+    'peso_etiqueta',
+    'peso_volumen',
+    'costo_documentos',
+)
+
+# Acepta tanto la clave técnica como la etiqueta visible de cada opción
+CAMPOS_IMPORTACION_SELECCION = {
+    campo: {
+        texto.lower(): clave
+        for clave, etiqueta in opciones
+        for texto in (clave, etiqueta)
+    }
+    for campo, opciones in (
+        ('tipo_cliente', TIPOS_CLIENTE),
+        ('forma_pago', FORMAS_PAGO),
+        ('estado_mexico', ESTADOS_MEXICO),
+    )
+}
+
+CAMPOS_IMPORTACION = (
+    CAMPOS_IMPORTACION_TEXTO
+    + ('provincia',)
+    + CAMPOS_IMPORTACION_NUMERICOS
+    + tuple(CAMPOS_IMPORTACION_SELECCION)
+)
+
+
+def _texto_importacion(valor):
+    """Normaliza un valor leído de CSV/XLSX a texto sin espacios extremos."""
+    if valor is None or valor is False:
+        return ''
+    if isinstance(valor, float) and valor.is_integer():
+        # Teléfonos y números leídos de Excel llegan como float
+        valor = int(valor)
+    return str(valor).strip()
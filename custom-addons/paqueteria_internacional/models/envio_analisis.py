@@ -0,0 +1,285 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Cubo de análisis de envíos pre-agregado."""
+
+import logging
+from datetime import timedelta
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+from odoo.tools.sql import table_exists
+from .constants import ESTADOS_MEXICO, FORMAS_PAGO, TIPOS_CLIENTE
+
+_logger = logging.getLogger(__name__)
+
+# Parámetro con la marca de tiempo de la última actualización del cubo
+PARAMETRO_ULTIMA_ACTUALIZACION = 'paqueteria.analisis.ultima_actualizacion'
+
+# Solapamiento con la actualización anterior para no perder cambios de
+# transacciones que confirmaron después de iniciada esa actualización
+MARGEN_ACTUALIZACION = timedelta(minutes=5)
+
+
+class PaqueteriaEnvioAnalisis(models.Model):
+    """Envíos agregados por fecha, provincia, estado, pago, cliente y admin.
+
+    La tabla no es una vista: guarda las sumas ya calculadas para que los
+    tableros no recorran todos los envíos. Se agrega completa solo
+    cuando la tabla es nueva o está vacía; un cron la actualiza de forma
+    incremental re-agregando solo las fechas de envío modificadas desde
+    la última actualización, que encuentra por el índice de write_date
+    de los envíos. Solo incluye envíos con fecha de envío.
+    """
+
+    _name = 'paqueteria.envio.analisis'
+    _description = 'Análisis de Envíos'
+    _auto = False
+    _log_access = False
+    _order = 'fecha desc'
+    _rec_name = 'fecha_envio_id'
+
+    # ========== DIMENSIONES ==========
+
+    fecha_envio_id = fields.Many2one(
+        'paqueteria.fecha.envio',
+        string='Fecha de Envío',
+        readonly=True,
+        help='Fecha de envío de los envíos agregados'
+    )
+
+    fecha = fields.Date(
+        string='Fecha',
+        readonly=True,
+        help='Día de la fecha de envío, para agrupar por semana, mes o año'
+    )
+
+    provincia_id = fields.Many2one(
+        'paqueteria.provincia',
+        string='Provincia',
+        readonly=True,
+        help='Provincia de destino en Cuba'
+    )
+
+    estado_mexico = fields.Selection(
+        selection=ESTADOS_MEXICO,
+        string='Estado de México',
+        readonly=True,
+        help='Estado de México donde se procesaron los envíos'
+    )
+
+    forma_pago = fields.Selection(
+        selection=FORMAS_PAGO,
+        string='Forma de Pago',
+        readonly=True,
+        help='Método de pago de los envíos'
+    )
+
+    tipo_cliente = fields.Selection(
+        selection=TIPOS_CLIENTE,
+        string='Tipo de Cliente',
+        readonly=True,
+        help='Tipo de cliente de los envíos'
+    )
+
+    admin_id = fields.Many2one(
+        'res.users',
+        string='Admin que Procesó',
+        readonly=True,
+        help='Administrador que procesó los envíos'
+    )
+
+    # ========== MEDIDAS ==========
+
+    cantidad_envios = fields.Integer(
+        string='Envíos',
+        readonly=True,
+        help='Cantidad de envíos agregados'
+    )
+
+    peso_cobrar = fields.Float(
+        string='Peso a Cobrar (lb)',
+        digits=(10, 2),
+        readonly=True,
+        help='Suma del peso a cobrar'
+    )
+
+    embalaje = fields.Float(
+        string='Embalaje ($)',
+        digits=(10, 2),
+        readonly=True,
+        help='Suma del costo de embalaje'
+    )
+
+    impuesto_aduanal = fields.Float(
+        string='Impuesto Aduanal ($)',
+        digits=(10, 2),
+        readonly=True,
+        help='Suma de los impuestos aduanales'
+    )
+
+    total_cobrar = fields.Float(
+        string='Total Cobrado ($)',
+        digits=(10, 2),
+        readonly=True,
+        help='Suma del total cobrado'
+    )
+
+    # ========== ESTRUCTURA ==========
+
+    def init(self):
+        """Crea la tabla del cubo si no existe.
+
+        El cubo solo se agrega completo cuando la tabla es nueva o está
+        vacía; en una actualización del módulo se conserva y su
+        frescura queda a cargo de ``_cron_actualizar``.
+        """
+        nueva = not table_exists(self.env.cr, self._table)
+        self.env.cr.execute(SQL(
+            """
+            CREATE TABLE IF NOT EXISTS %(tabla)s (
+                id SERIAL PRIMARY KEY,
+                fecha_envio_id INTEGER NOT NULL
+                    REFERENCES paqueteria_fecha_envio(id) ON DELETE CASCADE,
+                fecha DATE,
+                provincia_id INTEGER,
+                estado_mexico VARCHAR,
+                forma_pago VARCHAR,
+                tipo_cliente VARCHAR,
+                admin_id INTEGER,
+                cantidad_envios INTEGER NOT NULL DEFAULT 0,
+                peso_cobrar NUMERIC NOT NULL DEFAULT 0,
+                embalaje NUMERIC NOT NULL DEFAULT 0,
+                impuesto_aduanal NUMERIC NOT NULL DEFAULT 0,
+                total_cobrar NUMERIC NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS %(indice_fecha_envio)s
+                ON %(tabla)s (fecha_envio_id);
+            CREATE INDEX IF NOT EXISTS %(indice_fecha)s
+                ON %(tabla)s (fecha);
+            """,
+            tabla=SQL.identifier(self._table),
+            indice_fecha_envio=SQL.identifier(
+                '%s_fecha_envio_id_index' % self._table
+            ),
+            indice_fecha=SQL.identifier('%s_fecha_index' % self._table),
+        ))
+        if not nueva:
+            self.env.cr.execute(SQL(
+                'SELECT 1 FROM %s LIMIT 1', SQL.identifier(self._table)
+            ))
+            if self.env.cr.rowcount:
+                return
+        self._reconstruir()
+
+    # ========== ACTUALIZACIÓN ==========
+
+    @api.model
+    def _reconstruir(self):
+        """Vacía el cubo y lo vuelve a agregar desde todos los envíos."""
+        marca = self._marca_actual()
+        self._flush_origen()
+        self.env.cr.execute(SQL('TRUNCATE %s', SQL.identifier(self._table)))
+        self._insertar_agregados(SQL('TRUE'))
+        self._guardar_marca(marca)
+        self.invalidate_model()
+
+    @api.model
+    def _cron_actualizar(self):
+        """Re-agrega las fechas de envío modificadas desde la última corrida.
+
+        Una fecha se considera modificada si cambió ella misma (incluidos
+        sus totales, que se ajustan al crear, mover o eliminar envíos) o
+        alguno de sus envíos.
+
+        Returns:
+            int: Cantidad de fechas de envío re-agregadas
+        """
+        valor = self.env['ir.config_parameter'].sudo().get_param(
+            PARAMETRO_ULTIMA_ACTUALIZACION
+        )
+        if not valor:
+            self._reconstruir()
+            return self.env['paqueteria.fecha.envio'].search_count([])
+
+        desde = fields.Datetime.to_datetime(valor) - MARGEN_ACTUALIZACION
+        marca = self._marca_actual()
+        self._flush_origen()
+        self.env.cr.execute(SQL(
+            """
+            SELECT id FROM paqueteria_fecha_envio WHERE write_date >= %(desde)s
+             UNION
+            SELECT fecha_envio_id FROM paqueteria_envio
+             WHERE write_date >= %(desde)s AND fecha_envio_id IS NOT NULL
+            """,
+            desde=desde,
+        ))
+        fecha_ids = [fila[0] for fila in self.env.cr.fetchall()]
+
+        if fecha_ids:
+            self.env.cr.execute(SQL(
+                "DELETE FROM %s WHERE fecha_envio_id = ANY(%s)",
+                SQL.identifier(self._table),
+                fecha_ids,
+            ))
+            self._insertar_agregados(
+                SQL('e.fecha_envio_id = ANY(%s)', fecha_ids)
+            )
+            self.invalidate_model()
+
+        self._guardar_marca(marca)
+        _logger.info('Análisis de envíos: %s fechas actualizadas', len(fecha_ids))
+        return len(fecha_ids)
+
+    @api.model
+    def _insertar_agregados(self, condicion):
+        """Inserta en el cubo los envíos agregados que cumplen la condición.
+
+        Args:
+            condicion: SQL aplicado a paqueteria_envio (alias ``e``)
+        """
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO %(tabla)s
+                   (fecha_envio_id, fecha, provincia_id, estado_mexico,
+                    forma_pago, tipo_cliente, admin_id, cantidad_envios,
+                    peso_cobrar, embalaje, impuesto_aduanal, total_cobrar)
+            SELECT e.fecha_envio_id, f.fecha, e.provincia_id, e.estado_mexico,
+                   e.forma_pago, e.tipo_cliente, e.admin_id, COUNT(*),
+                   COALESCE(SUM(e.peso_cobrar), 0),
+                   COALESCE(SUM(e.embalaje), 0),
+                   COALESCE(SUM(e.impuesto_aduanal), 0),
+                   COALESCE(SUM(e.total_cobrar), 0)
+              FROM paqueteria_envio e
+              JOIN paqueteria_fecha_envio f ON f.id = e.fecha_envio_id
+             WHERE %(condicion)s
+             GROUP BY e.fecha_envio_id, f.fecha, e.provincia_id,
+                      e.estado_mexico, e.forma_pago, e.tipo_cliente,
+                      e.admin_id
+            """,
+            tabla=SQL.identifier(self._table),
+            condicion=condicion,
+        ))
+
+    @api.model
+    def _flush_origen(self):
+        """Escribe en la base los cambios pendientes de envíos y fechas."""
+        self.env['paqueteria.envio'].flush_model([
+            'fecha_envio_id', 'provincia_id', 'estado_mexico', 'forma_pago',
+            'tipo_cliente', 'admin_id', 'peso_cobrar', 'embalaje',
+            'impuesto_aduanal', 'total_cobrar',
+        ])
+        self.env['paqueteria.fecha.envio'].flush_model(['fecha'])
+
+    @api.model
+    def _marca_actual(self):
+        """Devuelve la hora de inicio de la transacción en UTC."""
+        self.env.cr.execute(SQL("SELECT now() AT TIME ZONE 'UTC'"))
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _guardar_marca(self, marca):
+        """Registra la marca de tiempo de la última actualización."""
+        self.env['ir.config_parameter'].sudo().set_param(
+            PARAMETRO_ULTIMA_ACTUALIZACION, fields.Datetime.to_string(marca)
+        )
@@ -4,6 +4,7 @@
 """Relación entre envíos y artículos con impuesto aduanal."""
 
 from odoo import api, fields, models
+from .perfilado import perfilar
 
 
 class PaqueteriaEnvioArticulo(models.Model):
@@ -82,62 +83,76 @@ class PaqueteriaEnvioArticulo(models.Model):
     # ========== COMPUTED METHODS ==========
     
     @api.depends('articulo_id', 'tipo_cliente', 'provincia_id')
+    @perfilar
     def _compute_costo_unitario(self):
         """Calcula el costo unitario según tipo de artículo, cliente y destino.
         
-        Tarifas de impuesto aduanal:
-        
-        CELULARES:
-          - Normal + Habana: $800
-          - Normal + Resto: $1,000
-          - VIP + Habana: $700
-          - VIP + Resto: $900
-        
-        LAPTOPS/TABLETS:
-          - Normal + Habana: $1,000
-          - Normal + Resto: $1,300
-          - VIP + Habana: $800
-          - VIP + Resto: $1,100
+        CELULARES y LAPTOPS/TABLETS:
+          - Regla vigente de paqueteria.regla.aduanal para el tipo de
+            artículo, tipo de cliente y zona tarifaria de la provincia
+            (la misma zona que usa la tarifa por libra del envío)
         
         OTROS:
           - Precio fijo del catálogo (articulo.costo_aduanal)
+        
+        Las reglas se leen de caché, sin comparar nombres de provincia
+        ni consultar la base de datos por cada línea.
+        
+        El costo queda fijado al elegir el artículo o cambiar el cliente
+        o la provincia del envío. Editar el costo del catálogo o mover
+        la fecha de envío a otro día no modifica los impuestos ya
+        cobrados.
         """
+        Regla = self.env['paqueteria.regla.aduanal']
+        hoy = fields.Date.context_today(self)
         for record in self:
             if not record.articulo_id:
                 record.costo_unitario = 0
                 continue
             
-            tipo = record.tipo_articulo
-            es_habana = (
-                record.provincia_id.name == 'La Habana' 
-                if record.provincia_id else False
-            )
-            es_vip = record.tipo_cliente == 'vip'
-            
-            # CELULARES
-            if tipo == 'celular':
-                if es_vip:
-                    # VIP: Habana $700, Resto $900
-                    record.costo_unitario = 700 if es_habana else 900
-                else:
-                    # Normal: Habana $800, Resto $1000
-                    record.costo_unitario = 800 if es_habana else 1000
-            
-            # LAPTOPS/TABLETS
-            elif tipo == 'laptop_tablet':
-                if es_vip:
-                    # VIP: Habana $800, Resto $1100
-                    record.costo_unitario = 800 if es_habana else 1100
-                else:
-                    # Normal: Habana $1000, Resto $1300
-                    record.costo_unitario = 1000 if es_habana else 1300
-            
             # OTROS (precio fijo)
-            else:
+            if record.tipo_articulo == 'otro':
                 record.costo_unitario = record.articulo_id.costo_aduanal or 0
+                continue
+            
+            # CELULARES y LAPTOPS/TABLETS (regla por zona)
+            record.costo_unitario = Regla._obtener_costo(
+                record.tipo_articulo,
+                record.tipo_cliente,
+                record.provincia_id.zona_tarifa or 'resto',
+                record.envio_id.fecha_envio_id.fecha or hoy,
+            )
     
     @api.depends('cantidad', 'costo_unitario')
+    @perfilar
     def _compute_subtotal(self):
         """Calcula el subtotal: cantidad × costo unitario."""
         for record in self:
-            record.subtotal = record.cantidad * record.costo_unitario
\ No newline at end of file
+            record.subtotal = record.cantidad * record.costo_unitario
+    
+    # ========== CRUD METHODS ==========
+    
+    @api.model_create_multi
+    @perfilar
+    def create(self, vals_list):
+        """Crea líneas actualizando los totales de fecha de sus envíos."""
+        envios = self.env['paqueteria.envio'].browse({
+            vals['envio_id'] for vals in vals_list if vals.get('envio_id')
+        })
+        with envios._mantener_totales_fecha():
+            return super().create(vals_list)
+    
+    @perfilar
+    def write(self, vals):
+        """Modifica líneas actualizando los totales de fecha de sus envíos."""
+        envios = self.envio_id
+        if vals.get('envio_id'):
+            envios |= envios.browse(vals['envio_id'])
+        with envios._mantener_totales_fecha():
+            return super().write(vals)
+    
+    @perfilar
+    def unlink(self):
+        """Elimina líneas actualizando los totales de fecha de sus envíos."""
+        with self.envio_id._mantener_totales_fecha():
+            return super().unlink()
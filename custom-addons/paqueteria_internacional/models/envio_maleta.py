@@ -3,8 +3,12 @@
 
 """Distribución de envíos en maletas físicas."""
 
+from collections import defaultdict
+
 from odoo import api, fields, models
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL, float_compare
+from .perfilado import perfilar
 
 
 class PaqueteriaEnvioMaleta(models.Model):
@@ -24,6 +28,7 @@ class PaqueteriaEnvioMaleta(models.Model):
         'paqueteria.envio',
         string='Envío',
         required=True,
+        index=True,
         ondelete='cascade',
         help='Envío que se está distribuyendo en maletas'
     )
@@ -36,6 +41,17 @@ class PaqueteriaEnvioMaleta(models.Model):
         help='Maleta física donde se guarda parte o todo el envío'
     )
     
+    viaje_id = fields.Many2one(
+        'paqueteria.maleta.viaje',
+        string='Viaje',
+        readonly=True,
+        index=True,
+        ondelete='restrict',
+        help='Viaje de la maleta (maleta y fecha de envío del envío) al '
+             'que pertenece esta distribución. Se asigna automáticamente y '
+             'queda vacío mientras el envío no tenga fecha de envío'
+    )
+    
     peso_en_maleta = fields.Float(
         string='Peso en esta Maleta (lb)',
         required=True,
@@ -72,9 +88,121 @@ class PaqueteriaEnvioMaleta(models.Model):
         help='Peso total a cobrar del envío (para validación)'
     )
     
+    _sql_constraints = [
+        (
+            'peso_en_maleta_positive',
+            'CHECK(peso_en_maleta > 0)',
+            'El peso debe ser mayor a 0',
+        ),
+    ]
+    
+    def init(self):
+        """Instala la salvaguarda de base de datos contra sobre-distribución.
+        
+        Verifica al confirmar la transacción que la suma distribuida de
+        cada envío modificado no exceda su peso a cobrar, aunque las
+        filas se escriban por fuera del ORM. La verificación es diferida,
+        así que un guardado que mueve peso entre líneas en varias
+        sentencias, o que borra y vuelve a crear las líneas, solo se
+        valida con el estado final.
+        
+        Dos triggers por sentencia (INSERT y UPDATE) anotan los envíos
+        tocados en paqueteria_envio_maleta_por_verificar, una sola vez
+        por envío. Un trigger de restricción diferido sobre esa tabla
+        verifica cada envío anotado una vez al confirmar, sin importar
+        cuántas de sus líneas se hayan escrito.
+        """
+        self.env.cr.execute(SQL(
+            """
+            CREATE UNLOGGED TABLE IF NOT EXISTS
+                paqueteria_envio_maleta_por_verificar (
+                    envio_id INTEGER PRIMARY KEY
+                );
+            
+            CREATE OR REPLACE FUNCTION paqueteria_envio_maleta_anotar()
+            RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'UPDATE' THEN
+                    -- Solo cuentan las filas que cambiaron de peso o de envío
+                    INSERT INTO paqueteria_envio_maleta_por_verificar (envio_id)
+                    SELECT DISTINCT n.envio_id
+                      FROM nuevas n
+                      JOIN anteriores a ON a.id = n.id
+                     WHERE n.envio_id IS NOT NULL
+                       AND (n.peso_en_maleta IS DISTINCT FROM a.peso_en_maleta
+                            OR n.envio_id IS DISTINCT FROM a.envio_id)
+                    ON CONFLICT DO NOTHING;
+                ELSE
+                    INSERT INTO paqueteria_envio_maleta_por_verificar (envio_id)
+                    SELECT DISTINCT envio_id
+                      FROM nuevas
+                     WHERE envio_id IS NOT NULL
+                    ON CONFLICT DO NOTHING;
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+            
+            CREATE OR REPLACE FUNCTION paqueteria_envio_maleta_check_peso()
+            RETURNS trigger AS $$
+            DECLARE
+                distribuido NUMERIC;
+                disponible NUMERIC;
+            BEGIN
+                DELETE FROM paqueteria_envio_maleta_por_verificar
+                 WHERE envio_id = NEW.envio_id;
+                SELECT COALESCE(SUM(peso_en_maleta), 0) INTO distribuido
+                  FROM paqueteria_envio_maleta
+                 WHERE envio_id = NEW.envio_id;
+                SELECT COALESCE(peso_cobrar, 0) INTO disponible
+                  FROM paqueteria_envio
+                 WHERE id = NEW.envio_id;
+                IF distribuido > disponible + 0.005 THEN
+                    RAISE EXCEPTION USING
+                        ERRCODE = 'check_violation',
+                        MESSAGE = 'La suma de pesos en maletas ('
+                            || distribuido || ' lb) excede el peso total '
+                            || 'del envío (' || disponible || ' lb)';
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+            
+            DROP TRIGGER IF EXISTS paqueteria_envio_maleta_check_peso
+                ON paqueteria_envio_maleta;
+            DROP TRIGGER IF EXISTS paqueteria_envio_maleta_check_peso_insert
+                ON paqueteria_envio_maleta;
+            DROP TRIGGER IF EXISTS paqueteria_envio_maleta_check_peso_update
+                ON paqueteria_envio_maleta;
+            DROP TRIGGER IF EXISTS paqueteria_envio_maleta_anotar_insert
+                ON paqueteria_envio_maleta;
+            DROP TRIGGER IF EXISTS paqueteria_envio_maleta_anotar_update
+                ON paqueteria_envio_maleta;
+            DROP TRIGGER IF EXISTS paqueteria_envio_maleta_check_peso
+                ON paqueteria_envio_maleta_por_verificar;
+            
+            CREATE TRIGGER paqueteria_envio_maleta_anotar_insert
+                AFTER INSERT ON paqueteria_envio_maleta
+                REFERENCING NEW TABLE AS nuevas
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION paqueteria_envio_maleta_anotar();
+            CREATE TRIGGER paqueteria_envio_maleta_anotar_update
+                AFTER UPDATE ON paqueteria_envio_maleta
+                REFERENCING OLD TABLE AS anteriores NEW TABLE AS nuevas
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION paqueteria_envio_maleta_anotar();
+            CREATE CONSTRAINT TRIGGER paqueteria_envio_maleta_check_peso
+                AFTER INSERT ON paqueteria_envio_maleta_por_verificar
+                DEFERRABLE INITIALLY DEFERRED
+                FOR EACH ROW
+                EXECUTE FUNCTION paqueteria_envio_maleta_check_peso();
+            """
+        ))
+    
     # ========== CONSTRAINTS ==========
     
     @api.constrains('peso_en_maleta', 'envio_id')
+    @perfilar
     def _check_peso_valido(self):
         """Valida que la distribución de pesos sea coherente.
         
@@ -82,19 +210,80 @@ class PaqueteriaEnvioMaleta(models.Model):
         1. El peso en maleta sea mayor a 0
         2. La suma de pesos distribuidos no exceda el peso total del envío
         
+        La suma se obtiene con una sola consulta agrupada para todos los
+        envíos afectados, sin importar cuántas líneas se validen.
+        
         Raises:
             ValidationError: Si el peso es <= 0 o si la suma excede el total
         """
-        for record in self:
-            if record.peso_en_maleta <= 0:
-                raise ValidationError('El peso debe ser mayor a 0')
-            
-            total_distribuido = sum(
-                record.envio_id.maleta_distribucion_ids.mapped('peso_en_maleta')
-            )
-            
-            if total_distribuido > record.peso_total_envio:
+        if any(record.peso_en_maleta <= 0 for record in self):
+            raise ValidationError('El peso debe ser mayor a 0')
+        
+        envios = self.envio_id
+        self.flush_model(['envio_id', 'peso_en_maleta'])
+        distribuido = self._read_group(
+            [('envio_id', 'in', envios.ids)],
+            ['envio_id'],
+            ['peso_en_maleta:sum'],
+        )
+        for envio, total_distribuido in distribuido:
+            if float_compare(
+                total_distribuido, envio.peso_cobrar, precision_digits=2
+            ) > 0:
                 raise ValidationError(
                     f'La suma de pesos en maletas ({total_distribuido} lb) '
-                    f'excede el peso total del envío ({record.peso_total_envio} lb)'
-                )
\ No newline at end of file
+                    f'excede el peso total del envío ({envio.peso_cobrar} lb)'
+                )
+    
+    # ========== CRUD METHODS ==========
+    
+    @api.model_create_multi
+    @perfilar
+    def create(self, vals_list):
+        """Asigna el viaje de cada distribución antes de crearla.
+        
+        Resuelve los viajes de todo el lote con una inserción y una
+        lectura, sin escrituras posteriores. Las distribuciones de envíos
+        sin fecha de envío quedan sin viaje.
+        """
+        envios = self.env['paqueteria.envio'].browse(
+            {vals['envio_id'] for vals in vals_list if vals.get('envio_id')}
+        )
+        fechas = {envio.id: envio.fecha_envio_id.id for envio in envios}
+        pares = [
+            (vals.get('maleta_id'), fechas.get(vals.get('envio_id'), False))
+            for vals in vals_list
+        ]
+        viajes = self.env['paqueteria.maleta.viaje']._obtener_viajes(pares)
+        for vals, par in zip(vals_list, pares):
+            vals['viaje_id'] = viajes.get(par, False)
+        return super().create(vals_list)
+    
+    @perfilar
+    def write(self, vals):
+        """Reasigna el viaje si cambia la maleta o el envío."""
+        resultado = super().write(vals)
+        if 'maleta_id' in vals or 'envio_id' in vals:
+            self._asignar_viajes()
+        return resultado
+    
+    def _asignar_viajes(self):
+        """Asigna a cada distribución el viaje de su maleta y fecha de envío.
+        
+        Se usa cuando cambia la maleta, el envío o la fecha de envío del
+        envío. Escribe una vez por viaje, no por distribución.
+        """
+        pares = {
+            record: (record.maleta_id.id, record.envio_id.fecha_envio_id.id or False)
+            for record in self
+        }
+        viajes = self.env['paqueteria.maleta.viaje']._obtener_viajes(
+            pares.values()
+        )
+        por_viaje = defaultdict(list)
+        for record, par in pares.items():
+            viaje_id = viajes.get(par, False)
+            if record.viaje_id.id != viaje_id:
+                por_viaje[viaje_id].append(record.id)
+        for viaje_id, ids in por_viaje.items():
+            self.browse(ids).write({'viaje_id': viaje_id})
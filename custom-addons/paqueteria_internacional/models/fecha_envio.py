@@ -4,8 +4,16 @@
 """Gestión de fechas de envío y estadísticas."""
 
 import logging
+import time
+from collections import defaultdict
 
-from odoo import api, fields, models
+import psycopg2
+
+from odoo import _, api, fields, models
+from odoo.tools import SQL
+from .constants import TIPOS_CLIENTE, ZONAS_TARIFA
+from .empaque import empacar
+from .perfilado import perfilar
 
 _logger = logging.getLogger(__name__)
 
@@ -19,6 +27,13 @@ class PaqueteriaFechaEnvio(models.Model):
     - Peso total transportado
     - Total cobrado separado por forma de pago
     - Provincias de destino
+    
+    Los totales de envíos no se recalculan desde cero: cada alta, cambio
+    o baja de un envío registra su diferencia como delta (ver
+    _aplicar_deltas), que se consolida en la fila de la fecha al
+    momento o, si está ocupada, desde un cron. Otro cron verifica
+    periódicamente que los totales coincidan con los envíos y corrige
+    cualquier desvío.
     """
     
     _name = 'paqueteria.fecha.envio'
@@ -62,22 +77,22 @@ class PaqueteriaFechaEnvio(models.Model):
     
     total_envios = fields.Integer(
         string='Total Envíos',
-        compute='_compute_totales',
-        store=True,
+        readonly=True,
+        copy=False,
         help='Cantidad total de envíos programados'
     )
     
     total_maletas = fields.Integer(
         string='Total Maletas',
-        compute='_compute_totales',
+        compute='_compute_total_maletas',
         store=True,
         help='Cantidad total de maletas preparadas'
     )
     
     peso_total = fields.Float(
         string='Peso Total (lb)',
-        compute='_compute_totales',
-        store=True,
+        readonly=True,
+        copy=False,
         digits=(10, 2),
         help='Suma del peso a cobrar de todos los envíos'
     )
@@ -86,24 +101,24 @@ class PaqueteriaFechaEnvio(models.Model):
     
     total_cobrado = fields.Float(
         string='Total Cobrado ($)',
-        compute='_compute_totales',
-        store=True,
+        readonly=True,
+        copy=False,
         digits=(10, 2),
         help='Total cobrado de todos los envíos (efectivo + transferencia)'
     )
     
     total_cobrado_efectivo = fields.Float(
         string='Total Efectivo ($)',
-        compute='_compute_totales_por_forma_pago',
-        store=True,
+        readonly=True,
+        copy=False,
         digits=(10, 2),
         help='Total cobrado en efectivo'
     )
     
     total_cobrado_transferencia = fields.Float(
         string='Total Transferencia ($)',
-        compute='_compute_totales_por_forma_pago',
-        store=True,
+        readonly=True,
+        copy=False,
         digits=(10, 2),
         help='Total cobrado por transferencia bancaria'
     )
@@ -131,84 +146,105 @@ class PaqueteriaFechaEnvio(models.Model):
             else:
                 record.name = "Nuevo Envío"
     
-    @api.depends(
-        'envio_ids',
-        'maleta_ids',
-        'envio_ids.peso_cobrar',
-        'envio_ids.total_cobrar',
-    )
-    def _compute_totales(self):
-        """Calcula totales operativos y financieros generales.
-        
-        Calcula:
-        - total_envios: Cantidad de envíos
-        - total_maletas: Cantidad de maletas
-        - peso_total: Suma de pesos a cobrar
-        - total_cobrado: Suma total sin importar forma de pago
-        """
+    @api.depends('maleta_ids')
+    @perfilar
+    def _compute_total_maletas(self):
+        """Cuenta las maletas de cada fecha con una consulta agrupada."""
+        maletas = self._contar_maletas()
         for record in self:
-            record.total_envios = len(record.envio_ids)
-            record.total_maletas = len(record.maleta_ids)
-            record.peso_total = sum(record.envio_ids.mapped('peso_cobrar'))
-            record.total_cobrado = sum(record.envio_ids.mapped('total_cobrar'))
-            
-            _logger.debug(
-                'Totales calculados para %s: %d envíos, %d maletas, '
-                '%.2f lb, $%.2f',
-                record.name,
-                record.total_envios,
-                record.total_maletas,
-                record.peso_total,
-                record.total_cobrado,
-            )
+            record.total_maletas = maletas.get(record._origin.id, 0)
     
-    @api.depends('envio_ids.total_cobrar', 'envio_ids.forma_pago')
-    def _compute_totales_por_forma_pago(self):
-        """Calcula totales separados por forma de pago.
+    def _agregar_totales(self):
+        """Suma los envíos de las fechas con una sola consulta agrupada.
         
-        Separa el total cobrado en:
-        - Efectivo: Suma de envíos con forma_pago = 'efectivo'
-        - Transferencia: Suma de envíos con forma_pago = 'transferencia'
+        Returns:
+            dict: id de fecha → diccionario con total_envios, peso_total,
+                total_cobrado, total_cobrado_efectivo y
+                total_cobrado_transferencia
+        """
+        fecha_ids = [id_ for id_ in self._origin.ids if id_]
+        if not fecha_ids:
+            return {}
+        
+        self.env['paqueteria.envio'].flush_model([
+            'fecha_envio_id', 'peso_cobrar', 'total_cobrar', 'forma_pago',
+        ])
+        self.env.cr.execute(SQL(
+            """
+            SELECT fecha_envio_id,
+                   COUNT(*),
+                   COALESCE(SUM(peso_cobrar), 0),
+                   COALESCE(SUM(total_cobrar), 0),
+                   COALESCE(SUM(total_cobrar)
+                       FILTER (WHERE forma_pago = 'efectivo'), 0),
+                   COALESCE(SUM(total_cobrar)
+                       FILTER (WHERE forma_pago = 'transferencia'), 0)
+              FROM paqueteria_envio
+             WHERE fecha_envio_id = ANY(%s)
+             GROUP BY fecha_envio_id
+            """,
+            fecha_ids,
+        ))
+        return {
+            fecha_id: {
+                'total_envios': total_envios,
+                'peso_total': float(peso_total),
+                'total_cobrado': float(total_cobrado),
+                'total_cobrado_efectivo': float(efectivo),
+                'total_cobrado_transferencia': float(transferencia),
+            }
+            for (
+                fecha_id, total_envios, peso_total, total_cobrado,
+                efectivo, transferencia,
+            ) in self.env.cr.fetchall()
+        }
+    
+    def _contar_maletas(self):
+        """Cuenta las maletas activas de cada fecha con una consulta agrupada.
         
-        Nota: Envíos sin forma de pago definida no se incluyen en ninguna suma.
+        Returns:
+            dict: id de fecha → cantidad de maletas
         """
-        for record in self:
-            # Filtrar envíos por forma de pago
-            envios_efectivo = record.envio_ids.filtered(
-                lambda e: e.forma_pago == 'efectivo'
-            )
-            envios_transferencia = record.envio_ids.filtered(
-                lambda e: e.forma_pago == 'transferencia'
-            )
-            
-            # Sumar totales
-            record.total_cobrado_efectivo = sum(
-                envios_efectivo.mapped('total_cobrar')
-            )
-            record.total_cobrado_transferencia = sum(
-                envios_transferencia.mapped('total_cobrar')
-            )
-            
-            _logger.debug(
-                'Totales por forma de pago para %s: Efectivo $%.2f, '
-                'Transferencia $%.2f',
-                record.name,
-                record.total_cobrado_efectivo,
-                record.total_cobrado_transferencia,
-            )
+        fecha_ids = [id_ for id_ in self._origin.ids if id_]
+        if not fecha_ids:
+            return {}
+        
+        grupos = self.env['paqueteria.maleta']._read_group(
+            [('fecha_envio_id', 'in', fecha_ids)],
+            ['fecha_envio_id'],
+            ['__count'],
+        )
+        return {fecha.id: cantidad for fecha, cantidad in grupos}
     
     @api.depends('envio_ids.provincia_id')
+    @perfilar
     def _compute_provincias(self):
         """Lista las provincias de destino únicas.
         
+        Obtiene los pares fecha-provincia de todas las fechas visibles
+        con una sola consulta agrupada, sin cargar sus envíos.
+        
         Muestra hasta 3 provincias, si hay más agrega "... (+N)"
         Ejemplo: "La Habana, Santiago de Cuba, Holguín... (+2)"
         """
+        guardadas = self.filtered('id')
+        provincias_por_fecha = defaultdict(set)
+        if guardadas:
+            grupos = self.env['paqueteria.envio']._read_group(
+                [('fecha_envio_id', 'in', guardadas.ids)],
+                ['fecha_envio_id', 'provincia_id'],
+            )
+            for fecha, provincia in grupos:
+                if provincia:
+                    provincias_por_fecha[fecha.id].add(provincia.name)
+        
         for record in self:
-            provincias = record.envio_ids.mapped('provincia_id.name')
+            if record.id:
+                provincias = provincias_por_fecha[record.id]
+            else:
+                provincias = set(record.envio_ids.provincia_id.mapped('name'))
             if provincias:
-                # Obtener provincias únicas
-                provincias_unicas = sorted(set(provincias))
+                provincias_unicas = sorted(provincias)
                 
                 if len(provincias_unicas) <= 3:
                     record.provincias_destino = ', '.join(provincias_unicas)
@@ -217,4 +253,500 @@ class PaqueteriaFechaEnvio(models.Model):
                     restantes = len(provincias_unicas) - 3
                     record.provincias_destino = f"{primeras_tres}... (+{restantes})"
             else:
-                record.provincias_destino = 'Sin envíos'
\ No newline at end of file
+                record.provincias_destino = 'Sin envíos'
+    
+    # ========== CRUD METHODS ==========
+    
+    def write(self, vals):
+        """Reprecia los envíos en SQL cuando la fecha cambia de día.
+        
+        La tarifa por libra depende del día de la fecha de envío. El
+        recálculo se hace con _recalcular_precios_sql, que también
+        recalcula los totales de la fecha, en lugar de un recálculo del
+        ORM envío por envío que no registraría deltas.
+        """
+        resultado = super().write(vals)
+        if 'fecha' in vals:
+            self._recalcular_precios_sql()
+        return resultado
+    
+    # ========== ACTION METHODS ==========
+    
+    def action_recalcular_precios(self):
+        """Recalcula los precios de todos los envíos de las fechas.
+        
+        Returns:
+            dict: Notificación con la cantidad de envíos actualizados
+        """
+        total = self._recalcular_precios_sql()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Precios recalculados'),
+                'message': _('%s envío(s) actualizados con las tarifas vigentes.', total),
+                'type': 'success',
+                'sticky': False,
+            },
+        }
+    
+    def action_empacar_maletas(self):
+        """Distribuye el peso pendiente de los envíos en las maletas.
+        
+        Returns:
+            dict: Notificación con el llenado de cada maleta
+        """
+        self.ensure_one()
+        resultado = self._empacar_maletas()
+        
+        lineas = [
+            _('%(maleta)s: %(peso).2f / %(capacidad).2f lb (%(llenado).0f%%)',
+              maleta=maleta.name, peso=maleta.peso_total,
+              capacidad=maleta.capacidad_peso,
+              llenado=maleta.porcentaje_llenado)
+            for maleta in resultado['maletas']
+        ]
+        if resultado['sin_asignar']:
+            lineas.append(_(
+                '%(peso).2f lb de %(envios)s envío(s) no caben en las maletas.',
+                peso=sum(resultado['sin_asignar'].values()),
+                envios=len(resultado['sin_asignar']),
+            ))
+        
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('%s distribución(es) creadas', len(resultado['distribuciones'])),
+                'message': '\n'.join(lineas),
+                'type': 'warning' if resultado['sin_asignar'] else 'success',
+                'sticky': True,
+            },
+        }
+    
+    def action_ver_cola_empaque(self):
+        """Abre los envíos de la fecha con peso pendiente de empacar.
+        
+        Returns:
+            dict: Acción de ventana con la cola de empaque de la fecha
+        """
+        self.ensure_one()
+        accion = self.env['ir.actions.act_window']._for_xml_id(
+            'paqueteria_internacional.action_paqueteria_envio_cola_empaque'
+        )
+        accion['domain'] = self.env['paqueteria.envio']._dominio_cola_empaque(self)
+        accion['context'] = {'default_fecha_envio_id': self.id}
+        return accion
+    
+    # ========== EMPAQUE AUTOMÁTICO ==========
+    
+    @perfilar
+    def _empacar_maletas(self):
+        """Reparte el peso pendiente de los envíos en las maletas activas.
+        
+        Toma la cola de empaque de la fecha con una consulta indexada,
+        delega la asignación en empaque.empacar y crea todas las
+        distribuciones en una sola llamada.
+        
+        Returns:
+            dict: distribuciones creadas, maletas usadas (ordenadas por
+                número) y sin_asignar (envio_id → peso que no cupo)
+        """
+        self.ensure_one()
+        inicio = time.perf_counter()
+        Envio = self.env['paqueteria.envio']
+        
+        envios = Envio.search(Envio._dominio_cola_empaque(self))
+        pendientes = [(envio.id, envio.peso_pendiente) for envio in envios]
+        
+        maletas = self.maleta_ids.sorted('numero')
+        capacidades = [
+            (maleta.id, maleta.capacidad_peso - maleta.peso_total)
+            for maleta in maletas
+        ]
+        
+        lineas, sin_asignar = empacar(pendientes, capacidades)
+        distribuciones = self.env['paqueteria.envio.maleta'].create([
+            {
+                'envio_id': envio_id,
+                'maleta_id': maleta_id,
+                'peso_en_maleta': peso,
+                'descripcion_empaque': _('Empaque automático'),
+            }
+            for envio_id, maleta_id, peso in lineas
+        ])
+        
+        _logger.info(
+            'Empaque de %s: %s envíos en %s maletas, %s distribuciones '
+            'en %.3f s',
+            self.name, len(envios), len(maletas), len(distribuciones),
+            time.perf_counter() - inicio,
+        )
+        return {
+            'distribuciones': distribuciones,
+            'maletas': maletas,
+            'sin_asignar': sin_asignar,
+        }
+    
+    # ========== RECÁLCULO MASIVO ==========
+    
+    def _recalcular_precios_sql(self):
+        """Recalcula la tarifa y los totales de los envíos en SQL.
+        
+        Aplica en un único UPDATE sobre paqueteria_envio las mismas
+        reglas que _compute_tarifa, _compute_embalaje y _compute_totales
+        del envío, usando la tarifa vigente en la fecha de cada registro.
+        Después invalida la caché del ORM y recalcula una sola vez los
+        totales de las fechas.
+        
+        Returns:
+            int: Cantidad de envíos actualizados
+        """
+        if not self:
+            return 0
+        
+        Envio = self.env['paqueteria.envio']
+        Tarifa = self.env['paqueteria.tarifa']
+        Envio.flush_model()
+        self.env['paqueteria.provincia'].flush_model(['zona_tarifa'])
+        
+        # Tarifa vigente para cada combinación fecha × cliente × zona
+        tarifas = SQL(', ').join(
+            SQL(
+                '(%s, %s, %s, %s::numeric)',
+                record.id,
+                tipo_cliente,
+                zona_tarifa,
+                Tarifa._obtener_tarifa(tipo_cliente, zona_tarifa, record.fecha),
+            )
+            for record in self
+            for tipo_cliente, _etiqueta in TIPOS_CLIENTE
+            for zona_tarifa, _nombre in ZONAS_TARIFA
+        )
+        embalaje = SQL(
+            'CASE WHEN e.peso_cobrar > 0 '
+            'THEN CEIL(e.peso_cobrar / 10) * 50 ELSE 0 END'
+        )
+        subtotal = SQL('ROUND(COALESCE(e.peso_cobrar, 0) * t.tarifa, 2)')
+        
+        self.env.cr.execute(SQL(
+            """
+            UPDATE paqueteria_envio e
+               SET tarifa_por_lb = t.tarifa,
+                   embalaje = %(embalaje)s,
+                   subtotal_envio = %(subtotal)s,
+                   total_cobrar = %(subtotal)s + %(embalaje)s
+                       + COALESCE(e.impuesto_aduanal, 0)
+                       + COALESCE(e.costo_documentos, 0),
+                   write_uid = %(uid)s,
+                   write_date = NOW() AT TIME ZONE 'UTC'
+              FROM paqueteria_provincia p,
+                   (VALUES %(tarifas)s)
+                       AS t(fecha_envio_id, tipo_cliente, zona_tarifa, tarifa)
+             WHERE e.fecha_envio_id = t.fecha_envio_id
+               AND e.provincia_id = p.id
+               AND e.tipo_cliente = t.tipo_cliente
+               AND p.zona_tarifa = t.zona_tarifa
+            """,
+            embalaje=embalaje,
+            subtotal=subtotal,
+            uid=self.env.uid,
+            tarifas=tarifas,
+        ))
+        total = self.env.cr.rowcount
+        
+        Envio.invalidate_model([
+            'tarifa_por_lb',
+            'embalaje',
+            'subtotal_envio',
+            'total_cobrar',
+            'write_uid',
+            'write_date',
+        ])
+        self._recalcular_totales()
+        
+        _logger.info(
+            'Precios recalculados en SQL para %s: %d envíos',
+            ', '.join(self.mapped('name')),
+            total,
+        )
+        return total
+    
+    # ========== MANTENIMIENTO INCREMENTAL DE TOTALES ==========
+    
+    @api.model
+    @perfilar
+    def _aplicar_deltas(self, antes, despues):
+        """Registra la diferencia entre dos estados de envíos.
+        
+        La diferencia de cada fecha se inserta como delta en la tabla
+        paqueteria_fecha_envio_delta, que solo recibe inserciones, por lo
+        que capturas simultáneas sobre la misma fecha nunca compiten por
+        su fila. Luego se intenta consolidar sin esperar bloqueos; si la
+        fecha está ocupada, el delta queda pendiente para el cron.
+        
+        Args:
+            antes: Diccionario id de envío → (fecha_envio_id, forma_pago,
+                peso_cobrar, total_cobrar) previo a la operación
+            despues: Mismo formato, posterior a la operación (los envíos
+                creados solo aparecen aquí, los eliminados solo en antes)
+        """
+        deltas = defaultdict(lambda: [0, 0.0, 0.0, 0.0, 0.0])
+        for signo, estado in ((-1, antes), (1, despues)):
+            for fecha_id, forma_pago, peso, total in estado.values():
+                if not fecha_id:
+                    continue
+                delta = deltas[fecha_id]
+                delta[0] += signo
+                delta[1] += signo * (peso or 0.0)
+                delta[2] += signo * (total or 0.0)
+                if forma_pago == 'efectivo':
+                    delta[3] += signo * (total or 0.0)
+                elif forma_pago == 'transferencia':
+                    delta[4] += signo * (total or 0.0)
+        
+        filas = []
+        for fecha_id, (cantidad, *importes) in deltas.items():
+            importes = [round(importe, 2) for importe in importes]
+            if cantidad or any(importes):
+                filas.append((fecha_id, cantidad, *importes))
+        if not filas:
+            return
+        
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO paqueteria_fecha_envio_delta
+                   (fecha_envio_id, cantidad, peso, total,
+                    efectivo, transferencia)
+            VALUES %s
+            """,
+            SQL(', ').join(
+                SQL('(%s, %s, %s, %s, %s, %s)', *fila) for fila in filas
+            ),
+        ))
+        self.browse([fila[0] for fila in filas])._consolidar_deltas(
+            sin_espera=True
+        )
+    
+    def _consolidar_deltas(self, sin_espera=False):
+        """Suma a las fechas sus deltas pendientes y los elimina.
+        
+        Bloquea la fila de cada fecha mientras consolida, de modo que
+        dos transacciones nunca consolidan la misma fecha a la vez.
+        
+        Args:
+            sin_espera: Si es True, las fechas bloqueadas o modificadas
+                por otra transacción se omiten en lugar de esperar; sus
+                deltas quedan pendientes para la próxima consolidación
+        
+        Returns:
+            int: Cantidad de fechas consolidadas
+        """
+        if not self:
+            return 0
+        
+        self.flush_recordset(CAMPOS_TOTALES_ENVIOS)
+        if not sin_espera:
+            return self._consolidar_deltas_sql(SQL())
+        
+        try:
+            with self.env.cr.savepoint(flush=False):
+                return self._consolidar_deltas_sql(SQL('SKIP LOCKED'))
+        except (
+            psycopg2.errors.LockNotAvailable,
+            psycopg2.errors.SerializationFailure,
+        ):
+            _logger.debug(
+                'Fechas %s ocupadas, deltas pendientes para el cron',
+                self.ids,
+            )
+            return 0
+    
+    def _consolidar_deltas_sql(self, bloqueo):
+        """Ejecuta la consolidación de deltas de las fechas en un UPDATE."""
+        self.env.cr.execute(SQL(
+            """
+            WITH bloqueadas AS (
+                SELECT id
+                  FROM paqueteria_fecha_envio
+                 WHERE id = ANY(%(ids)s)
+                 ORDER BY id
+                   FOR NO KEY UPDATE %(bloqueo)s
+            ), pendientes AS (
+                DELETE FROM paqueteria_fecha_envio_delta d
+                 USING bloqueadas b
+                 WHERE d.fecha_envio_id = b.id
+             RETURNING d.fecha_envio_id, d.cantidad, d.peso, d.total,
+                       d.efectivo, d.transferencia
+            ), suma AS (
+                SELECT fecha_envio_id,
+                       SUM(cantidad) AS cantidad,
+                       SUM(peso) AS peso,
+                       SUM(total) AS total,
+                       SUM(efectivo) AS efectivo,
+                       SUM(transferencia) AS transferencia
+                  FROM pendientes
+                 GROUP BY fecha_envio_id
+            )
+            UPDATE paqueteria_fecha_envio f
+               SET total_envios = COALESCE(f.total_envios, 0) + s.cantidad,
+                   peso_total = COALESCE(f.peso_total, 0) + s.peso,
+                   total_cobrado = COALESCE(f.total_cobrado, 0) + s.total,
+                   total_cobrado_efectivo =
+                       COALESCE(f.total_cobrado_efectivo, 0) + s.efectivo,
+                   total_cobrado_transferencia =
+                       COALESCE(f.total_cobrado_transferencia, 0)
+                       + s.transferencia,
+                   write_date = now() AT TIME ZONE 'UTC'
+              FROM suma s
+             WHERE f.id = s.fecha_envio_id
+         RETURNING f.id
+            """,
+            ids=self.ids,
+            bloqueo=bloqueo,
+        ))
+        consolidadas = self.browse([fila[0] for fila in self.env.cr.fetchall()])
+        consolidadas.invalidate_recordset(CAMPOS_TOTALES_ENVIOS)
+        return len(consolidadas)
+    
+    @api.model
+    def _cron_consolidar_deltas(self):
+        """Consolida los deltas pendientes de todas las fechas."""
+        self.env.cr.execute(SQL(
+            "SELECT DISTINCT fecha_envio_id FROM paqueteria_fecha_envio_delta"
+        ))
+        fechas = self.browse([fila[0] for fila in self.env.cr.fetchall()])
+        return fechas._consolidar_deltas()
+    
+    def _recalcular_totales(self):
+        """Recalcula desde cero los totales de envíos de las fechas.
+        
+        Los deltas pendientes visibles ya están reflejados en los envíos
+        sumados, por lo que se descartan junto con el recálculo.
+        """
+        if not self:
+            return
+        self.env.cr.execute(SQL(
+            "DELETE FROM paqueteria_fecha_envio_delta "
+            "WHERE fecha_envio_id = ANY(%s)",
+            self.ids,
+        ))
+        totales = self._agregar_totales()
+        for record in self:
+            valores = totales.get(record.id, {})
+            record.write({
+                campo: valores.get(campo, 0)
+                for campo in CAMPOS_TOTALES_ENVIOS
+            })
+    
+    @api.model
+    def _cron_verificar_totales(self):
+        """Corrige las fechas cuyos totales no coinciden con sus envíos.
+        
+        Consolida primero los deltas pendientes, luego compara en una
+        sola consulta los totales guardados contra la suma real de los
+        envíos y recalcula solo las fechas con desvío.
+        """
+        self._cron_consolidar_deltas()
+        self.flush_model(CAMPOS_TOTALES_ENVIOS)
+        self.env['paqueteria.envio'].flush_model([
+            'fecha_envio_id', 'peso_cobrar', 'total_cobrar', 'forma_pago',
+        ])
+        self.env.cr.execute(SQL(
+            """
+            SELECT f.id
+              FROM paqueteria_fecha_envio f
+              LEFT JOIN (
+                    SELECT fecha_envio_id,
+                           COUNT(*) AS cantidad,
+                           SUM(peso_cobrar) AS peso,
+                           SUM(total_cobrar) AS total,
+                           SUM(total_cobrar)
+                               FILTER (WHERE forma_pago = 'efectivo')
+                               AS efectivo,
+                           SUM(total_cobrar)
+                               FILTER (WHERE forma_pago = 'transferencia')
+                               AS transferencia
+                      FROM paqueteria_envio
+                     WHERE fecha_envio_id IS NOT NULL
+                     GROUP BY fecha_envio_id
+                   ) e ON e.fecha_envio_id = f.id
+             WHERE COALESCE(f.total_envios, 0) <> COALESCE(e.cantidad, 0)
+                OR COALESCE(f.peso_total, 0) <> COALESCE(e.peso, 0)
+                OR COALESCE(f.total_cobrado, 0) <> COALESCE(e.total, 0)
+                OR COALESCE(f.total_cobrado_efectivo, 0)
+                       <> COALESCE(e.efectivo, 0)
+                OR COALESCE(f.total_cobrado_transferencia, 0)
+                       <> COALESCE(e.transferencia, 0)
+            """
+        ))
+        fechas = self.browse([fila[0] for fila in self.env.cr.fetchall()])
+        if fechas:
+            _logger.warning(
+                'Totales desfasados en %d fecha(s) de envío, recalculando: %s',
+                len(fechas),
+                ', '.join(fechas.mapped('name')),
+            )
+            fechas._recalcular_totales()
+        return len(fechas)
+
+
+
+class PaqueteriaFechaEnvioDelta(models.Model):
+    """Diferencia pendiente de sumar a los totales de una fecha de envío.
+    
+    Tabla de solo inserción: cada operación sobre envíos agrega una fila
+    y la consolidación las suma a la fecha y las elimina. Se escribe
+    directamente en SQL desde paqueteria.fecha.envio.
+    """
+    
+    _name = 'paqueteria.fecha.envio.delta'
+    _description = 'Delta de Totales de Fecha de Envío'
+    _log_access = False
+    
+    fecha_envio_id = fields.Many2one(
+        'paqueteria.fecha.envio',
+        string='Fecha de Envío',
+        required=True,
+        index=True,
+        ondelete='cascade',
+        help='Fecha cuyos totales se deben ajustar'
+    )
+    
+    cantidad = fields.Integer(
+        string='Envíos',
+        help='Diferencia en la cantidad de envíos'
+    )
+    
+    peso = fields.Float(
+        string='Peso (lb)',
+        digits=(10, 2),
+        help='Diferencia en el peso a cobrar'
+    )
+    
+    total = fields.Float(
+        string='Total ($)',
+        digits=(10, 2),
+        help='Diferencia en el total cobrado'
+    )
+    
+    efectivo = fields.Float(
+        string='Efectivo ($)',
+        digits=(10, 2),
+        help='Diferencia en el total cobrado en efectivo'
+    )
+    
+    transferencia = fields.Float(
+        string='Transferencia ($)',
+        digits=(10, 2),
+        help='Diferencia en el total cobrado por transferencia'
+    )
+
+# Totales de la fecha mantenidos a partir de sus envíos
+CAMPOS_TOTALES_ENVIOS = [
+    'total_envios',
+    'peso_total',
+    'total_cobrado',
+    'total_cobrado_efectivo',
+    'total_cobrado_transferencia',
+]
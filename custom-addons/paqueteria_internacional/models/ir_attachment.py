@@ -0,0 +1,111 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Procesamiento de las fotos de paquetes adjuntas a recepciones."""
+
+import base64
+import logging
+
+from odoo import fields, models
+from odoo.exceptions import UserError
+from odoo.tools.image import image_process
+from odoo.tools.sql import drop_index
+
+_logger = logging.getLogger(__name__)
+
+# Resolución máxima (ancho, alto) de las fotos guardadas
+TAMANO_MAXIMO_FOTO = (1920, 1920)
+
+# Calidad JPEG de las fotos re-codificadas
+CALIDAD_FOTO = 80
+
+# Lado máximo de las miniaturas mostradas en listas y kanban
+TAMANO_MINIATURA = 256
+
+
+class IrAttachment(models.Model):
+    """Extiende ir.attachment con el procesamiento de fotos de paquetes.
+
+    Las fotos se re-codifican a una resolución y calidad acotadas y se
+    les genera una miniatura guardada en la propia fila (sin pasar por
+    el filestore). El archivo re-codificado reemplaza al original, que
+    no se conserva. Las fotos idénticas de una misma recepción se
+    detectan comparando el checksum del archivo re-codificado.
+    """
+
+    _inherit = 'ir.attachment'
+
+    paqueteria_foto = fields.Boolean(
+        string='Foto de Paquete Procesada',
+        readonly=True,
+        copy=False,
+        help='Indica que la foto ya fue re-codificada y tiene miniatura'
+    )
+
+    paqueteria_miniatura = fields.Image(
+        string='Miniatura',
+        max_width=TAMANO_MINIATURA,
+        max_height=TAMANO_MINIATURA,
+        attachment=False,
+        readonly=True,
+        copy=False,
+        help='Versión reducida de la foto para listas y kanban'
+    )
+
+    def init(self):
+        """Elimina el índice de checksum que usaba la deduplicación global."""
+        super().init()
+        drop_index(
+            self.env.cr, 'ir_attachment_paqueteria_foto_checksum_index', self._table
+        )
+
+    def _procesar_fotos_paqueteria(self):
+        """Re-codifica las fotos y les genera miniatura.
+
+        Los adjuntos que no son imágenes o que no se pueden leer se
+        dejan como están.
+
+        Returns:
+            Recordset de los adjuntos procesados
+        """
+        procesadas = self.browse()
+        for adjunto in self.filtered(lambda a: not a.paqueteria_foto):
+            if not (adjunto.mimetype or '').startswith('image/'):
+                continue
+            try:
+                datos = image_process(
+                    adjunto.raw,
+                    size=TAMANO_MAXIMO_FOTO,
+                    quality=CALIDAD_FOTO,
+                    output_format='JPEG',
+                    verify_resolution=True,
+                )
+            except UserError:
+                _logger.warning(
+                    'No se pudo procesar la foto %s (%s)', adjunto.id, adjunto.name
+                )
+                continue
+
+            adjunto.write({
+                'raw': datos,
+                'mimetype': 'image/jpeg',
+                'paqueteria_foto': True,
+                'paqueteria_miniatura': base64.b64encode(datos),
+            })
+            procesadas |= adjunto
+        return procesadas
+
+    def _duplicados_paqueteria(self):
+        """Agrupa las fotos procesadas idénticas dentro de este conjunto.
+
+        Returns:
+            dict: id del adjunto duplicado → adjunto más antiguo con el
+                mismo checksum, que es el que se conserva
+        """
+        originales = {}
+        duplicados = {}
+        for adjunto in self.filtered('paqueteria_foto').sorted('id'):
+            original = originales.setdefault(adjunto.checksum, adjunto)
+            if original != adjunto:
+                duplicados[adjunto.id] = original
+        return duplicados
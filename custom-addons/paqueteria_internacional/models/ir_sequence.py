@@ -0,0 +1,59 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Reserva de bloques de números de secuencia."""
+
+from odoo import api, models
+from odoo.tools import SQL
+
+
+class IrSequence(models.Model):
+    """Extiende ir.sequence para reservar varios números en una sola llamada."""
+
+    _inherit = 'ir.sequence'
+
+    @api.model
+    def _reservar_bloque(self, sequence_code, cantidad):
+        """Reserva ``cantidad`` números consecutivos de una secuencia.
+
+        Para secuencias estándar (sin rangos de fecha) obtiene todos los
+        valores con un único ``nextval`` sobre ``generate_series``, en lugar
+        de una llamada a ``next_by_code`` por registro. Cualquier otra
+        configuración se resuelve número a número con el mecanismo normal.
+
+        Args:
+            sequence_code: Código de la secuencia (ej: 'paqueteria.envio')
+            cantidad: Cantidad de números a reservar
+
+        Returns:
+            list: Números formateados con prefijo/sufijo, en orden.
+                Lista vacía si la secuencia no existe.
+        """
+        if cantidad <= 0:
+            return []
+
+        self.check_access('read')
+        company_id = self.env.company.id
+        sequence = self.search(
+            [
+                ('code', '=', sequence_code),
+                ('company_id', 'in', [company_id, False]),
+            ],
+            order='company_id',
+            limit=1,
+        )
+        if not sequence:
+            return []
+
+        if sequence.implementation != 'standard' or sequence.use_date_range:
+            return [sequence._next() for _i in range(cantidad)]
+
+        self.env.cr.execute(SQL(
+            "SELECT nextval(%s) FROM generate_series(1, %s)",
+            'ir_sequence_%03d' % sequence.id,
+            cantidad,
+        ))
+        return [
+            sequence.get_next_char(numero)
+            for (numero,) in self.env.cr.fetchall()
+        ]
@@ -4,14 +4,16 @@
 """Gestión de maletas físicas para transporte."""
 
 from odoo import api, fields, models
+from .perfilado import perfilar
 
 
 class PaqueteriaMaleta(models.Model):
     """Maletas físicas utilizadas para el transporte de envíos.
     
     Cada maleta puede contener distribuciones de múltiples envíos.
-    El sistema lleva control del peso total y cantidad de envíos
-    que contiene cada maleta.
+    Como las maletas se reutilizan, sus distribuciones se agrupan por
+    viaje (paqueteria.maleta.viaje) y el peso total y la cantidad de
+    envíos de la maleta corresponden solo a su viaje actual.
     """
     
     _name = 'paqueteria.maleta'
@@ -35,26 +37,61 @@ class PaqueteriaMaleta(models.Model):
         help='Color de la maleta para identificación visual (ej: Azul Clara, Negra)'
     )
     
-    # ========== CONTENIDO (DISTRIBUCIONES) ==========
+    # ========== CONTENIDO (VIAJES) ==========
     
     distribucion_ids = fields.One2many(
         'paqueteria.envio.maleta',
         'maleta_id',
         string='Distribuciones en esta Maleta',
-        help='Distribuciones de pesos de envíos que están en esta maleta'
+        help='Todas las distribuciones de pesos de envíos que ha tenido '
+             'esta maleta, en cualquier viaje'
+    )
+    
+    viaje_ids = fields.One2many(
+        'paqueteria.maleta.viaje',
+        'maleta_id',
+        string='Viajes',
+        help='Historial de viajes de la maleta, uno por fecha de envío'
+    )
+    
+    viaje_actual_id = fields.Many2one(
+        'paqueteria.maleta.viaje',
+        string='Viaje Actual',
+        compute='_compute_viaje_actual_id',
+        store=True,
+        help='Viaje de la fecha de envío programada para la maleta, o el '
+             'más reciente si no tiene fecha programada'
+    )
+    
+    distribucion_actual_ids = fields.One2many(
+        related='viaje_actual_id.distribucion_ids',
+        string='Contenido Actual',
+        help='Distribuciones de envíos en la maleta en su viaje actual'
+    )
+    
+    viaje_count = fields.Integer(
+        string='Viajes',
+        compute='_compute_viaje_count',
+        help='Cantidad de viajes realizados por la maleta'
     )
     
     envio_ids = fields.Many2many(
         'paqueteria.envio',
+        'paqueteria_maleta_envio_rel',
+        'maleta_id',
+        'envio_id',
         compute='_compute_envio_ids',
+        store=True,
         string='Envíos',
-        help='Envíos únicos que tienen distribuciones en esta maleta'
+        help='Envíos únicos que tienen distribuciones en esta maleta en '
+             'su viaje actual. Permite buscar en qué maleta va un envío'
     )
     
     envio_count = fields.Integer(
         string='Total de Envíos',
         compute='_compute_envio_count',
-        help='Cantidad de envíos diferentes en esta maleta'
+        store=True,
+        help='Cantidad de envíos diferentes en esta maleta en su viaje actual'
     )
     
     peso_total = fields.Float(
@@ -62,7 +99,22 @@ class PaqueteriaMaleta(models.Model):
         compute='_compute_peso_total',
         store=True,
         digits=(10, 2),
-        help='Suma de pesos de todas las distribuciones en esta maleta'
+        help='Suma de pesos de las distribuciones del viaje actual'
+    )
+    
+    capacidad_peso = fields.Float(
+        string='Capacidad (lb)',
+        default=50.0,
+        digits=(10, 2),
+        help='Peso máximo que admite la maleta. El empaque automático '
+             'no la llena por encima de este valor'
+    )
+    
+    porcentaje_llenado = fields.Float(
+        string='Llenado (%)',
+        compute='_compute_porcentaje_llenado',
+        digits=(10, 1),
+        help='Peso total de la maleta respecto a su capacidad'
     )
     
     # ========== CONTROL ==========
@@ -96,24 +148,121 @@ class PaqueteriaMaleta(models.Model):
         help='Si está inactivo, no aparecerá en las opciones de distribución'
     )
     
+    _sql_constraints = [
+        (
+            'capacidad_peso_positive',
+            'CHECK(capacidad_peso >= 0)',
+            'La capacidad de la maleta no puede ser negativa',
+        ),
+    ]
+    
     # ========== COMPUTED METHODS ==========
     
-    @api.depends('distribucion_ids.envio_id')
+    @api.depends('fecha_envio_id', 'viaje_ids.fecha_envio_id')
+    @perfilar
+    def _compute_viaje_actual_id(self):
+        """Determina el viaje actual sin cargar el historial de viajes.
+        
+        Las maletas con fecha programada buscan su viaje de esa fecha;
+        las demás toman su viaje más reciente con una consulta agrupada.
+        """
+        Viaje = self.env['paqueteria.maleta.viaje']
+        con_fecha = self.filtered('fecha_envio_id')
+        sin_fecha = self - con_fecha
+        
+        actuales = {
+            (viaje.maleta_id.id, viaje.fecha_envio_id.id): viaje
+            for viaje in Viaje.search([
+                ('maleta_id', 'in', con_fecha._origin.ids),
+                ('fecha_envio_id', 'in', con_fecha.fecha_envio_id.ids),
+            ])
+        } if con_fecha._origin else {}
+        recientes = {
+            maleta.id: Viaje.browse(viaje_id)
+            for maleta, viaje_id in Viaje._read_group(
+                [('maleta_id', 'in', sin_fecha._origin.ids)],
+                ['maleta_id'],
+                ['id:max'],
+            )
+        } if sin_fecha._origin else {}
+        
+        for record in self:
+            if record.fecha_envio_id:
+                record.viaje_actual_id = actuales.get(
+                    (record._origin.id, record.fecha_envio_id.id), Viaje
+                )
+            else:
+                record.viaje_actual_id = recientes.get(record._origin.id, Viaje)
+    
+    @perfilar
+    def _compute_viaje_count(self):
+        """Cuenta los viajes de las maletas con una consulta agrupada."""
+        viajes = dict(self.env['paqueteria.maleta.viaje']._read_group(
+            [('maleta_id', 'in', self._origin.ids)],
+            ['maleta_id'],
+            ['__count'],
+        ))
+        for record in self:
+            record.viaje_count = viajes.get(record._origin, 0)
+    
+    @api.depends('viaje_actual_id.distribucion_ids.envio_id')
+    @perfilar
     def _compute_envio_ids(self):
-        """Obtiene los envíos únicos que tienen distribuciones en esta maleta."""
+        """Obtiene los envíos únicos del viaje actual de cada maleta.
+        
+        Solo se recalcula para las maletas cuyas distribuciones cambian,
+        resolviendo todo el lote con una consulta agrupada.
+        """
+        viajes = self.viaje_actual_id.filtered('id')
+        envios = dict(self.env['paqueteria.envio.maleta']._read_group(
+            [('viaje_id', 'in', viajes.ids)],
+            ['viaje_id'],
+            ['envio_id:recordset'],
+        )) if viajes else {}
+        
         for record in self:
-            record.envio_ids = record.distribucion_ids.mapped('envio_id')
+            viaje = record.viaje_actual_id
+            if viaje.id:
+                record.envio_ids = envios.get(viaje, self.env['paqueteria.envio'])
+            else:
+                record.envio_ids = viaje.distribucion_ids.envio_id
     
-    @api.depends('envio_ids')
+    @api.depends('viaje_actual_id.envio_count')
+    @perfilar
     def _compute_envio_count(self):
-        """Cuenta los envíos únicos en la maleta."""
+        """Toma la cantidad de envíos del viaje actual."""
         for record in self:
-            record.envio_count = len(record.envio_ids)
+            record.envio_count = record.viaje_actual_id.envio_count
     
-    @api.depends('distribucion_ids.peso_en_maleta')
+    @api.depends('viaje_actual_id.peso_total')
+    @perfilar
     def _compute_peso_total(self):
-        """Calcula el peso total sumando todas las distribuciones."""
+        """Toma el peso total del viaje actual."""
+        for record in self:
+            record.peso_total = record.viaje_actual_id.peso_total
+    
+    @api.depends('peso_total', 'capacidad_peso')
+    @perfilar
+    def _compute_porcentaje_llenado(self):
+        """Calcula qué porcentaje de la capacidad ocupa el peso total."""
         for record in self:
-            record.peso_total = sum(
-                record.distribucion_ids.mapped('peso_en_maleta')
-            )
\ No newline at end of file
+            record.porcentaje_llenado = (
+                record.peso_total / record.capacidad_peso * 100
+                if record.capacidad_peso else 0.0
+            )
+    
+    # ========== ACTION METHODS ==========
+    
+    def action_ver_viajes(self):
+        """Abre el historial de viajes de la maleta.
+        
+        Returns:
+            dict: Acción de ventana con los viajes de la maleta
+        """
+        self.ensure_one()
+        accion = self.env['ir.actions.act_window']._for_xml_id(
+            'paqueteria_internacional.action_paqueteria_maleta_viaje'
+        )
+        accion['domain'] = [('maleta_id', '=', self.id)]
+        accion['context'] = {'default_maleta_id': self.id}
+        return accion
@@ -0,0 +1,232 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Uso de una maleta física en un viaje (fecha de envío)."""
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+from odoo.tools.sql import column_exists
+from .perfilado import perfilar
+
+
+class PaqueteriaMaletaViaje(models.Model):
+    """Viaje de una maleta: la maleta física en una fecha de envío.
+
+    Las maletas se reutilizan en cada viaje. Cada viaje agrupa las
+    distribuciones de envíos de esa fecha y guarda su propio peso y
+    cantidad de envíos, de modo que los totales de la maleta solo
+    cubren su viaje actual y el historial se consulta sin cargarlo.
+    """
+
+    _name = 'paqueteria.maleta.viaje'
+    _description = 'Viaje de Maleta'
+    _order = 'fecha desc, maleta_id'
+
+    maleta_id = fields.Many2one(
+        'paqueteria.maleta',
+        string='Maleta',
+        required=True,
+        index=True,
+        ondelete='cascade',
+        help='Maleta física utilizada en el viaje'
+    )
+
+    fecha_envio_id = fields.Many2one(
+        'paqueteria.fecha.envio',
+        string='Fecha de Envío',
+        required=True,
+        index=True,
+        ondelete='restrict',
+        help='Fecha de envío del viaje. Las distribuciones de envíos sin '
+             'fecha asignada no pertenecen a ningún viaje'
+    )
+
+    fecha = fields.Date(
+        related='fecha_envio_id.fecha',
+        string='Fecha',
+        store=True,
+        help='Fecha del viaje (para ordenar y agrupar)'
+    )
+
+    distribucion_ids = fields.One2many(
+        'paqueteria.envio.maleta',
+        'viaje_id',
+        string='Distribuciones',
+        help='Distribuciones de envíos guardadas en la maleta en este viaje'
+    )
+
+    # ========== TOTALES DEL VIAJE ==========
+
+    peso_total = fields.Float(
+        string='Peso Total (lb)',
+        compute='_compute_totales',
+        store=True,
+        digits=(10, 2),
+        help='Suma de pesos de las distribuciones del viaje'
+    )
+
+    envio_count = fields.Integer(
+        string='Total de Envíos',
+        compute='_compute_totales',
+        store=True,
+        help='Cantidad de envíos diferentes en la maleta en este viaje'
+    )
+
+    capacidad_peso = fields.Float(
+        related='maleta_id.capacidad_peso',
+        string='Capacidad (lb)',
+        help='Peso máximo que admite la maleta'
+    )
+
+    porcentaje_llenado = fields.Float(
+        string='Llenado (%)',
+        compute='_compute_porcentaje_llenado',
+        digits=(10, 1),
+        help='Peso del viaje respecto a la capacidad de la maleta'
+    )
+
+    _sql_constraints = [
+        (
+            'maleta_fecha_unique',
+            'UNIQUE(maleta_id, fecha_envio_id)',
+            'La maleta ya tiene un viaje en esa fecha de envío',
+        ),
+    ]
+
+    def _auto_init(self):
+        """Elimina los viajes sin fecha antes de exigir la fecha de envío.
+
+        Versiones anteriores creaban un viaje con fecha vacía para las
+        distribuciones de envíos sin fecha. La restricción UNIQUE no los
+        protegía de duplicados, así que se desvinculan sus distribuciones
+        y se borran para que la columna pueda pasar a NOT NULL.
+        """
+        cr = self.env.cr
+        if column_exists(cr, self._table, 'fecha_envio_id'):
+            cr.execute(SQL(
+                """
+                UPDATE paqueteria_envio_maleta SET viaje_id = NULL
+                 WHERE viaje_id IN (
+                     SELECT id FROM %(tabla)s WHERE fecha_envio_id IS NULL
+                 );
+                DELETE FROM %(tabla)s WHERE fecha_envio_id IS NULL;
+                """,
+                tabla=SQL.identifier(self._table),
+            ))
+        return super()._auto_init()
+
+    # ========== COMPUTED METHODS ==========
+
+    @api.depends('maleta_id.name', 'fecha_envio_id.name')
+    def _compute_display_name(self):
+        """Muestra la maleta junto con la fecha del viaje."""
+        for record in self:
+            record.display_name = ' - '.join(filter(None, [
+                record.maleta_id.name, record.fecha_envio_id.name,
+            ]))
+
+    @api.depends('distribucion_ids.peso_en_maleta', 'distribucion_ids.envio_id')
+    @perfilar
+    def _compute_totales(self):
+        """Calcula peso y envíos de todos los viajes con una consulta agrupada."""
+        guardados = self.filtered('id')
+        totales = {
+            viaje.id: (peso, envios)
+            for viaje, peso, envios in self.env['paqueteria.envio.maleta']._read_group(
+                [('viaje_id', 'in', guardados.ids)],
+                ['viaje_id'],
+                ['peso_en_maleta:sum', 'envio_id:count_distinct'],
+            )
+        } if guardados else {}
+
+        for record in self:
+            if record.id:
+                record.peso_total, record.envio_count = totales.get(
+                    record.id, (0.0, 0)
+                )
+            else:
+                record.peso_total = sum(
+                    record.distribucion_ids.mapped('peso_en_maleta')
+                )
+                record.envio_count = len(record.distribucion_ids.envio_id)
+
+    @api.depends('peso_total', 'capacidad_peso')
+    @perfilar
+    def _compute_porcentaje_llenado(self):
+        """Calcula qué porcentaje de la capacidad ocupa el viaje."""
+        for record in self:
+            record.porcentaje_llenado = (
+                record.peso_total / record.capacidad_peso * 100
+                if record.capacidad_peso else 0.0
+            )
+
+    # ========== BUSINESS METHODS ==========
+
+    @api.model
+    def _obtener_viajes(self, pares):
+        """Devuelve los viajes de cada par maleta-fecha, creando los faltantes.
+
+        Inserta los faltantes en una sola sentencia con ``ON CONFLICT DO
+        NOTHING`` y luego lee todos los viajes de los pares, así que dos
+        empacadores que crean el mismo viaje a la vez no chocan con la
+        restricción única: si el otro ya confirmó, la base pide reintentar
+        la transacción en vez de dar un IntegrityError. Los pares sin
+        maleta o sin fecha de envío no tienen viaje.
+
+        Args:
+            pares: Iterable de (maleta_id, fecha_envio_id o False)
+
+        Returns:
+            dict: (maleta_id, fecha_envio_id) → id del viaje
+        """
+        pares = sorted({
+            (maleta, fecha) for maleta, fecha in pares if maleta and fecha
+        })
+        if not pares:
+            return {}
+
+        maletas = [maleta for maleta, _fecha in pares]
+        fechas = [fecha for _maleta, fecha in pares]
+        self.env['paqueteria.fecha.envio'].flush_model(['fecha'])
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO %(tabla)s
+                   (maleta_id, fecha_envio_id, fecha, peso_total, envio_count,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT par.maleta_id, par.fecha_envio_id, f.fecha, 0, 0,
+                   %(uid)s, now() AT TIME ZONE 'UTC',
+                   %(uid)s, now() AT TIME ZONE 'UTC'
+              FROM unnest(%(maletas)s::int[], %(fechas)s::int[])
+                   AS par(maleta_id, fecha_envio_id)
+              JOIN paqueteria_fecha_envio f ON f.id = par.fecha_envio_id
+            ON CONFLICT (maleta_id, fecha_envio_id) DO NOTHING
+            RETURNING id
+            """,
+            tabla=SQL.identifier(self._table),
+            uid=self.env.uid,
+            maletas=maletas,
+            fechas=fechas,
+        ))
+        nuevos = self.browse([fila[0] for fila in self.env.cr.fetchall()])
+        if nuevos:
+            # Las maletas recalculan su viaje actual como con create()
+            self.env['paqueteria.maleta'].invalidate_model(['viaje_ids'])
+            nuevos.modified(['maleta_id', 'fecha_envio_id'], create=True)
+
+        self.env.cr.execute(SQL(
+            """
+            SELECT v.maleta_id, v.fecha_envio_id, v.id
+              FROM %(tabla)s v
+              JOIN unnest(%(maletas)s::int[], %(fechas)s::int[])
+                   AS par(maleta_id, fecha_envio_id)
+                ON par.maleta_id = v.maleta_id
+               AND par.fecha_envio_id = v.fecha_envio_id
+            """,
+            tabla=SQL.identifier(self._table),
+            maletas=maletas,
+            fechas=fechas,
+        ))
+        return {
+            (maleta, fecha): viaje
+            for maleta, fecha, viaje in self.env.cr.fetchall()
+        }
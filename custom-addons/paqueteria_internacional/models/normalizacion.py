@@ -0,0 +1,32 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Normalización de nombres y teléfonos para búsquedas."""
+
+import re
+import unicodedata
+
+_NO_DIGITOS = re.compile(r'\D+')
+
+
+def normalizar_nombre(texto):
+    """Convierte un nombre a minúsculas, sin acentos ni espacios extra.
+
+    Ejemplo: '  José  PÉREZ ' → 'jose perez'
+    """
+    if not texto:
+        return ''
+    descompuesto = unicodedata.normalize('NFKD', texto)
+    sin_acentos = ''.join(
+        caracter for caracter in descompuesto
+        if not unicodedata.combining(caracter)
+    )
+    return ' '.join(sin_acentos.lower().split())
+
+
+def normalizar_telefono(texto):
+    """Deja solo los dígitos de un teléfono.
+
+    Ejemplo: '+53 (5) 123-4567' → '5351234567'
+    """
+    return _NO_DIGITOS.sub('', texto or '')
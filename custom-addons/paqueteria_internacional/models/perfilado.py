@@ -0,0 +1,326 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Perfilado opcional de los métodos de paquetería.
+
+El decorador ``perfilar`` mide tiempo, cantidad de registros y consultas
+SQL de cada llamada cuando el parámetro del sistema
+``paqueteria.perfilado.activo`` vale ``1``. Las mediciones se guardan en
+un buffer circular en memoria por base de datos y se vuelcan al modelo
+paqueteria.perfil.operacion por lotes. Desactivado, el costo por llamada
+es una lectura cacheada del parámetro.
+
+El buffer es propio de cada proceso: en un despliegue con varios
+workers cada uno acumula y vuelca sus propias mediciones. El volcado se
+hace después del commit de la transacción medida, cuando el buffer
+alcanza LOTE_VOLCADO mediciones o pasaron INTERVALO_VOLCADO segundos
+desde el último, con un cursor propio fuera de la llamada medida. Las
+mediciones que un worker no alcanzó a volcar se pierden si el worker se
+recicla.
+"""
+
+import functools
+import logging
+import time
+from collections import defaultdict, deque
+
+from odoo import SUPERUSER_ID, api, fields, models, tools
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+# Parámetros del sistema
+PARAMETRO_ACTIVO = 'paqueteria.perfilado.activo'
+PARAMETRO_UMBRAL_LENTO = 'paqueteria.perfilado.umbral_lento'
+
+# Segundos a partir de los que una operación se registra como lenta
+UMBRAL_LENTO = 1.0
+
+# Mediciones guardadas en memoria por base de datos (las más viejas se pierden)
+TAMANO_BUFFER = 5000
+
+# Mediciones acumuladas que disparan un volcado automático
+LOTE_VOLCADO = 500
+
+# Segundos desde el último volcado que disparan uno nuevo
+INTERVALO_VOLCADO = 60
+
+# Buffer circular de mediciones por nombre de base de datos
+_BUFFERS = defaultdict(lambda: deque(maxlen=TAMANO_BUFFER))
+
+# Momento (time.monotonic) del último volcado por nombre de base de datos
+_ULTIMO_VOLCADO = defaultdict(time.monotonic)
+
+# Clave en cr.postcommit.data que evita programar dos volcados por transacción
+CLAVE_POSTCOMMIT = 'paqueteria.perfilado.volcar'
+
+TIPOS_OPERACION = [
+    ('compute', 'Cálculo'),
+    ('constraint', 'Restricción'),
+    ('crud', 'CRUD'),
+    ('otro', 'Otro'),
+]
+
+
+def _tipo_operacion(nombre):
+    """Clasifica un método por su nombre."""
+    if nombre.startswith('_compute_'):
+        return 'compute'
+    if nombre.startswith('_check_'):
+        return 'constraint'
+    if nombre in ('create', 'write', 'unlink'):
+        return 'crud'
+    return 'otro'
+
+
+def perfilar(metodo):
+    """Decora un método de modelo para medirlo cuando el perfilado está activo.
+
+    Se aplica debajo de los decoradores de ``api`` para que estos sigan
+    marcando la función que Odoo registra.
+    """
+    nombre = metodo.__name__
+    tipo = _tipo_operacion(nombre)
+
+    @functools.wraps(metodo)
+    def envoltorio(self, *args, **kwargs):
+        if self.env['ir.config_parameter'].sudo().get_param(PARAMETRO_ACTIVO) != '1':
+            return metodo(self, *args, **kwargs)
+
+        registros = (
+            len(args[0]) if nombre == 'create' and args else len(self)
+        )
+        consultas = self.env.cr.sql_log_count
+        inicio = time.perf_counter()
+        try:
+            return metodo(self, *args, **kwargs)
+        finally:
+            _registrar(self.env, {
+                'modelo': self._name,
+                'metodo': nombre,
+                'tipo': tipo,
+                'registros': registros,
+                'segundos': time.perf_counter() - inicio,
+                'consultas': self.env.cr.sql_log_count - consultas,
+                'fecha': fields.Datetime.now(),
+                'usuario_id': self.env.uid,
+            })
+
+    return envoltorio
+
+
+def _registrar(env, medicion):
+    """Guarda una medición en el buffer y avisa si fue lenta."""
+    umbral = float(
+        env['ir.config_parameter'].sudo().get_param(PARAMETRO_UMBRAL_LENTO)
+        or UMBRAL_LENTO
+    )
+    if medicion['segundos'] >= umbral:
+        _logger.warning(
+            'Operación lenta %s.%s: %.3f s, %s registros, %s consultas',
+            medicion['modelo'], medicion['metodo'], medicion['segundos'],
+            medicion['registros'], medicion['consultas'],
+        )
+
+    dbname = env.cr.dbname
+    buffer = _BUFFERS[dbname]
+    buffer.append(medicion)
+    if (
+        len(buffer) >= LOTE_VOLCADO
+        or time.monotonic() - _ULTIMO_VOLCADO[dbname] >= INTERVALO_VOLCADO
+    ):
+        _programar_volcado(env)
+
+
+def _programar_volcado(env):
+    """Programa el volcado del buffer para después del commit actual.
+
+    Se hace una sola vez por transacción. Si la transacción se revierte
+    el volcado no corre y las mediciones esperan a la siguiente.
+    """
+    postcommit = env.cr.postcommit
+    if postcommit.data.get(CLAVE_POSTCOMMIT):
+        return
+    postcommit.data[CLAVE_POSTCOMMIT] = True
+    postcommit.add(functools.partial(_volcar_despues_commit, env.registry))
+
+
+def _volcar_despues_commit(registry):
+    """Vuelca el buffer del proceso con un cursor propio."""
+    try:
+        with registry.cursor() as cr:
+            api.Environment(cr, SUPERUSER_ID, {})[
+                'paqueteria.perfil.operacion'
+            ]._volcar_buffer()
+    except Exception:
+        _logger.exception('Perfilado: no se pudieron guardar las mediciones')
+
+
+class PaqueteriaPerfilOperacion(models.Model):
+    """Medición de una llamada a un método de paquetería."""
+
+    _name = 'paqueteria.perfil.operacion'
+    _description = 'Perfil de Operación'
+    _order = 'segundos desc'
+    _log_access = False
+
+    modelo = fields.Char(
+        string='Modelo',
+        required=True,
+        index=True,
+        help='Modelo técnico del método medido'
+    )
+
+    metodo = fields.Char(
+        string='Método',
+        required=True,
+        index=True,
+        help='Nombre del método medido'
+    )
+
+    tipo = fields.Selection(
+        selection=TIPOS_OPERACION,
+        string='Tipo',
+        required=True,
+        help='Cálculo, restricción, CRUD u otra operación'
+    )
+
+    registros = fields.Integer(
+        string='Registros',
+        help='Cantidad de registros procesados en la llamada'
+    )
+
+    segundos = fields.Float(
+        string='Segundos',
+        digits=(12, 4),
+        help='Tiempo de reloj de la llamada, incluidas las llamadas anidadas'
+    )
+
+    consultas = fields.Integer(
+        string='Consultas SQL',
+        help='Consultas SQL ejecutadas durante la llamada'
+    )
+
+    fecha = fields.Datetime(
+        string='Fecha',
+        index=True,
+        help='Momento en que terminó la llamada'
+    )
+
+    usuario_id = fields.Many2one(
+        'res.users',
+        string='Usuario',
+        ondelete='set null',
+        help='Usuario que ejecutó la operación'
+    )
+
+    @api.model
+    def _volcar_buffer(self):
+        """Guarda en la base las mediciones en memoria de este proceso.
+
+        Returns:
+            int: Cantidad de mediciones guardadas
+        """
+        _ULTIMO_VOLCADO[self.env.cr.dbname] = time.monotonic()
+        buffer = _BUFFERS[self.env.cr.dbname]
+        mediciones = []
+        while buffer:
+            mediciones.append(buffer.popleft())
+        if mediciones:
+            self.sudo().create(mediciones)
+        return len(mediciones)
+
+    @api.model
+    def _cron_volcar_buffer(self):
+        """Vuelca el buffer del proceso del cron.
+
+        Cada worker vuelca el suyo después de sus propios commits; el
+        cron solo cubre el proceso que lo ejecuta.
+        """
+        total = self._volcar_buffer()
+        if total:
+            _logger.info('Perfilado: %s mediciones guardadas', total)
+
+    def action_volcar_buffer(self):
+        """Vuelca el buffer del proceso actual y recarga la vista.
+
+        Returns:
+            dict: Acción que recarga la vista
+        """
+        self._volcar_buffer()
+        return {'type': 'ir.actions.client', 'tag': 'reload'}
+
+
+class PaqueteriaPerfilResumen(models.Model):
+    """Percentiles de tiempo y consultas por método medido."""
+
+    _name = 'paqueteria.perfil.resumen'
+    _description = 'Resumen de Perfil por Método'
+    _auto = False
+    _order = 'p95 desc'
+
+    modelo = fields.Char(string='Modelo', readonly=True, help='Modelo técnico')
+    metodo = fields.Char(string='Método', readonly=True, help='Método medido')
+    tipo = fields.Selection(
+        selection=TIPOS_OPERACION,
+        string='Tipo',
+        readonly=True,
+        help='Cálculo, restricción, CRUD u otra operación'
+    )
+    llamadas = fields.Integer(
+        string='Llamadas', readonly=True, help='Cantidad de llamadas medidas'
+    )
+    registros = fields.Integer(
+        string='Registros', readonly=True, help='Registros procesados en total'
+    )
+    promedio = fields.Float(
+        string='Promedio (s)', digits=(12, 4), readonly=True,
+        help='Tiempo promedio por llamada'
+    )
+    p50 = fields.Float(
+        string='P50 (s)', digits=(12, 4), readonly=True,
+        help='Mediana del tiempo por llamada'
+    )
+    p95 = fields.Float(
+        string='P95 (s)', digits=(12, 4), readonly=True,
+        help='Percentil 95 del tiempo por llamada'
+    )
+    p99 = fields.Float(
+        string='P99 (s)', digits=(12, 4), readonly=True,
+        help='Percentil 99 del tiempo por llamada'
+    )
+    maximo = fields.Float(
+        string='Máximo (s)', digits=(12, 4), readonly=True,
+        help='Llamada más lenta'
+    )
+    consultas_promedio = fields.Float(
+        string='Consultas Promedio', digits=(12, 1), readonly=True,
+        help='Consultas SQL promedio por llamada'
+    )
+    consultas_maximo = fields.Integer(
+        string='Consultas Máximo', readonly=True,
+        help='Mayor cantidad de consultas SQL en una llamada'
+    )
+
+    def init(self):
+        """Crea la vista SQL con los percentiles por método."""
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(SQL(
+            """
+            CREATE VIEW %s AS
+            SELECT row_number() OVER (ORDER BY modelo, metodo, tipo) AS id,
+                   modelo, metodo, tipo,
+                   COUNT(*) AS llamadas,
+                   SUM(registros) AS registros,
+                   AVG(segundos) AS promedio,
+                   percentile_cont(0.5) WITHIN GROUP (ORDER BY segundos) AS p50,
+                   percentile_cont(0.95) WITHIN GROUP (ORDER BY segundos) AS p95,
+                   percentile_cont(0.99) WITHIN GROUP (ORDER BY segundos) AS p99,
+                   MAX(segundos) AS maximo,
+                   AVG(consultas) AS consultas_promedio,
+                   MAX(consultas) AS consultas_maximo
+              FROM paqueteria_perfil_operacion
+             GROUP BY modelo, metodo, tipo
+            """,
+            SQL.identifier(self._table),
+        ))
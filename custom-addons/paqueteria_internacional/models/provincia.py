@@ -3,14 +3,22 @@
 
 """Gestión de provincias de Cuba."""
 
-from odoo import fields, models
+from odoo import api, fields, models
+from .constants import ZONAS_TARIFA
 
 
 class PaqueteriaProvincia(models.Model):
     """Provincias de Cuba para destinos de envío.
     
     Catálogo de las 16 provincias de Cuba utilizadas para
-    determinar tarifas y destinos de los envíos.
+    determinar tarifas y destinos de los envíos. La zona tarifaria
+    agrupa las provincias que comparten precio por libra e impuesto
+    aduanal.
+    
+    La zona se propone a partir del nombre solo al crear la provincia;
+    después es un dato editable que no cambia al renombrarla. Cambiar
+    la zona no reprecia los envíos ya registrados: sus precios se
+    actualizan solo con "Recalcular Precios" de cada fecha de envío.
     """
     
     _name = 'paqueteria.provincia'
@@ -33,4 +41,24 @@ class PaqueteriaProvincia(models.Model):
         string='Activo',
         default=True,
         help='Si está inactivo, no aparecerá en las opciones de destino'
-    )
\ No newline at end of file
+    )
+    
+    zona_tarifa = fields.Selection(
+        selection=ZONAS_TARIFA,
+        string='Zona Tarifaria',
+        required=True,
+        help='Zona usada para buscar la tarifa por libra y el impuesto '
+             'aduanal de los envíos a esta provincia. Se propone por '
+             'nombre al crear la provincia'
+    )
+    
+    # ========== CRUD METHODS ==========
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Asigna la zona La Habana por nombre, el resto por defecto."""
+        for vals in vals_list:
+            if not vals.get('zona_tarifa'):
+                es_habana = (vals.get('name') or '').strip().lower() == 'la habana'
+                vals['zona_tarifa'] = 'habana' if es_habana else 'resto'
+        return super().create(vals_list)
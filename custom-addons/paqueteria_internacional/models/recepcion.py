@@ -5,12 +5,36 @@
 
 import logging
 
+import psycopg2
+
 from odoo import _, api, fields, models
+from odoo.tools import SQL
+from odoo.tools.sql import column_exists, create_column, create_index
 from .constants import ESTADOS_MEXICO
-from odoo.exceptions import ValidationError
+from .perfilado import perfilar
+from odoo.exceptions import ConcurrencyError, UserError, ValidationError
 
 _logger = logging.getLogger(__name__)
 
+# Campos que se aceptan en cada recepción de una carga por lote
+CAMPOS_LOTE = (
+    'remitente_nombre',
+    'remitente_telefono',
+    'destinatario_nombre',
+    'destinatario_telefono',
+    'provincia_id',
+    'peso_etiqueta',
+    'estado_mexico',
+    'fecha_recepcion',
+    'descripcion_articulos',
+)
+
+# Cantidad máxima de recepciones aceptadas en una carga por lote
+MAXIMO_LOTE = 500
+
+# Configuración de búsqueda de texto completo de la descripción
+CONFIGURACION_TEXTO = 'spanish'
+
 
 class PaqueteriaRecepcion(models.Model):
     """Recepción de paquetes por administrador regional.
@@ -22,6 +46,7 @@ class PaqueteriaRecepcion(models.Model):
     """
     
     _name = 'paqueteria.recepcion'
+    _inherit = 'paqueteria.contacto.mixin'
     _description = 'Recepción de Paquete por Admin Regional'
     _order = 'fecha_recepcion desc, id desc'
     
@@ -50,9 +75,18 @@ class PaqueteriaRecepcion(models.Model):
         selection=ESTADOS_MEXICO,
         string='Estado de México',
         required=True,
+        index=True,
         help='Estado de México donde opera el administrador'
     )
     
+    clave_idempotencia = fields.Char(
+        string='Clave de Sincronización',
+        readonly=True,
+        copy=False,
+        help='Clave generada por el dispositivo que capturó la recepción. '
+             'Evita duplicarla cuando la carga se reintenta'
+    )
+    
     fecha_recepcion = fields.Date(
         string='Fecha de Recepción',
         default=fields.Date.today,
@@ -129,20 +163,277 @@ class PaqueteriaRecepcion(models.Model):
         help='Lista detallada de todos los artículos contenidos en el paquete'
     )
     
+    descripcion_busqueda = fields.Char(
+        string='Artículos Declarados',
+        compute='_compute_descripcion_busqueda',
+        search='_search_descripcion_busqueda',
+        help='Busca en la descripción de artículos por palabras, sin '
+             'importar acentos, plurales ni mayúsculas'
+    )
+    
+    # ========== ENVÍO ==========
+    
+    envio_ids = fields.One2many(
+        'paqueteria.envio',
+        'recepcion_id',
+        string='Envío',
+        readonly=True,
+        help='Envío creado a partir de esta recepción'
+    )
+    
+    enviada = fields.Boolean(
+        string='Enviada',
+        compute='_compute_enviada',
+        search='_search_enviada',
+        help='Indica si la recepción ya se convirtió en un envío'
+    )
+    
+    def init(self):
+        """Instala el índice de texto completo de la descripción.
+        
+        La columna descripcion_tsv no es un campo del ORM: la mantiene un
+        trigger al insertar o modificar la descripción. Se usa un trigger
+        y no un índice de expresión porque unaccent() no es inmutable.
+        """
+        super().init()
+        cr = self.env.cr
+        if not column_exists(cr, self._table, 'descripcion_tsv'):
+            create_column(cr, self._table, 'descripcion_tsv', 'tsvector')
+        
+        cr.execute(SQL(
+            """
+            CREATE OR REPLACE FUNCTION paqueteria_recepcion_descripcion_tsv()
+            RETURNS trigger AS $$
+            BEGIN
+                NEW.descripcion_tsv := %(vector)s;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+            
+            DROP TRIGGER IF EXISTS paqueteria_recepcion_descripcion_tsv
+                ON %(tabla)s;
+            CREATE TRIGGER paqueteria_recepcion_descripcion_tsv
+                BEFORE INSERT OR UPDATE OF descripcion_articulos
+                ON %(tabla)s
+                FOR EACH ROW
+                EXECUTE FUNCTION paqueteria_recepcion_descripcion_tsv();
+            
+            UPDATE %(tabla)s
+               SET descripcion_tsv = %(vector_tabla)s
+             WHERE descripcion_tsv IS NULL;
+            """,
+            tabla=SQL.identifier(self._table),
+            vector=self._sql_tsvector(SQL('NEW.descripcion_articulos')),
+            vector_tabla=self._sql_tsvector(SQL('descripcion_articulos')),
+        ))
+        create_index(
+            cr,
+            '%s_descripcion_tsv_index' % self._table,
+            self._table,
+            ['descripcion_tsv'],
+            method='gin',
+        )
+        # El directorio de clientes busca las recepciones modificadas
+        create_index(
+            cr,
+            'paqueteria_recepcion_write_date_index',
+            self._table,
+            ['write_date'],
+        )
+    
     # ========== COMPUTED METHODS ==========
     
     @api.depends('fotos_ids')
+    @perfilar
     def _compute_fotos_count(self):
-        """Cuenta las fotografías adjuntas a la recepción."""
+        """Cuenta las fotos de todas las recepciones en una consulta.
+        
+        Agrupa directamente la tabla de relación en lugar de leer los
+        adjuntos de cada recepción, de modo que una lista cuesta lo
+        mismo sin importar cuántas filas muestre.
+        """
+        guardadas = self.filtered('id')
+        conteos = {}
+        if guardadas:
+            self.flush_model(['fotos_ids'])
+            self.env.cr.execute(SQL(
+                """
+                SELECT recepcion_id, COUNT(*)
+                  FROM recepcion_attachment_rel
+                 WHERE recepcion_id = ANY(%s)
+                 GROUP BY recepcion_id
+                """,
+                guardadas.ids,
+            ))
+            conteos = dict(self.env.cr.fetchall())
+        
+        for record in self:
+            record.fotos_count = (
+                conteos.get(record.id, 0) if record.id else len(record.fotos_ids)
+            )
+    
+    @api.depends('envio_ids')
+    @perfilar
+    def _compute_enviada(self):
+        """Marca las recepciones convertidas con una consulta agrupada."""
+        guardadas = self.filtered('id')
+        enviadas = {
+            recepcion.id
+            for [recepcion] in self.env['paqueteria.envio'].sudo()._read_group(
+                [('recepcion_id', 'in', guardadas.ids)], ['recepcion_id'],
+            )
+        } if guardadas else set()
+        
         for record in self:
-            record.fotos_count = len(record.fotos_ids)
+            record.enviada = (
+                record.id in enviadas if record.id else bool(record.envio_ids)
+            )
+    
+    def _search_enviada(self, operator, value):
+        """Filtra por conversión con un anti-join sobre el índice de envíos.
+        
+        La condición se arma con (NOT) EXISTS sobre
+        paqueteria_envio.recepcion_id, que está indexada, para que
+        PostgreSQL la resuelva como un (anti-)join aunque haya cientos
+        de miles de recepciones, sin materializar listas de ids.
+        
+        Acepta '=' y '!=' con un booleano, y 'in' y 'not in' con una
+        colección de booleanos, que es como el ORM normaliza los
+        dominios de las vistas como [('enviada', '=', False)].
+        """
+        if operator in ('=', '!='):
+            valores = [value]
+        elif operator in ('in', 'not in') and not isinstance(value, (str, bool)):
+            valores = list(value)
+        else:
+            return NotImplemented
+        if not all(valor is None or isinstance(valor, bool) for valor in valores):
+            return NotImplemented
+        buscadas = {bool(valor) for valor in valores}
+        if operator in ('!=', 'not in'):
+            buscadas = {True, False} - buscadas
+        if not buscadas:
+            return [('id', 'in', [])]
+        if len(buscadas) == 2:
+            return [('id', '!=', False)]
+        pendientes = buscadas == {False}
+        
+        self.env['paqueteria.envio'].flush_model(['recepcion_id'])
+        query = self._search([])
+        query.add_where(SQL(
+            "%s EXISTS (SELECT 1 FROM paqueteria_envio e "
+            "WHERE e.recepcion_id = %s)",
+            SQL('NOT') if pendientes else SQL(),
+            SQL.identifier(query.table, 'id'),
+        ))
+        return [('id', 'in', query)]
+    
+    def _compute_descripcion_busqueda(self):
+        """Campo solo de búsqueda: no tiene valor propio."""
+        self.descripcion_busqueda = False
+    
+    def _search_descripcion_busqueda(self, operator, value):
+        """Permite buscar artículos declarados desde las vistas.
+        
+        Solo acepta 'ilike', el operador con que la vista de búsqueda
+        filtra el campo; el texto se interpreta como búsqueda de texto
+        completo, no como coincidencia exacta.
+        """
+        if operator != 'ilike' or not isinstance(value, str):
+            return NotImplemented
+        return [('id', 'in', self._query_texto(value))]
+    
+    # ========== BÚSQUEDA DE TEXTO COMPLETO ==========
+    
+    @api.model
+    def buscar_articulos(self, texto, domain=None, limit=80):
+        """Busca recepciones por los artículos declarados, por relevancia.
+        
+        Acepta la sintaxis de búsqueda web: palabras sueltas (todas deben
+        aparecer), frases entre comillas, ``or`` y exclusiones con ``-``.
+        
+        Args:
+            texto: Texto a buscar (ej: 'laptop -cargador')
+            domain: Dominio adicional (ej: rango de fecha_recepcion)
+            limit: Cantidad máxima de resultados
+        
+        Returns:
+            Recordset con las recepciones más relevantes primero
+        """
+        query = self._query_texto(texto, domain)
+        query.order = SQL(
+            "ts_rank_cd(%s, %s) DESC, %s DESC",
+            SQL.identifier(query.table, 'descripcion_tsv'),
+            self._sql_tsquery(texto),
+            SQL.identifier(query.table, 'id'),
+        )
+        query.limit = limit
+        return self.browse(query)
+    
+    @api.model
+    def _query_texto(self, texto, domain=None):
+        """Consulta de las recepciones cuya descripción coincide con el texto."""
+        self.flush_model(['descripcion_articulos'])
+        query = self._search(domain or [])
+        query.add_where(SQL(
+            "%s @@ %s",
+            SQL.identifier(query.table, 'descripcion_tsv'),
+            self._sql_tsquery(texto),
+        ))
+        return query
+    
+    @api.model
+    def _sql_tsvector(self, columna):
+        """Vector de búsqueda en español de una columna de texto."""
+        return SQL(
+            "to_tsvector(%s, %s)",
+            CONFIGURACION_TEXTO,
+            self._sql_sin_acentos(SQL("COALESCE(%s, '')", columna)),
+        )
+    
+    @api.model
+    def _sql_tsquery(self, texto):
+        """Consulta de búsqueda en español de un texto de usuario."""
+        return SQL(
+            "websearch_to_tsquery(%s, %s)",
+            CONFIGURACION_TEXTO,
+            self._sql_sin_acentos(SQL('%s', texto or '')),
+        )
+    
+    @api.model
+    def _sql_sin_acentos(self, expresion):
+        """Quita acentos con unaccent() cuando la extensión está instalada."""
+        if self.env.registry.has_unaccent:
+            return SQL('unaccent(%s)', expresion)
+        return expresion
+    
+    # ========== COLA DE PENDIENTES ==========
+    
+    @api.model
+    def _dominio_pendientes_envio(self, estado_mexico=None):
+        """Dominio de las recepciones que todavía no tienen envío.
+        
+        Args:
+            estado_mexico: Clave de ESTADOS_MEXICO opcional para acotar
+        
+        Returns:
+            list: Dominio de búsqueda
+        """
+        dominio = [('enviada', '=', False)]
+        if estado_mexico:
+            dominio.append(('estado_mexico', '=', estado_mexico))
+        return dominio
     
     # ========== CRUD METHODS ==========
     
     @api.model_create_multi
+    @perfilar
     def create(self, vals_list):
         """Crea recepciones generando número de secuencia automático.
         
+        Los números de todas las recepciones sin nombre se reservan en un
+        solo bloque de la secuencia.
+        
         Args:
             vals_list: Lista de diccionarios con valores para crear
             
@@ -152,31 +443,221 @@ class PaqueteriaRecepcion(models.Model):
         Raises:
             ValidationError: Si no se puede generar número de recepción
         """
-        for vals in vals_list:
-            if vals.get('name', 'Nuevo') == 'Nuevo':
-                sequence = self.env['ir.sequence'].next_by_code(
-                    'paqueteria.recepcion'
+        pendientes = [
+            vals for vals in vals_list
+            if vals.get('name', 'Nuevo') == 'Nuevo'
+        ]
+        if pendientes:
+            numeros = self.env['ir.sequence']._reservar_bloque(
+                'paqueteria.recepcion', len(pendientes)
+            )
+            if len(numeros) < len(pendientes):
+                raise ValidationError(
+                    _('No se pudo generar el número de recepción. '
+                      'Verifique que la secuencia esté configurada.')
                 )
-                if not sequence:
-                    raise ValidationError(
-                        _('No se pudo generar el número de recepción. '
-                          'Verifique que la secuencia esté configurada.')
-                    )
-                vals['name'] = sequence
-                
-                _logger.info(
-                    'Creando recepción %s por admin %s',
-                    sequence,
-                    vals.get('admin_id')
+            for vals, numero in zip(pendientes, numeros):
+                vals['name'] = numero
+            
+            _logger.info(
+                'Creando %d recepción(es) por admin %s: %s → %s',
+                len(pendientes),
+                self.env.uid,
+                numeros[0],
+                numeros[-1],
+            )
+        
+        records = super().create(vals_list)
+        if any('fotos_ids' in vals for vals in vals_list):
+            records._procesar_fotos()
+        return records
+    
+    @perfilar
+    def write(self, vals):
+        """Actualiza recepciones procesando las fotos agregadas.
+        
+        Args:
+            vals: Diccionario con valores a actualizar
+        
+        Returns:
+            bool: True si la actualización fue exitosa
+        """
+        result = super().write(vals)
+        if 'fotos_ids' in vals:
+            self._procesar_fotos()
+        return result
+    
+    # ========== CARGA POR LOTE ==========
+    
+    @api.model
+    def recibir_lote(self, recepciones):
+        """Registra un lote de recepciones capturadas sin conexión.
+        
+        Cada recepción trae una clave de idempotencia generada por el
+        dispositivo. Las claves ya registradas no se vuelven a crear, de
+        modo que reintentar la misma carga devuelve los mismos números;
+        una clave repetida dentro del lote se registra una sola vez.
+        Las fotos se crean en un solo lote de adjuntos y las recepciones
+        nuevas en un solo ``create()``. El lote es atómico: si una
+        recepción es inválida no se registra ninguna.
+        
+        Si una carga simultánea registra la misma clave primero, el
+        conflicto se convierte en un ConcurrencyError para que Odoo
+        reintente la petición en una transacción nueva, donde la clave
+        ya se ve como registrada.
+        
+        Args:
+            recepciones: Lista de diccionarios con la clave ``clave``,
+                los campos de CAMPOS_LOTE y opcionalmente ``fotos``, una
+                lista de diccionarios con ``nombre`` y ``datos`` (base64)
+        
+        Returns:
+            list: Un diccionario por recepción, en el orden recibido, con
+                clave, id, name y nueva (False si ya estaba registrada)
+        
+        Raises:
+            UserError: Si el lote es demasiado grande o una recepción no
+                tiene clave o trae campos no permitidos
+            ConcurrencyError: Si otra carga registró alguna de las
+                claves durante esta transacción
+        """
+        if len(recepciones) > MAXIMO_LOTE:
+            raise UserError(
+                _('El lote admite como máximo %s recepciones.', MAXIMO_LOTE)
+            )
+        
+        lote = {}
+        for recepcion in recepciones:
+            clave = str(recepcion.get('clave') or '').strip()
+            if not clave:
+                raise UserError(_('Cada recepción debe tener una clave.'))
+            desconocidos = set(recepcion) - set(CAMPOS_LOTE) - {'clave', 'fotos'}
+            if desconocidos:
+                raise UserError(
+                    _('Campos no permitidos: %s', ', '.join(sorted(desconocidos)))
                 )
+            lote.setdefault(clave, recepcion)
         
-        return super().create(vals_list)
+        try:
+            with self.env.cr.savepoint():
+                nuevas = self._crear_lote(lote)
+        except psycopg2.errors.UniqueViolation as error:
+            # Una carga simultánea registró alguna clave primero. En esta
+            # transacción no se ven sus recepciones, así que se pide a
+            # Odoo reintentar la petición completa con una nueva.
+            raise ConcurrencyError(
+                'Clave de idempotencia registrada por una carga simultánea'
+            ) from error
+        
+        registradas = self._buscar_por_clave(list(lote))
+        return [
+            {
+                'clave': clave,
+                'id': registradas[clave].id,
+                'name': registradas[clave].name,
+                'nueva': registradas[clave] in nuevas,
+            }
+            for clave in (
+                str(recepcion['clave']).strip() for recepcion in recepciones
+            )
+        ]
+    
+    @api.model
+    def _crear_lote(self, lote):
+        """Crea las recepciones del lote cuya clave aún no existe.
+        
+        Args:
+            lote: Diccionario clave → datos de la recepción
+        
+        Returns:
+            Recordset de recepciones creadas
+        """
+        existentes = self._buscar_por_clave(list(lote))
+        faltantes = [clave for clave in lote if clave not in existentes]
+        if not faltantes:
+            return self.browse()
+        
+        fotos = [
+            (clave, foto)
+            for clave in faltantes
+            for foto in lote[clave].get('fotos') or []
+        ]
+        adjuntos = self.env['ir.attachment'].create([
+            {
+                'name': foto.get('nombre') or 'foto.jpg',
+                'datas': foto['datos'],
+                'res_model': self._name,
+            }
+            for _clave, foto in fotos
+        ])
+        fotos_por_clave = {}
+        for (clave, _foto), adjunto in zip(fotos, adjuntos):
+            fotos_por_clave.setdefault(clave, []).append(adjunto.id)
+        
+        return self.create([
+            dict(
+                {campo: lote[clave][campo] for campo in CAMPOS_LOTE if campo in lote[clave]},
+                clave_idempotencia=clave,
+                fotos_ids=[fields.Command.set(fotos_por_clave.get(clave, []))],
+            )
+            for clave in faltantes
+        ])
+    
+    @api.model
+    def _buscar_por_clave(self, claves):
+        """Devuelve un diccionario clave → recepción ya registrada."""
+        return {
+            recepcion.clave_idempotencia: recepcion
+            for recepcion in self.search([('clave_idempotencia', 'in', claves)])
+        }
+    
+    # ========== FOTOS ==========
+    
+    def _procesar_fotos(self):
+        """Re-codifica las fotos nuevas y descarta las duplicadas.
+        
+        Cada foto idéntica a otra de la misma recepción se reemplaza por
+        la más antigua y el adjunto duplicado se elimina si ninguna otra
+        recepción lo usa. Entre recepciones distintas no se comparten
+        adjuntos: cada una conserva los suyos, de modo que eliminar una
+        recepción no borra las fotos de otra. El filestore guarda el
+        contenido por checksum, así que las copias no ocupan espacio extra.
+        """
+        self.fotos_ids._procesar_fotos_paqueteria()
+        
+        reemplazos = {}
+        for record in self:
+            duplicados = record.fotos_ids._duplicados_paqueteria()
+            if duplicados:
+                record.fotos_ids = [fields.Command.set(list(dict.fromkeys(
+                    duplicados.get(foto.id, foto).id for foto in record.fotos_ids
+                )))]
+                reemplazos.update(duplicados)
+        if not reemplazos:
+            return
+        
+        self.flush_model(['fotos_ids'])
+        self.env.cr.execute(SQL(
+            """
+            SELECT DISTINCT attachment_id
+              FROM recepcion_attachment_rel
+             WHERE attachment_id = ANY(%s)
+            """,
+            list(reemplazos),
+        ))
+        en_uso = {fila[0] for fila in self.env.cr.fetchall()}
+        descartadas = set(reemplazos) - en_uso
+        _logger.info('Fotos duplicadas descartadas: %s', len(descartadas))
+        self.env['ir.attachment'].browse(descartadas).unlink()
     
     # ========== ACTION METHODS ==========
     
     def action_ver_fotos(self):
         """Abre ventana para ver las fotografías adjuntas.
         
+        Usa vistas que solo cargan las miniaturas; la foto completa se
+        descarga al abrir o descargar cada adjunto.
+        
         Returns:
             dict: Acción para abrir ventana de attachments
         """
@@ -186,6 +667,11 @@ class PaqueteriaRecepcion(models.Model):
             'type': 'ir.actions.act_window',
             'res_model': 'ir.attachment',
             'view_mode': 'kanban,list,form',
+            'views': [
+                (self.env.ref('paqueteria_internacional.view_paqueteria_foto_kanban').id, 'kanban'),
+                (self.env.ref('paqueteria_internacional.view_paqueteria_foto_list').id, 'list'),
+                (False, 'form'),
+            ],
             'domain': [('id', 'in', self.fotos_ids.ids)],
             'context': {
                 'default_res_model': self._name,
@@ -196,6 +682,7 @@ class PaqueteriaRecepcion(models.Model):
     # ========== CONSTRAINTS ==========
     
     @api.constrains('peso_etiqueta')
+    @perfilar
     def _check_peso_positivo(self):
         """Valida que el peso sea mayor a cero."""
         for record in self:
@@ -210,4 +697,9 @@ class PaqueteriaRecepcion(models.Model):
             'CHECK(peso_etiqueta > 0)',
             'El peso en etiqueta debe ser positivo',
         ),
+        (
+            'clave_idempotencia_unique',
+            'UNIQUE(clave_idempotencia)',
+            'Ya existe una recepción con esa clave de sincronización',
+        ),
     ]
\ No newline at end of file
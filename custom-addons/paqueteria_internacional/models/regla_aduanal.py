@@ -0,0 +1,104 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Reglas de impuesto aduanal por tipo de artículo."""
+
+from odoo import api, fields, models
+from odoo.tools import ormcache
+from .constants import TIPOS_ARTICULO, TIPOS_CLIENTE, ZONAS_TARIFA
+
+
+class PaqueteriaReglaAduanal(models.Model):
+    """Costo unitario de impuesto aduanal para artículos de precio dinámico.
+
+    Define el impuesto por unidad de los artículos tipo celular y
+    laptop/tablet según tipo de cliente y zona de destino, a partir de
+    una fecha de vigencia. Los artículos tipo 'otro' no usan reglas:
+    conservan el precio fijo del catálogo.
+    """
+
+    _name = 'paqueteria.regla.aduanal'
+    _inherit = 'paqueteria.vigencia.mixin'
+    _description = 'Regla de Impuesto Aduanal'
+    _order = 'fecha_desde desc, tipo_articulo, tipo_cliente, zona_tarifa'
+
+    tipo_articulo = fields.Selection(
+        selection=[
+            (clave, etiqueta) for clave, etiqueta in TIPOS_ARTICULO
+            if clave != 'otro'
+        ],
+        string='Tipo de Artículo',
+        required=True,
+        help='Tipo de artículo al que aplica la regla'
+    )
+
+    tipo_cliente = fields.Selection(
+        selection=TIPOS_CLIENTE,
+        string='Tipo de Cliente',
+        required=True,
+        default='normal',
+        help='Tipo de cliente al que aplica la regla'
+    )
+
+    zona_tarifa = fields.Selection(
+        selection=ZONAS_TARIFA,
+        string='Zona Tarifaria',
+        required=True,
+        default='resto',
+        help='Zona de destino a la que aplica la regla'
+    )
+
+    costo_unitario = fields.Float(
+        string='Costo Unitario ($)',
+        required=True,
+        digits=(10, 2),
+        help='Impuesto aduanal cobrado por cada unidad del artículo'
+    )
+
+    _sql_constraints = [
+        (
+            'regla_vigencia_unique',
+            'UNIQUE(tipo_articulo, tipo_cliente, zona_tarifa, fecha_desde)',
+            'Ya existe una regla para ese artículo, cliente, zona y fecha',
+        ),
+        (
+            'costo_unitario_positive',
+            'CHECK(costo_unitario >= 0)',
+            'El costo unitario no puede ser negativo',
+        ),
+    ]
+
+    # ========== CONSULTA CON CACHÉ ==========
+
+    @api.model
+    @ormcache()
+    def _tabla_reglas(self):
+        """Carga las reglas activas.
+
+        Returns:
+            dict: (tipo_articulo, tipo_cliente, zona_tarifa) → tupla de
+                (fecha_desde, costo_unitario) de la más reciente a la
+                más antigua
+        """
+        return self._agrupar_vigencias(
+            ('tipo_articulo', 'tipo_cliente', 'zona_tarifa'),
+            'costo_unitario',
+        )
+
+    @api.model
+    def _obtener_costo(self, tipo_articulo, tipo_cliente, zona_tarifa, fecha):
+        """Devuelve el costo unitario vigente en una fecha.
+
+        Args:
+            tipo_articulo: Clave de TIPOS_ARTICULO
+            tipo_cliente: Clave de TIPOS_CLIENTE
+            zona_tarifa: Clave de ZONAS_TARIFA
+            fecha: Fecha de envío (date)
+
+        Returns:
+            float: Costo unitario, 0.0 si no hay regla vigente
+        """
+        vigencias = self._tabla_reglas().get(
+            (tipo_articulo, tipo_cliente, zona_tarifa), ()
+        )
+        return self._valor_vigente(vigencias, fecha)
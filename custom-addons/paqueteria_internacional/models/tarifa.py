@@ -0,0 +1,90 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Matriz de tarifas por libra configurable."""
+
+from odoo import api, fields, models
+from odoo.tools import ormcache
+from .constants import TIPOS_CLIENTE, ZONAS_TARIFA
+
+
+class PaqueteriaTarifa(models.Model):
+    """Tarifa por libra según tipo de cliente y zona de destino.
+
+    Cada registro define el precio por libra a partir de una fecha de
+    vigencia. Para un envío se usa la tarifa más reciente cuya fecha
+    de vigencia no sea posterior a la fecha de envío. La matriz completa
+    se mantiene en la caché del registro y se invalida al modificarla.
+    """
+
+    _name = 'paqueteria.tarifa'
+    _inherit = 'paqueteria.vigencia.mixin'
+    _description = 'Tarifa por Libra'
+    _order = 'fecha_desde desc, tipo_cliente, zona_tarifa'
+
+    tipo_cliente = fields.Selection(
+        selection=TIPOS_CLIENTE,
+        string='Tipo de Cliente',
+        required=True,
+        default='normal',
+        help='Tipo de cliente al que aplica la tarifa'
+    )
+
+    zona_tarifa = fields.Selection(
+        selection=ZONAS_TARIFA,
+        string='Zona Tarifaria',
+        required=True,
+        default='resto',
+        help='Zona de destino a la que aplica la tarifa'
+    )
+
+    tarifa_por_lb = fields.Float(
+        string='Tarifa por Libra ($)',
+        required=True,
+        digits=(10, 2),
+        help='Precio cobrado por cada libra del peso a cobrar'
+    )
+
+    _sql_constraints = [
+        (
+            'tarifa_vigencia_unique',
+            'UNIQUE(tipo_cliente, zona_tarifa, fecha_desde)',
+            'Ya existe una tarifa para ese cliente, zona y fecha de vigencia',
+        ),
+        (
+            'tarifa_por_lb_positive',
+            'CHECK(tarifa_por_lb >= 0)',
+            'La tarifa por libra no puede ser negativa',
+        ),
+    ]
+
+    # ========== CONSULTA CON CACHÉ ==========
+
+    @api.model
+    @ormcache()
+    def _tabla_tarifas(self):
+        """Carga la matriz de tarifas activas.
+
+        Returns:
+            dict: (tipo_cliente, zona_tarifa) → tupla de
+                (fecha_desde, tarifa_por_lb) ordenada de la más reciente
+                a la más antigua
+        """
+        return self._agrupar_vigencias(
+            ('tipo_cliente', 'zona_tarifa'), 'tarifa_por_lb'
+        )
+
+    @api.model
+    def _obtener_tarifa(self, tipo_cliente, zona_tarifa, fecha):
+        """Devuelve la tarifa por libra vigente en una fecha.
+
+        Args:
+            tipo_cliente: Clave de TIPOS_CLIENTE
+            zona_tarifa: Clave de ZONAS_TARIFA
+            fecha: Fecha de envío (date)
+
+        Returns:
+            float: Tarifa por libra, 0.0 si no hay tarifa vigente
+        """
+        vigencias = self._tabla_tarifas().get((tipo_cliente, zona_tarifa), ())
+        return self._valor_vigente(vigencias, fecha)
@@ -0,0 +1,88 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Base común para tablas de precios con fecha de vigencia."""
+
+from odoo import api, fields, models
+
+
+class PaqueteriaVigenciaMixin(models.AbstractModel):
+    """Registro de precio vigente a partir de una fecha.
+
+    Lo comparten la matriz de tarifas por libra y las reglas de impuesto
+    aduanal: ambas se cargan completas en la caché del registro
+    (``ormcache``) y la invalidan al crear, modificar o eliminar
+    registros, de modo que un cambio de precio no requiere despliegue.
+    """
+
+    _name = 'paqueteria.vigencia.mixin'
+    _description = 'Precio con Fecha de Vigencia'
+
+    fecha_desde = fields.Date(
+        string='Vigente Desde',
+        required=True,
+        default=fields.Date.today,
+        help='Fecha de envío a partir de la cual aplica este precio'
+    )
+
+    active = fields.Boolean(
+        string='Activo',
+        default=True,
+        help='Si está inactivo, no se usa en los cálculos'
+    )
+
+    # ========== CONSULTA CON CACHÉ ==========
+
+    @api.model
+    def _agrupar_vigencias(self, campos_clave, campo_valor):
+        """Carga los registros activos agrupados por clave.
+
+        Args:
+            campos_clave: Campos que forman la clave de búsqueda
+            campo_valor: Campo con el precio a devolver
+
+        Returns:
+            dict: clave → tupla de (fecha_desde, valor) ordenada de la
+                vigencia más reciente a la más antigua
+        """
+        tabla = {}
+        registros = self.sudo().search_read(
+            [],
+            list(campos_clave) + ['fecha_desde', campo_valor],
+            order='fecha_desde desc',
+        )
+        for registro in registros:
+            clave = tuple(registro[campo] for campo in campos_clave)
+            tabla.setdefault(clave, []).append(
+                (registro['fecha_desde'], registro[campo_valor])
+            )
+        return {clave: tuple(valores) for clave, valores in tabla.items()}
+
+    @api.model
+    def _valor_vigente(self, vigencias, fecha, default=0.0):
+        """Devuelve el primer valor cuya vigencia inicia en o antes de fecha."""
+        for fecha_desde, valor in vigencias:
+            if fecha_desde <= fecha:
+                return valor
+        return default
+
+    # ========== CRUD METHODS ==========
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Crea registros e invalida las tablas en caché."""
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        """Modifica registros e invalida las tablas en caché."""
+        result = super().write(vals)
+        self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        """Elimina registros e invalida las tablas en caché."""
+        result = super().unlink()
+        self.env.registry.clear_cache()
+        return result
@@ -1 +1,17 @@
-from . import test_fecha_envio
\ No newline at end of file
+from . import test_fecha_envio
+from . import test_envio_importacion
+from . import test_tarifa
+from . import test_fecha_envio_concurrencia
+from . import test_envio_analisis
+from . import test_empaque
+from . import test_envio_maleta
+from . import test_maleta_viaje
+from . import test_contacto_busqueda
+from . import test_cliente
+from . import test_recepcion_convertir
+from . import test_recepcion_fotos
+from . import test_recepcion_lote
+from . import test_recepcion_texto
+from . import test_rendimiento
+from . import test_presupuesto_consultas
+from . import test_perfilado
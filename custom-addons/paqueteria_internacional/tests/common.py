@@ -0,0 +1,47 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Base común para los tests del módulo de paquetería."""
+
+from odoo.tests import TransactionCase
+
+
+class PaqueteriaCommon(TransactionCase):
+    """Expone los modelos y datos de referencia usados por los tests."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Prepara modelos y provincias compartidos por todos los tests."""
+        super().setUpClass()
+        
+        # Modelos
+        cls.Provincia = cls.env['paqueteria.provincia']
+        cls.Articulo = cls.env['paqueteria.articulo']
+        cls.Recepcion = cls.env['paqueteria.recepcion']
+        cls.FechaEnvio = cls.env['paqueteria.fecha.envio']
+        cls.Envio = cls.env['paqueteria.envio']
+        cls.EnvioArticulo = cls.env['paqueteria.envio.articulo']
+        cls.EnvioMaleta = cls.env['paqueteria.envio.maleta']
+        cls.Maleta = cls.env['paqueteria.maleta']
+        
+        # Provincias precargadas
+        cls.provincia_habana = cls.env.ref(
+            'paqueteria_internacional.provincia_habana'
+        )
+        cls.provincia_santiago = cls.env.ref(
+            'paqueteria_internacional.provincia_santiago_de_cuba'
+        )
+    
+    @classmethod
+    def _vals_envio(cls, **valores):
+        """Devuelve valores mínimos válidos para crear un envío."""
+        vals = {
+            'remitente_nombre': 'Cliente',
+            'destinatario_nombre': 'Destino',
+            'provincia_id': cls.provincia_habana.id,
+            'peso_etiqueta': 10.0,
+            'tipo_cliente': 'normal',
+            'estado_mexico': 'cdmx',
+        }
+        vals.update(valores)
+        return vals
@@ -0,0 +1,204 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Generador reproducible de datos sintéticos de paquetería.
+
+Produce volúmenes realistas (cientos de miles de envíos) para medir el
+rendimiento del módulo. Con la misma semilla genera siempre los mismos
+datos, de modo que las mediciones de dos versiones son comparables.
+"""
+
+import random
+from datetime import date, timedelta
+
+from odoo.tools import split_every
+
+from ..models.constants import ESTADOS_MEXICO, FORMAS_PAGO
+
+NOMBRES = (
+    'María', 'José', 'Juan', 'Ana', 'Luis', 'Carmen', 'Pedro', 'Rosa',
+    'Jorge', 'Elena', 'Miguel', 'Yanet', 'Yoel', 'Dayana', 'Raúl', 'Iliana',
+)
+
+APELLIDOS = (
+    'Pérez', 'González', 'Rodríguez', 'Hernández', 'García', 'Martínez',
+    'López', 'Díaz', 'Fernández', 'Sánchez', 'Ramírez', 'Cruz', 'Morales',
+)
+
+ARTICULOS = (
+    ('iPhone 13', 'celular', 0.0),
+    ('Samsung Galaxy A54', 'celular', 0.0),
+    ('Laptop Dell', 'laptop_tablet', 0.0),
+    ('iPad', 'laptop_tablet', 0.0),
+    ('Mando PS5', 'otro', 15.0),
+    ('Licuadora', 'otro', 10.0),
+    ('Olla de presión', 'otro', 8.0),
+    ('Perfume', 'otro', 5.0),
+)
+
+DESCRIPCIONES = (
+    'ropa', 'zapatos', 'medicinas', 'aseo personal', 'café', 'leche en polvo',
+    'juguetes', 'herramientas', 'laptop', 'celular', 'cargador', 'perfume',
+)
+
+
+class GeneradorDatos:
+    """Crea provincias, artículos, fechas, envíos, líneas y maletas.
+
+    Todos los registros se crean en lotes con ``create()`` múltiple; el
+    generador no hace commit, así que los datos viven en la transacción
+    del test que lo usa.
+    """
+
+    def __init__(self, env, semilla=20240101, tamano_lote=2000):
+        self.env = env
+        self.aleatorio = random.Random(semilla)
+        self.tamano_lote = tamano_lote
+
+    # ========== CATÁLOGOS ==========
+
+    def provincias(self):
+        """Devuelve las provincias precargadas por el módulo."""
+        return self.env['paqueteria.provincia'].search([])
+
+    def articulos(self):
+        """Crea el catálogo de artículos con impuesto aduanal."""
+        return self.env['paqueteria.articulo'].create([
+            {'name': nombre, 'tipo_articulo': tipo, 'costo_aduanal': costo}
+            for nombre, tipo, costo in ARTICULOS
+        ])
+
+    def fechas(self, cantidad, anio=2040):
+        """Crea fechas de envío semanales a partir del año indicado."""
+        inicio = date(anio, 1, 1)
+        return self.env['paqueteria.fecha.envio'].create([
+            {'fecha': inicio + timedelta(weeks=semana)}
+            for semana in range(cantidad)
+        ])
+
+    # ========== ENVÍOS ==========
+
+    def vals_envio(self, fecha=None, provincias=None):
+        """Valores de un envío con datos aleatorios reproducibles."""
+        azar = self.aleatorio
+        provincias = provincias or self.provincias()
+        return {
+            'remitente_nombre': self._nombre(),
+            'remitente_telefono': '55%08d' % azar.randrange(10 ** 8),
+            'destinatario_nombre': self._nombre(),
+            'destinatario_telefono': '53%08d' % azar.randrange(10 ** 8),
+            'provincia_id': azar.choice(provincias).id,
+            'peso_etiqueta': round(azar.lognormvariate(2.3, 0.6), 2),
+            'tipo_cliente': 'vip' if azar.random() < 0.15 else 'normal',
+            'estado_mexico': azar.choice(ESTADOS_MEXICO)[0],
+            'forma_pago': azar.choice(FORMAS_PAGO)[0],
+            'fecha_envio_id': fecha.id if fecha else False,
+        }
+
+    def envios(self, cantidad, fechas):
+        """Crea envíos repartidos entre las fechas, en lotes.
+
+        Args:
+            cantidad: Total de envíos a crear
+            fechas: Recordset de fechas de envío entre las que repartir
+
+        Returns:
+            Recordset de envíos creados
+        """
+        provincias = self.provincias()
+        vals_list = [
+            self.vals_envio(self.aleatorio.choice(fechas), provincias)
+            for _i in range(cantidad)
+        ]
+        Envio = self.env['paqueteria.envio']
+        ids = []
+        for lote in split_every(self.tamano_lote, vals_list):
+            ids += Envio.create(list(lote)).ids
+        return Envio.browse(ids)
+
+    def lineas_articulos(self, envios, articulos, proporcion=0.3):
+        """Agrega artículos con impuesto a una parte de los envíos.
+
+        Args:
+            envios: Envíos candidatos
+            articulos: Catálogo de artículos
+            proporcion: Fracción de envíos que declaran artículos
+
+        Returns:
+            Recordset de líneas creadas
+        """
+        azar = self.aleatorio
+        vals_list = [
+            {
+                'envio_id': envio.id,
+                'articulo_id': azar.choice(articulos).id,
+                'cantidad': azar.randint(1, 3),
+            }
+            for envio in envios
+            if azar.random() < proporcion
+            for _linea in range(azar.randint(1, 2))
+        ]
+        EnvioArticulo = self.env['paqueteria.envio.articulo']
+        ids = []
+        for lote in split_every(self.tamano_lote, vals_list):
+            ids += EnvioArticulo.create(list(lote)).ids
+        return EnvioArticulo.browse(ids)
+
+    def maletas(self, fecha, cantidad, capacidad=50.0):
+        """Crea maletas numeradas para una fecha de envío."""
+        return self.env['paqueteria.maleta'].create([
+            {
+                'name': f'Maleta {numero}',
+                'numero': numero,
+                'fecha_envio_id': fecha.id,
+                'capacidad_peso': capacidad,
+            }
+            for numero in range(1, cantidad + 1)
+        ])
+
+    def distribuir(self, fechas):
+        """Empaca automáticamente los envíos de cada fecha en maletas.
+
+        Crea para cada fecha las maletas necesarias según su peso total
+        y reparte los envíos con el empaque automático.
+
+        Returns:
+            Recordset de distribuciones creadas
+        """
+        Envio = self.env['paqueteria.envio']
+        distribuciones = self.env['paqueteria.envio.maleta']
+        for fecha in fechas:
+            [(peso,)] = Envio._read_group(
+                Envio._dominio_cola_empaque(fecha), [], ['peso_pendiente:sum']
+            )
+            self.maletas(fecha, int((peso or 0.0) // 50) + 2)
+            distribuciones |= fecha._empacar_maletas()['distribuciones']
+        return distribuciones
+
+    # ========== RECEPCIONES ==========
+
+    def recepciones(self, cantidad):
+        """Crea recepciones sin envío con descripciones variadas."""
+        azar = self.aleatorio
+        provincias = self.provincias()
+        return self.env['paqueteria.recepcion'].create([
+            {
+                'remitente_nombre': self._nombre(),
+                'destinatario_nombre': self._nombre(),
+                'provincia_id': azar.choice(provincias).id,
+                'peso_etiqueta': round(azar.lognormvariate(2.3, 0.6), 2),
+                'estado_mexico': azar.choice(ESTADOS_MEXICO)[0],
+                'descripcion_articulos': '\n'.join(
+                    azar.sample(DESCRIPCIONES, azar.randint(1, 4))
+                ),
+            }
+            for _i in range(cantidad)
+        ])
+
+    def _nombre(self):
+        """Nombre completo aleatorio."""
+        azar = self.aleatorio
+        return '%s %s %s' % (
+            azar.choice(NOMBRES), azar.choice(APELLIDOS), azar.choice(APELLIDOS),
+        )
+
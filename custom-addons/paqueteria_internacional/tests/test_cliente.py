@@ -0,0 +1,126 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Tests para el directorio de clientes."""
+
+from odoo.tests import tagged
+
+from .common import PaqueteriaCommon
+
+
+@tagged('post_install', '-at_install')
+class TestPaqueteriaCliente(PaqueteriaCommon):
+    """Tests para el modelo paqueteria.cliente."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Crea envíos de un remitente frecuente con dos destinatarios."""
+        super().setUpClass()
+        cls.Cliente = cls.env['paqueteria.cliente']
+        cls.Envio.create([
+            cls._vals_envio(
+                remitente_nombre='Zacarías Quiñones',
+                remitente_telefono='55 1111 2222',
+                destinatario_nombre='Ana Quiñones',
+                provincia_id=cls.provincia_santiago.id,
+            ),
+            cls._vals_envio(
+                remitente_nombre='ZACARIAS QUIÑONES',
+                remitente_telefono='(55) 1111-2222',
+                destinatario_nombre='Ana Quiñones',
+                provincia_id=cls.provincia_santiago.id,
+            ),
+            cls._vals_envio(
+                remitente_nombre='Zacarías Quiñones',
+                remitente_telefono='5511112222',
+                destinatario_nombre='Luis Quiñones',
+            ),
+        ])
+        cls.Cliente._cron_actualizar_directorio()
+    
+    def test_01_agrupa_por_clave_normalizada(self):
+        """Test que variantes del mismo remitente forman un solo cliente."""
+        cliente = self.Cliente.search([
+            ('nombre_normalizado', '=', 'zacarias quinones'),
+            ('telefono_digitos', '=', '5511112222'),
+        ])
+        self.assertEqual(len(cliente), 1)
+        self.assertEqual(cliente.cantidad_envios, 3)
+        self.assertEqual(cliente.provincia_id, self.provincia_santiago)
+        self.assertEqual(
+            cliente.destinatario_ids.mapped('name'),
+            ['Ana Quiñones', 'Luis Quiñones'],
+        )
+    
+    def test_02_autocompletar(self):
+        """Test del autocompletado por prefijo de nombre y de teléfono."""
+        for texto in ('zacar', 'Zacarías Q', '55 1111'):
+            resultado = self.Cliente.autocompletar(texto)
+            self.assertEqual(len(resultado), 1, texto)
+            self.assertEqual(resultado[0]['cantidad_envios'], 3)
+            self.assertEqual(
+                resultado[0]['destinatarios'][0]['nombre'], 'Ana Quiñones'
+            )
+        self.assertEqual(self.Cliente.autocompletar('z'), [])
+    
+    def test_03_actualizacion_incremental(self):
+        """Test que un nuevo envío actualiza el cliente existente."""
+        self.Envio.create(self._vals_envio(
+            remitente_nombre='Zacarías Quiñones',
+            remitente_telefono='55-1111-2222',
+            destinatario_nombre='Pedro Quiñones',
+        ))
+        self.Cliente._cron_actualizar_directorio()
+        
+        resultado = self.Cliente.autocompletar('zacarias', limite_destinatarios=5)
+        self.assertEqual(resultado[0]['cantidad_envios'], 4)
+        self.assertEqual(len(resultado[0]['destinatarios']), 3)
+    
+    def test_04_remitente_renombrado_o_eliminado(self):
+        """Test que el cron recalcula y elimina las claves abandonadas."""
+        envios = self.Envio.search([
+            ('remitente_nombre_normalizado', '=', 'zacarias quinones'),
+        ])
+        envios.filtered(
+            lambda e: e.destinatario_nombre == 'Luis Quiñones'
+        ).remitente_nombre = 'Zoila Quiñones'
+        self.Cliente._cron_actualizar_directorio()
+        
+        resultado = self.Cliente.autocompletar('zacarias', limite_destinatarios=5)
+        self.assertEqual(resultado[0]['cantidad_envios'], 2)
+        self.assertEqual(
+            [d['nombre'] for d in resultado[0]['destinatarios']], ['Ana Quiñones']
+        )
+        self.assertEqual(self.Cliente.autocompletar('zoila')[0]['cantidad_envios'], 1)
+        
+        envios.unlink()
+        self.Cliente._cron_actualizar_directorio()
+        self.assertEqual(self.Cliente.autocompletar('zacarias'), [])
+        self.assertEqual(self.Cliente.autocompletar('zoila'), [])
+    
+    def test_05_recepcion_convertida_cuenta_una_vez(self):
+        """Test que una recepción convertida en envío no se cuenta doble."""
+        recepcion = self.Recepcion.create({
+            'remitente_nombre': 'Berta Ruiz',
+            'destinatario_nombre': 'Carlos Ruiz',
+            'provincia_id': self.provincia_habana.id,
+            'peso_etiqueta': 5.0,
+            'estado_mexico': 'cdmx',
+            'descripcion_articulos': 'Ropa',
+        })
+        self.Cliente._cron_actualizar_directorio()
+        self.assertEqual(
+            self.Cliente.autocompletar('berta')[0]['destinatarios'][0]['nombre'],
+            'Carlos Ruiz',
+        )
+        
+        fecha = self.FechaEnvio.create({'fecha': '2030-11-01'})
+        self.env['paqueteria.recepcion.convertir'].with_context(
+            active_model='paqueteria.recepcion',
+            active_ids=recepcion.ids,
+        ).create({'fecha_envio_id': fecha.id}).action_convertir()
+        self.Cliente._cron_actualizar_directorio()
+        
+        cliente = self.Cliente.search([('nombre_normalizado', '=', 'berta ruiz')])
+        self.assertEqual(cliente.cantidad_envios, 1)
+        self.assertEqual(cliente.destinatario_ids.cantidad, 1)
@@ -0,0 +1,112 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Tests para la búsqueda aproximada de remitentes y destinatarios."""
+
+from odoo.tests import BaseCase, tagged
+
+from .common import PaqueteriaCommon
+from ..models.normalizacion import normalizar_nombre, normalizar_telefono
+
+
+@tagged('post_install', '-at_install')
+class TestNormalizacion(BaseCase):
+    """Tests para las funciones de normalización."""
+    
+    def test_01_normalizar_nombre(self):
+        """Test que se ignoran acentos, mayúsculas y espacios extra."""
+        self.assertEqual(normalizar_nombre('  José  PÉREZ Núñez '), 'jose perez nunez')
+        self.assertEqual(normalizar_nombre(False), '')
+    
+    def test_02_normalizar_telefono(self):
+        """Test que solo quedan los dígitos del teléfono."""
+        self.assertEqual(normalizar_telefono('+53 (5) 123-4567'), '5351234567')
+        self.assertEqual(normalizar_telefono(None), '')
+
+
+@tagged('post_install', '-at_install')
+class TestPaqueteriaContactoBusqueda(PaqueteriaCommon):
+    """Tests para paqueteria.contacto.mixin en envíos."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Crea envíos con nombres y teléfonos variados."""
+        super().setUpClass()
+        cls.envio_jose, cls.envio_maria = cls.Envio.create([
+            cls._vals_envio(
+                remitente_nombre='José Pérez',
+                remitente_telefono='+52 55 1234 5678',
+            ),
+            cls._vals_envio(
+                remitente_nombre='María González',
+                destinatario_nombre='Ramón Peña',
+                destinatario_telefono='53-5-987-6543',
+            ),
+        ])
+    
+    def test_01_campos_normalizados(self):
+        """Test que nombres y teléfonos se guardan normalizados."""
+        self.assertEqual(self.envio_jose.remitente_nombre_normalizado, 'jose perez')
+        self.assertEqual(self.envio_jose.remitente_telefono_digitos, '525512345678')
+        self.assertEqual(self.envio_maria.destinatario_nombre_normalizado, 'ramon pena')
+    
+    def test_02_busqueda_sin_acentos(self):
+        """Test que la búsqueda ignora acentos y mayúsculas."""
+        self.assertIn(self.envio_jose, self.Envio.buscar_contacto('JOSE perez'))
+        self.assertIn(self.envio_maria, self.Envio.buscar_contacto('ramon'))
+    
+    def test_03_busqueda_por_telefono(self):
+        """Test que se encuentra un envío por parte del teléfono."""
+        resultado = self.Envio.buscar_contacto('987 6543')
+        self.assertIn(self.envio_maria, resultado)
+        self.assertNotIn(self.envio_jose, resultado)
+    
+    def test_04_filtro_de_vista(self):
+        """Test que el campo de búsqueda funciona en dominios."""
+        self.assertIn(
+            self.envio_jose,
+            self.Envio.search([('contacto_busqueda', 'ilike', 'pérez')]),
+        )
+    
+    def test_05_tolera_errores_de_escritura(self):
+        """Test que un error de escritura aún encuentra el nombre."""
+        if not self.env.registry.has_trigram:
+            self.skipTest('pg_trgm no disponible')
+        self.assertEqual(
+            self.Envio.buscar_contacto('Maria Gonzales', limit=1),
+            self.envio_maria,
+        )
+    
+    def test_06_filtro_como_subconsulta(self):
+        """Test que el filtro de vista se resuelve en una sola consulta."""
+        self.env.flush_all()
+        with self.assertQueryCount(__system__=1):
+            envios = self.Envio.search([
+                ('contacto_busqueda', 'ilike', 'ramon'),
+                ('id', 'in', (self.envio_jose | self.envio_maria).ids),
+            ])
+        self.assertEqual(envios, self.envio_maria)
+        self.assertFalse(
+            self.Envio.search([('contacto_busqueda', 'ilike', '!!!')])
+        )
+    
+    def test_07_init_del_mixin_abstracto(self):
+        """Test que inicializar el mixin abstracto no crea índices."""
+        self.env['paqueteria.contacto.mixin'].init()
+    
+    def test_08_nombres_sin_indice_de_trigramas_duplicado(self):
+        """Test que init cambia por B-tree un índice GIN viejo del nombre."""
+        cr = self.env.cr
+        cr.execute(
+            "DROP INDEX paqueteria_envio__remitente_nombre_index;"
+            "CREATE INDEX paqueteria_envio__remitente_nombre_index "
+            "ON paqueteria_envio USING gin (remitente_nombre gin_trgm_ops)"
+        )
+        self.Envio.init()
+        for tabla in ('paqueteria_envio', 'paqueteria_recepcion'):
+            for campo in ('remitente_nombre', 'destinatario_nombre'):
+                cr.execute(
+                    "SELECT indexdef FROM pg_indexes WHERE indexname = %s",
+                    ('%s__%s_index' % (tabla, campo),),
+                )
+                self.assertIn('USING btree', cr.fetchone()[0])
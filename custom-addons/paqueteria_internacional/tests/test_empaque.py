@@ -0,0 +1,96 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Tests para el empaque automático de envíos en maletas."""
+
+import time
+
+from odoo.tests import BaseCase, tagged
+
+from .common import PaqueteriaCommon
+from ..models.empaque import empacar
+
+
+@tagged('post_install', '-at_install')
+class TestEmpacar(BaseCase):
+    """Tests para la función pura empaque.empacar."""
+    
+    def test_01_primero_mas_pesado(self):
+        """Test que los envíos van completos a la primera maleta donde caben."""
+        lineas, sin_asignar = empacar(
+            [(1, 10.0), (2, 30.0), (3, 15.0)],
+            [(100, 40.0), (200, 40.0)],
+        )
+        self.assertEqual(
+            sorted(lineas),
+            [(1, 100, 10.0), (2, 100, 30.0), (3, 200, 15.0)],
+        )
+        self.assertFalse(sin_asignar)
+    
+    def test_02_divide_envio_que_no_cabe(self):
+        """Test que un envío más pesado que cualquier maleta se divide."""
+        lineas, sin_asignar = empacar(
+            [(1, 70.55)],
+            [(100, 50.0), (200, 50.0)],
+        )
+        self.assertEqual(lineas, [(1, 100, 50.0), (1, 200, 20.55)])
+        self.assertFalse(sin_asignar)
+    
+    def test_03_reporta_peso_sin_espacio(self):
+        """Test que el peso que no cabe se reporta sin asignar."""
+        lineas, sin_asignar = empacar(
+            [(1, 30.0), (2, 0.0)],
+            [(100, 20.0), (200, -5.0)],
+        )
+        self.assertEqual(lineas, [(1, 100, 20.0)])
+        self.assertEqual(sin_asignar, {1: 10.0})
+    
+    def test_04_mil_envios_rapido(self):
+        """Test que un día de 1,000 envíos se empaca en mucho menos de 1 s."""
+        pendientes = [(i, 1 + (i * 7) % 60 + 0.25) for i in range(1000)]
+        capacidades = [(m, 50.0) for m in range(800)]
+        
+        inicio = time.perf_counter()
+        lineas, sin_asignar = empacar(pendientes, capacidades)
+        self.assertLess(time.perf_counter() - inicio, 0.5)
+        
+        self.assertFalse(sin_asignar)
+        self.assertAlmostEqual(
+            sum(linea[2] for linea in lineas),
+            sum(peso for _envio, peso in pendientes),
+            places=2,
+        )
+
+
+@tagged('post_install', '-at_install')
+class TestPaqueteriaFechaEnvioEmpaque(PaqueteriaCommon):
+    """Tests para paqueteria.fecha.envio._empacar_maletas."""
+    
+    def test_01_empaca_peso_pendiente(self):
+        """Test que solo se empaca el peso aún no distribuido."""
+        fecha = self.FechaEnvio.create({'fecha': '2030-07-01'})
+        envio_a, envio_b = self.Envio.create([
+            self._vals_envio(fecha_envio_id=fecha.id, peso_etiqueta=30.0),
+            self._vals_envio(fecha_envio_id=fecha.id, peso_etiqueta=40.0),
+        ])
+        maleta_1, maleta_2 = self.Maleta.create([
+            {'name': 'Maleta 1', 'numero': 1, 'capacidad_peso': 50.0,
+             'fecha_envio_id': fecha.id},
+            {'name': 'Maleta 2', 'numero': 2, 'capacidad_peso': 50.0,
+             'fecha_envio_id': fecha.id},
+        ])
+        self.EnvioMaleta.create({
+            'envio_id': envio_a.id,
+            'maleta_id': maleta_1.id,
+            'peso_en_maleta': 10.0,
+            'descripcion_empaque': '1 caja',
+        })
+        
+        resultado = fecha._empacar_maletas()
+        
+        self.assertFalse(resultado['sin_asignar'])
+        self.assertEqual(envio_a.peso_pendiente, 0.0)
+        self.assertEqual(envio_b.peso_pendiente, 0.0)
+        self.assertEqual(maleta_1.peso_total, 50.0)
+        self.assertEqual(maleta_2.peso_total, 20.0)
+        self.assertEqual(maleta_2.porcentaje_llenado, 40.0)
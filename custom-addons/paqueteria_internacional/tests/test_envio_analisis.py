@@ -0,0 +1,99 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Tests para el cubo de análisis de envíos."""
+
+from odoo.tests import tagged
+
+from .common import PaqueteriaCommon
+
+
+@tagged('post_install', '-at_install')
+class TestPaqueteriaEnvioAnalisis(PaqueteriaCommon):
+    """Tests para el modelo paqueteria.envio.analisis."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Prepara una fecha con envíos de distinta provincia y pago."""
+        super().setUpClass()
+        cls.Analisis = cls.env['paqueteria.envio.analisis']
+        cls.fecha_envio = cls.FechaEnvio.create({'fecha': '2030-05-10'})
+        cls.envios = cls.Envio.create([
+            cls._vals_envio(
+                fecha_envio_id=cls.fecha_envio.id, forma_pago='efectivo',
+            ),
+            cls._vals_envio(
+                fecha_envio_id=cls.fecha_envio.id, forma_pago='efectivo',
+            ),
+            cls._vals_envio(
+                fecha_envio_id=cls.fecha_envio.id,
+                forma_pago='transferencia',
+                provincia_id=cls.provincia_santiago.id,
+            ),
+        ])
+    
+    def _filas(self):
+        """Devuelve las filas del cubo para la fecha de prueba."""
+        return self.Analisis.search([
+            ('fecha_envio_id', '=', self.fecha_envio.id),
+        ])
+    
+    def test_01_agrega_por_dimensiones(self):
+        """Test que el cubo agrupa envíos con las mismas dimensiones."""
+        self.Analisis._cron_actualizar()
+        
+        filas = self._filas()
+        self.assertEqual(len(filas), 2)
+        self.assertEqual(sum(filas.mapped('cantidad_envios')), 3)
+        self.assertAlmostEqual(
+            sum(filas.mapped('total_cobrar')),
+            sum(self.envios.mapped('total_cobrar')),
+            places=2,
+        )
+        habana = filas.filtered(
+            lambda f: f.provincia_id == self.provincia_habana
+        )
+        self.assertEqual(habana.cantidad_envios, 2)
+        self.assertEqual(habana.forma_pago, 'efectivo')
+    
+    def test_02_actualizacion_incremental(self):
+        """Test que el cron refleja cambios y bajas de envíos."""
+        self.Analisis._cron_actualizar()
+        
+        self.envios[0].forma_pago = 'transferencia'
+        self.envios[2].unlink()
+        self.Analisis._cron_actualizar()
+        
+        filas = self._filas()
+        self.assertEqual(len(filas), 2)
+        self.assertEqual(sum(filas.mapped('cantidad_envios')), 2)
+        self.assertEqual(
+            set(filas.mapped('forma_pago')), {'efectivo', 'transferencia'}
+        )
+        self.assertFalse(filas.filtered(
+            lambda f: f.provincia_id == self.provincia_santiago
+        ))
+    
+    def test_03_init_no_reconstruye_cubo_existente(self):
+        """Test que actualizar el módulo conserva el cubo ya agregado."""
+        self.Analisis._cron_actualizar()
+        self.envios[0].forma_pago = 'transferencia'
+        
+        def efectivo():
+            return sum(self._filas().filtered(
+                lambda f: f.forma_pago == 'efectivo'
+            ).mapped('cantidad_envios'))
+        
+        self.Analisis.init()
+        self.assertEqual(efectivo(), 2)
+        
+        self.Analisis._cron_actualizar()
+        self.assertEqual(efectivo(), 1)
+    
+    def test_04_init_agrega_cubo_vacio(self):
+        """Test que el cubo vacío se agrega completo al actualizar."""
+        self.env.cr.execute('DELETE FROM paqueteria_envio_analisis')
+        self.Analisis.invalidate_model()
+        
+        self.Analisis.init()
+        self.assertEqual(sum(self._filas().mapped('cantidad_envios')), 3)
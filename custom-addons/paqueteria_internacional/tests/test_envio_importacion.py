@@ -0,0 +1,140 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Tests para la importación masiva de envíos."""
+
+import base64
+
+from odoo.tests import tagged
+
+from .common import PaqueteriaCommon
+
+
+@tagged('post_install', '-at_install')
+class TestPaqueteriaEnvioImportacion(PaqueteriaCommon):
+    """Tests para importar_lote y el asistente de importación."""
+    
+    def setUp(self):
+        """Setup ejecutado antes de cada test."""
+        super().setUp()
+        
+        self.fecha_envio = self.FechaEnvio.create({
+            'fecha': '2026-02-01',
+        })
+    
+    def _fila(self, **valores):
+        """Fila de importación válida con valores sobreescribibles."""
+        fila = {
+            'remitente_nombre': 'Remitente',
+            'destinatario_nombre': 'Destinatario',
+            'provincia': 'La Habana',
+            'peso_etiqueta': '12.5',
+            'estado_mexico': 'cdmx',
+        }
+        fila.update(valores)
+        return fila
+    
+    def test_01_numeros_consecutivos_en_bloque(self):
+        """Test que un create múltiple asigna números consecutivos."""
+        envios = self.Envio.create([
+            self._vals_envio(remitente_nombre=f'Cliente {i}')
+            for i in range(5)
+        ])
+        
+        numeros = [int(name.split('-')[-1]) for name in envios.mapped('name')]
+        self.assertEqual(numeros, list(range(numeros[0], numeros[0] + 5)))
+        self.assertTrue(all(name.startswith('ENV-') for name in envios.mapped('name')))
+    
+    def test_02_importar_lote_valido(self):
+        """Test importación de filas válidas en varios lotes."""
+        filas = [
+            self._fila(remitente_nombre=f'Remitente {i}')
+            for i in range(7)
+        ]
+        
+        resultado = self.Envio.importar_lote(
+            filas,
+            valores_comunes={'fecha_envio_id': self.fecha_envio.id},
+            tamano_lote=3,
+        )
+        
+        self.assertEqual(resultado['total_filas'], 7)
+        self.assertEqual(len(resultado['envios']), 7)
+        self.assertFalse(resultado['errores'])
+        self.assertGreater(resultado['filas_por_segundo'], 0)
+        self.assertEqual(self.fecha_envio.total_envios, 7)
+        self.assertEqual(
+            set(resultado['envios'].mapped('provincia_id')),
+            {self.provincia_habana},
+        )
+    
+    def test_03_errores_por_fila_no_abortan(self):
+        """Test que las filas inválidas se reportan sin detener el lote."""
+        filas = [
+            self._fila(),
+            self._fila(provincia='Provincia Inexistente'),
+            self._fila(peso_etiqueta='abc'),
+            self._fila(remitente_nombre=''),
+            self._fila(tipo_cliente='VIP', forma_pago='Efectivo'),
+        ]
+        
+        resultado = self.Envio.importar_lote(filas, primera_fila=2)
+        
+        self.assertEqual(len(resultado['envios']), 2)
+        self.assertEqual(
+            [fila for fila, _mensaje in resultado['errores']],
+            [3, 4, 5],
+        )
+        vip = resultado['envios'].filtered(lambda e: e.tipo_cliente == 'vip')
+        self.assertEqual(vip.forma_pago, 'efectivo')
+    
+    def test_04_asistente_csv(self):
+        """Test del asistente importando un archivo CSV."""
+        contenido = (
+            'Remitente Nombre;Destinatario Nombre;Provincia;Peso Etiqueta\n'
+            'Ana;Luis;LH;10\n'
+            'Pedro;Marta;Santiago de Cuba;7,5\n'
+        )
+        asistente = self.env['paqueteria.envio.importar'].create({
+            'archivo': base64.b64encode(contenido.encode('utf-8')),
+            'nombre_archivo': 'envios.csv',
+            'fecha_envio_id': self.fecha_envio.id,
+            'estado_mexico': 'jalisco',
+        })
+        
+        asistente.action_importar()
+        
+        self.assertEqual(asistente.state, 'hecho')
+        self.assertEqual(asistente.total_creados, 2)
+        self.assertEqual(asistente.total_errores, 0)
+        self.assertEqual(
+            asistente.envio_ids.mapped('provincia_id'),
+            self.provincia_habana | self.provincia_santiago,
+        )
+        self.assertEqual(
+            sorted(asistente.envio_ids.mapped('peso_etiqueta')),
+            [7.5, 10.0],
+        )
+    
+    def test_05_asistente_numera_filas_con_lineas_vacias(self):
+        """Test que las filas vacías no desplazan los números de error."""
+        contenido = (
+            'Remitente Nombre;Destinatario Nombre;Provincia;Peso Etiqueta\n'
+            'Ana;Luis;LH;10\n'
+            ';;;\n'
+            '\n'
+            'Pedro;Marta;Provincia Inexistente;7,5\n'
+        )
+        asistente = self.env['paqueteria.envio.importar'].create({
+            'archivo': base64.b64encode(contenido.encode('utf-8')),
+            'nombre_archivo': 'envios.csv',
+            'fecha_envio_id': self.fecha_envio.id,
+            'estado_mexico': 'cdmx',
+        })
+        
+        asistente.action_importar()
+        
+        self.assertEqual(asistente.total_filas, 2)
+        self.assertEqual(asistente.total_creados, 1)
+        self.assertEqual(asistente.total_errores, 1)
+        self.assertTrue(asistente.detalle_errores.startswith('Fila 5:'))
@@ -0,0 +1,151 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Tests para la distribución de envíos en maletas."""
+
+from psycopg2 import IntegrityError
+from psycopg2.errors import CheckViolation
+
+from odoo.exceptions import ValidationError
+from odoo.tests import tagged
+from odoo.tools import mute_logger
+
+from .common import PaqueteriaCommon
+
+
+@tagged('post_install', '-at_install')
+class TestPaqueteriaEnvioMaleta(PaqueteriaCommon):
+    """Tests para el modelo paqueteria.envio.maleta."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Prepara un envío de 60 lb y una maleta."""
+        super().setUpClass()
+        cls.envio = cls.Envio.create(cls._vals_envio(peso_etiqueta=60.0))
+        cls.maleta = cls.Maleta.create({'name': 'Maleta 1', 'numero': 1})
+    
+    def _vals_linea(self, peso):
+        """Devuelve valores de una línea de distribución del envío."""
+        return {
+            'envio_id': self.envio.id,
+            'maleta_id': self.maleta.id,
+            'peso_en_maleta': peso,
+            'descripcion_empaque': '1 bolsa',
+        }
+    
+    def test_01_distribucion_completa(self):
+        """Test que se puede distribuir exactamente el peso del envío."""
+        self.EnvioMaleta.create([self._vals_linea(0.1)] * 600)
+        self.assertAlmostEqual(self.envio.peso_pendiente, 0.0, places=2)
+    
+    def test_02_excede_peso(self):
+        """Test que no se puede distribuir más peso que el del envío."""
+        with self.assertRaises(ValidationError):
+            self.EnvioMaleta.create([self._vals_linea(30.0)] * 3)
+    
+    def test_03_peso_no_positivo(self):
+        """Test que el peso en maleta debe ser mayor a 0."""
+        with self.assertRaises(ValidationError):
+            self.EnvioMaleta.create(self._vals_linea(0.0))
+    
+    def test_04_validacion_en_una_consulta(self):
+        """Test que validar muchas líneas no escala con su cantidad."""
+        lineas = self.EnvioMaleta.create([self._vals_linea(0.1)] * 10)
+        with self.assertQueryCount(__system__=2):
+            lineas._check_peso_valido()
+        
+        lineas = self.EnvioMaleta.create([self._vals_linea(0.1)] * 200)
+        with self.assertQueryCount(__system__=2):
+            lineas._check_peso_valido()
+    
+    def test_05_progreso_guardado_y_cola(self):
+        """Test que el progreso se guarda y alimenta la cola de empaque."""
+        fecha = self.FechaEnvio.create({'fecha': '2030-08-01'})
+        self.envio.fecha_envio_id = fecha
+        dominio = self.Envio._dominio_cola_empaque(fecha)
+        self.assertIn(self.envio, self.Envio.search(dominio))
+        
+        self.EnvioMaleta.create([self._vals_linea(20.0)] * 2)
+        self.assertEqual(self.envio.maleta_count, 2)
+        self.assertEqual(self.envio.peso_distribuido, 40.0)
+        self.assertEqual(self.envio.peso_pendiente, 20.0)
+        
+        self.EnvioMaleta.create(self._vals_linea(20.0))
+        self.assertEqual(self.envio.peso_pendiente, 0.0)
+        self.assertNotIn(self.envio, self.Envio.search(dominio))
+        self.assertIn(
+            self.envio,
+            self.Envio.search([('peso_pendiente', '<=', 0), ('maleta_count', '=', 3)]),
+        )
+    
+    def _insertar_sql(self, pesos):
+        """Inserta líneas del envío por SQL directo, sin pasar por el ORM."""
+        self.env.cr.execute(
+            """
+            INSERT INTO paqueteria_envio_maleta
+                   (envio_id, maleta_id, peso_en_maleta, descripcion_empaque)
+            SELECT %s, %s, peso, '1 bolsa' FROM unnest(%s::numeric[]) AS peso
+            """,
+            (self.envio.id, self.maleta.id, pesos),
+        )
+    
+    def _verificar_como_al_confirmar(self):
+        """Ejecuta ahora la verificación diferida que corre al confirmar."""
+        self.env.flush_all()
+        self.env.cr.execute(
+            "SET CONSTRAINTS paqueteria_envio_maleta_check_peso IMMEDIATE"
+        )
+        self.env.cr.execute(
+            "SET CONSTRAINTS paqueteria_envio_maleta_check_peso DEFERRED"
+        )
+    
+    def test_06_salvaguarda_sql_al_confirmar(self):
+        """Test que la base rechaza sobre-distribuir escribiendo por SQL."""
+        self.env.flush_all()
+        self._insertar_sql([0.1] * 600)
+        self._verificar_como_al_confirmar()
+        
+        with mute_logger('odoo.sql_db'), self.assertRaises(CheckViolation):
+            with self.env.cr.savepoint():
+                self._insertar_sql([0.5])
+                self._verificar_como_al_confirmar()
+        
+        with mute_logger('odoo.sql_db'), self.assertRaises(CheckViolation):
+            with self.env.cr.savepoint():
+                self.env.cr.execute(
+                    "UPDATE paqueteria_envio_maleta SET peso_en_maleta = 0.2 "
+                    "WHERE envio_id = %s",
+                    (self.envio.id,),
+                )
+                self._verificar_como_al_confirmar()
+    
+    def test_07_sin_maleta_error_de_campo_requerido(self):
+        """Test que omitir la maleta da el error normal de campo requerido."""
+        vals = self._vals_linea(1.0)
+        del vals['maleta_id']
+        with mute_logger('odoo.sql_db'), self.assertRaises(IntegrityError):
+            with self.env.cr.savepoint():
+                self.EnvioMaleta.create(vals)
+    
+    def test_08_reacomodo_dentro_de_la_transaccion(self):
+        """Test que mover peso entre líneas solo se valida con el estado final."""
+        primera, segunda = self.EnvioMaleta.create([self._vals_linea(30.0)] * 2)
+        self.env.flush_all()
+        
+        # Sentencias separadas: tras la primera el envío suma 70 lb
+        self.env.cr.execute(
+            "UPDATE paqueteria_envio_maleta SET peso_en_maleta = 40 WHERE id = %s",
+            (primera.id,),
+        )
+        self.env.cr.execute(
+            "UPDATE paqueteria_envio_maleta SET peso_en_maleta = 20 WHERE id = %s",
+            (segunda.id,),
+        )
+        self._verificar_como_al_confirmar()
+        self.env.invalidate_all()
+        
+        # Borrar y volver a crear las líneas en la misma transacción
+        self.envio.maleta_distribucion_ids.unlink()
+        self.EnvioMaleta.create([self._vals_linea(20.0)] * 3)
+        self._verificar_como_al_confirmar()
+        self.assertEqual(self.envio.peso_pendiente, 0.0)
@@ -296,4 +296,176 @@ class TestPaqueteriaFechaEnvio(PaqueteriaCommon):
         self.assertEqual(
             self.fecha_envio.total_cobrado_transferencia,
             total_inicial
-        )
\ No newline at end of file
+        )
+    
+    def test_08_mover_envio_entre_fechas(self):
+        """Test que mover un envío descuenta de una fecha y suma a la otra."""
+        otra_fecha = self.FechaEnvio.create({'fecha': '2026-01-22'})
+        envio = self.Envio.create({
+            'remitente_nombre': 'Cliente',
+            'destinatario_nombre': 'Destino',
+            'provincia_id': self.provincia_habana.id,
+            'peso_etiqueta': 10.0,
+            'tipo_cliente': 'normal',
+            'estado_mexico': 'cdmx',
+            'fecha_envio_id': self.fecha_envio.id,
+            'forma_pago': 'transferencia',
+        })
+        total = envio.total_cobrar
+        
+        envio.write({'fecha_envio_id': otra_fecha.id, 'peso_etiqueta': 20.0})
+        
+        self.assertEqual(self.fecha_envio.total_envios, 0)
+        self.assertEqual(self.fecha_envio.peso_total, 0.0)
+        self.assertEqual(self.fecha_envio.total_cobrado_transferencia, 0.0)
+        self.assertEqual(otra_fecha.total_envios, 1)
+        self.assertEqual(otra_fecha.peso_total, 20.0)
+        self.assertEqual(otra_fecha.total_cobrado_transferencia, envio.total_cobrar)
+        self.assertGreater(envio.total_cobrar, total)
+    
+    def test_09_eliminar_envio_y_articulos(self):
+        """Test que artículos y bajas de envíos actualizan los totales."""
+        celular = self.Articulo.create({
+            'name': 'Celular',
+            'tipo_articulo': 'celular',
+        })
+        envio = self.Envio.create({
+            'remitente_nombre': 'Cliente',
+            'destinatario_nombre': 'Destino',
+            'provincia_id': self.provincia_habana.id,
+            'peso_etiqueta': 10.0,
+            'tipo_cliente': 'normal',
+            'estado_mexico': 'cdmx',
+            'fecha_envio_id': self.fecha_envio.id,
+            'forma_pago': 'efectivo',
+            'articulo_ids': [(0, 0, {'articulo_id': celular.id})],
+        })
+        self.assertEqual(self.fecha_envio.total_cobrado, envio.total_cobrar)
+        
+        # Línea agregada directamente, fuera del formulario del envío
+        self.EnvioArticulo.create({
+            'envio_id': envio.id,
+            'articulo_id': celular.id,
+        })
+        self.assertEqual(self.fecha_envio.total_cobrado, envio.total_cobrar)
+        self.assertEqual(self.fecha_envio.total_cobrado_efectivo, envio.total_cobrar)
+        
+        envio.unlink()
+        self.assertEqual(self.fecha_envio.total_envios, 0)
+        self.assertEqual(self.fecha_envio.total_cobrado, 0.0)
+        self.assertEqual(self.fecha_envio.total_cobrado_efectivo, 0.0)
+    
+    def test_10_cron_corrige_desvios(self):
+        """Test que el verificador periódico corrige totales desfasados."""
+        envio = self.Envio.create({
+            'remitente_nombre': 'Cliente',
+            'destinatario_nombre': 'Destino',
+            'provincia_id': self.provincia_habana.id,
+            'peso_etiqueta': 10.0,
+            'tipo_cliente': 'normal',
+            'estado_mexico': 'cdmx',
+            'fecha_envio_id': self.fecha_envio.id,
+            'forma_pago': 'efectivo',
+        })
+        
+        # Simular un desvío escrito por fuera del ORM
+        self.env.cr.execute(
+            "UPDATE paqueteria_fecha_envio "
+            "SET total_envios = 7, total_cobrado = 1 WHERE id = %s",
+            [self.fecha_envio.id],
+        )
+        self.fecha_envio.invalidate_recordset()
+        
+        corregidas = self.FechaEnvio._cron_verificar_totales()
+        
+        self.assertGreaterEqual(corregidas, 1)
+        self.assertEqual(self.fecha_envio.total_envios, 1)
+        self.assertEqual(self.fecha_envio.total_cobrado, envio.total_cobrar)
+        self.assertEqual(self.FechaEnvio._cron_verificar_totales(), 0)
+    
+    def test_11_consolida_deltas_pendientes(self):
+        """Test que los deltas pendientes se suman al consolidar."""
+        self.env.cr.execute(
+            "INSERT INTO paqueteria_fecha_envio_delta "
+            "(fecha_envio_id, cantidad, peso, total, efectivo, transferencia) "
+            "VALUES (%s, 2, 20, 300, 300, 0), (%s, 1, 5, 100, 0, 100)",
+            [self.fecha_envio.id, self.fecha_envio.id],
+        )
+        
+        self.assertEqual(self.FechaEnvio._cron_consolidar_deltas(), 1)
+        
+        self.assertEqual(self.fecha_envio.total_envios, 3)
+        self.assertEqual(self.fecha_envio.peso_total, 25.0)
+        self.assertEqual(self.fecha_envio.total_cobrado, 400.0)
+        self.assertEqual(self.fecha_envio.total_cobrado_efectivo, 300.0)
+        self.assertEqual(self.fecha_envio.total_cobrado_transferencia, 100.0)
+        self.assertEqual(self.FechaEnvio._cron_consolidar_deltas(), 0)
+    
+    def test_12_provincias_destino_en_lote(self):
+        """Test del resumen de provincias calculado para varias fechas."""
+        otra_fecha = self.FechaEnvio.create({'fecha': '2026-01-22'})
+        self.Envio.create([
+            self._vals_envio(fecha_envio_id=self.fecha_envio.id),
+            self._vals_envio(fecha_envio_id=self.fecha_envio.id),
+            self._vals_envio(
+                fecha_envio_id=self.fecha_envio.id,
+                provincia_id=self.provincia_santiago.id,
+            ),
+        ])
+        fechas = self.fecha_envio | otra_fecha
+        fechas.invalidate_recordset(['provincias_destino'])
+        
+        self.assertEqual(
+            self.fecha_envio.provincias_destino,
+            ', '.join(sorted([
+                self.provincia_habana.name, self.provincia_santiago.name,
+            ])),
+        )
+        self.assertEqual(otra_fecha.provincias_destino, 'Sin envíos')
+    
+    def test_13_agregados_agrupados_contra_python(self):
+        """Test que la consulta agrupada coincide con sumar los envíos en Python."""
+        provincias = self.Provincia.create([
+            {'name': f'Provincia {letra}'} for letra in 'ABCD'
+        ])
+        fechas = self.fecha_envio | self.FechaEnvio.create([
+            {'fecha': '2026-01-22'}, {'fecha': '2026-01-29'},
+        ])
+        pagos = ['efectivo', 'transferencia', False]
+        envios = self.Envio.create([
+            self._vals_envio(
+                fecha_envio_id=fechas[numero % 3].id,
+                forma_pago=pagos[numero // 3 % len(pagos)],
+                provincia_id=provincias[numero % len(provincias)].id,
+                peso_etiqueta=3.5 + numero,
+            )
+            for numero in range(3 * len(provincias) * len(pagos))
+        ])
+        
+        totales = fechas._agregar_totales()
+        fechas.invalidate_recordset(['provincias_destino'])
+        for fecha in fechas:
+            propios = envios.filtered(lambda e: e.fecha_envio_id == fecha)
+            
+            def cobrado(pago):
+                return sum(
+                    propios.filtered(lambda e: e.forma_pago == pago)
+                    .mapped('total_cobrar')
+                )
+            
+            esperado = {
+                'total_envios': len(propios),
+                'peso_total': sum(propios.mapped('peso_cobrar')),
+                'total_cobrado': sum(propios.mapped('total_cobrar')),
+                'total_cobrado_efectivo': cobrado('efectivo'),
+                'total_cobrado_transferencia': cobrado('transferencia'),
+            }
+            for campo, valor in esperado.items():
+                self.assertAlmostEqual(totales[fecha.id][campo], valor, places=2)
+                self.assertAlmostEqual(fecha[campo], valor, places=2)
+            
+            nombres = sorted(set(propios.provincia_id.mapped('name')))
+            self.assertEqual(
+                fecha.provincias_destino,
+                f"{', '.join(nombres[:3])}... (+{len(nombres) - 3})",
+            )
@@ -0,0 +1,90 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Tests de captura simultánea de envíos sobre una misma fecha."""
+
+import threading
+
+from odoo import SUPERUSER_ID, api
+from odoo.modules.registry import Registry
+from odoo.tests import BaseCase, get_db_name, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestPaqueteriaFechaEnvioConcurrencia(BaseCase):
+    """Varias transacciones confirmadas capturando envíos a la vez.
+    
+    Usa cursores propios que confirman sus cambios, por lo que limpia
+    todo lo creado al terminar.
+    """
+    
+    CAPTURAS = 8
+    
+    def setUp(self):
+        """Crea y confirma la fecha de envío compartida."""
+        super().setUp()
+        self.registry = Registry(get_db_name())
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            self.fecha_id = env['paqueteria.fecha.envio'].create({
+                'fecha': '2031-03-03',
+            }).id
+            self.provincia_id = env.ref(
+                'paqueteria_internacional.provincia_habana'
+            ).id
+        self.addCleanup(self._limpiar)
+    
+    def _limpiar(self):
+        """Elimina la fecha y sus envíos confirmados por el test."""
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            fecha = env['paqueteria.fecha.envio'].browse(self.fecha_id)
+            fecha.envio_ids.unlink()
+            fecha.unlink()
+    
+    def _capturar(self, barrera, errores, indice):
+        """Crea un envío en su propia transacción tras la barrera."""
+        try:
+            barrera.wait()
+            with self.registry.cursor() as cr:
+                env = api.Environment(cr, SUPERUSER_ID, {})
+                env['paqueteria.envio'].create({
+                    'remitente_nombre': 'Cliente %s' % indice,
+                    'destinatario_nombre': 'Destino',
+                    'provincia_id': self.provincia_id,
+                    'peso_etiqueta': 10.0,
+                    'tipo_cliente': 'normal',
+                    'estado_mexico': 'cdmx',
+                    'forma_pago': 'efectivo',
+                    'fecha_envio_id': self.fecha_id,
+                })
+        except Exception as error:  # noqa: BLE001
+            errores.append(error)
+    
+    def test_01_capturas_simultaneas(self):
+        """Test que las capturas simultáneas no se bloquean ni se pierden."""
+        barrera = threading.Barrier(self.CAPTURAS)
+        errores = []
+        hilos = [
+            threading.Thread(
+                target=self._capturar, args=(barrera, errores, indice)
+            )
+            for indice in range(self.CAPTURAS)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join(timeout=60)
+        
+        self.assertFalse(errores)
+        
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            FechaEnvio = env['paqueteria.fecha.envio']
+            FechaEnvio._cron_consolidar_deltas()
+            fecha = FechaEnvio.browse(self.fecha_id)
+            self.assertEqual(fecha.total_envios, self.CAPTURAS)
+            self.assertEqual(
+                fecha.total_cobrado,
+                sum(fecha.envio_ids.mapped('total_cobrar')),
+            )
@@ -0,0 +1,130 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Tests para los viajes de maletas."""
+
+from odoo.tests import tagged
+
+from .common import PaqueteriaCommon
+
+
+@tagged('post_install', '-at_install')
+class TestPaqueteriaMaletaViaje(PaqueteriaCommon):
+    """Tests para el modelo paqueteria.maleta.viaje."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Prepara dos fechas con un envío cada una y una maleta."""
+        super().setUpClass()
+        cls.Viaje = cls.env['paqueteria.maleta.viaje']
+        cls.fecha_1, cls.fecha_2 = cls.FechaEnvio.create([
+            {'fecha': '2030-09-01'},
+            {'fecha': '2030-09-15'},
+        ])
+        cls.envio_1, cls.envio_2 = cls.Envio.create([
+            cls._vals_envio(fecha_envio_id=cls.fecha_1.id, peso_etiqueta=30.0),
+            cls._vals_envio(fecha_envio_id=cls.fecha_2.id, peso_etiqueta=12.0),
+        ])
+        cls.maleta = cls.Maleta.create({
+            'name': 'Maleta 1',
+            'numero': 1,
+            'fecha_envio_id': cls.fecha_1.id,
+        })
+    
+    def _distribuir(self, envio, peso):
+        """Distribuye parte de un envío en la maleta."""
+        return self.EnvioMaleta.create({
+            'envio_id': envio.id,
+            'maleta_id': self.maleta.id,
+            'peso_en_maleta': peso,
+            'descripcion_empaque': '1 bolsa',
+        })
+    
+    def test_01_totales_solo_del_viaje_actual(self):
+        """Test que la maleta reutilizada solo suma su viaje actual."""
+        self._distribuir(self.envio_1, 30.0)
+        self.assertEqual(self.maleta.peso_total, 30.0)
+        self.assertEqual(self.maleta.envio_count, 1)
+        
+        # Siguiente viaje
+        self.maleta.fecha_envio_id = self.fecha_2
+        self.assertEqual(self.maleta.peso_total, 0.0)
+        
+        linea = self._distribuir(self.envio_2, 12.0)
+        self.assertEqual(linea.viaje_id, self.maleta.viaje_actual_id)
+        self.assertEqual(self.maleta.peso_total, 12.0)
+        self.assertEqual(self.maleta.envio_ids, self.envio_2)
+        
+        # El historial se conserva por viaje
+        viajes = self.Viaje.search([('maleta_id', '=', self.maleta.id)])
+        self.assertEqual(len(viajes), 2)
+        self.assertEqual(self.maleta.viaje_count, 2)
+        self.assertEqual(
+            viajes.filtered(lambda v: v.fecha_envio_id == self.fecha_1).peso_total,
+            30.0,
+        )
+    
+    def test_02_cambio_de_fecha_mueve_distribuciones(self):
+        """Test que mover un envío de fecha mueve sus distribuciones de viaje."""
+        linea = self._distribuir(self.envio_1, 10.0)
+        viaje_1 = linea.viaje_id
+        
+        self.envio_1.fecha_envio_id = self.fecha_2
+        
+        self.assertEqual(linea.viaje_id.fecha_envio_id, self.fecha_2)
+        self.assertEqual(viaje_1.peso_total, 0.0)
+        self.assertEqual(linea.viaje_id.peso_total, 10.0)
+    
+    def test_03_buscar_maleta_por_envio(self):
+        """Test que la pertenencia maleta-envío se guarda y se puede buscar."""
+        self._distribuir(self.envio_1, 10.0)
+        self._distribuir(self.envio_1, 5.0)
+        
+        self.assertEqual(self.maleta.envio_ids, self.envio_1)
+        self.assertEqual(self.maleta.envio_count, 1)
+        self.assertEqual(
+            self.Maleta.search([('envio_ids.name', '=', self.envio_1.name)]),
+            self.maleta,
+        )
+        self.assertFalse(
+            self.Maleta.search([('envio_ids', 'in', self.envio_2.ids)])
+        )
+    
+    def test_04_envio_sin_fecha_sin_viaje(self):
+        """Test que las distribuciones de envíos sin fecha no crean viaje."""
+        envio = self.Envio.create(self._vals_envio(peso_etiqueta=5.0))
+        linea = self._distribuir(envio, 5.0)
+        self.assertFalse(linea.viaje_id)
+        self.assertFalse(self.Viaje.search([('fecha_envio_id', '=', False)]))
+        
+        envio.fecha_envio_id = self.fecha_1
+        self.assertEqual(linea.viaje_id.fecha_envio_id, self.fecha_1)
+        self.assertEqual(self.maleta.peso_total, 5.0)
+    
+    def test_05_viaje_creado_por_otra_transaccion(self):
+        """Test que un viaje ya insertado por otro empacador se reutiliza."""
+        self.env.flush_all()
+        self.env.cr.execute(
+            """
+            INSERT INTO paqueteria_maleta_viaje (maleta_id, fecha_envio_id, fecha)
+            VALUES (%s, %s, %s) RETURNING id
+            """,
+            (self.maleta.id, self.fecha_2.id, self.fecha_2.fecha),
+        )
+        viaje_id = self.env.cr.fetchone()[0]
+        
+        viajes = self.Viaje._obtener_viajes([
+            (self.maleta.id, self.fecha_1.id),
+            (self.maleta.id, self.fecha_2.id),
+            (self.maleta.id, False),
+        ])
+        self.assertEqual(viajes[self.maleta.id, self.fecha_2.id], viaje_id)
+        self.assertNotIn((self.maleta.id, False), viajes)
+        self.assertEqual(
+            self.Viaje.search_count([('maleta_id', '=', self.maleta.id)]), 2
+        )
+        self.assertEqual(
+            self.maleta.viaje_actual_id.id,
+            viajes[self.maleta.id, self.fecha_1.id],
+        )
+        self.assertEqual(self.Viaje._obtener_viajes(viajes), viajes)
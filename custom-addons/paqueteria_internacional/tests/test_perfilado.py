@@ -0,0 +1,84 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Tests para el perfilado opcional de los métodos de paquetería."""
+
+from unittest.mock import patch
+
+from odoo.tests import tagged
+
+from .common import PaqueteriaCommon
+
+
+@tagged('post_install', '-at_install')
+class TestPaqueteriaPerfilado(PaqueteriaCommon):
+    """Tests para el decorador perfilar y sus modelos."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Prepara los modelos de perfilado y vacía el buffer."""
+        super().setUpClass()
+        cls.Operacion = cls.env['paqueteria.perfil.operacion']
+        cls.Resumen = cls.env['paqueteria.perfil.resumen']
+        cls.Parametro = cls.env['ir.config_parameter'].sudo()
+        cls.Operacion._volcar_buffer()
+        cls.fecha = cls.FechaEnvio.create({'fecha': '2031-06-01'})
+    
+    def _crear_envios(self, cantidad):
+        """Crea envíos en la fecha del test."""
+        return self.Envio.create([
+            self._vals_envio(fecha_envio_id=self.fecha.id)
+            for _i in range(cantidad)
+        ])
+    
+    def test_01_desactivado_no_mide(self):
+        """Test que sin el parámetro no se registran mediciones."""
+        self.Parametro.set_param('paqueteria.perfilado.activo', '0')
+        self._crear_envios(3)
+        self.assertEqual(self.Operacion._volcar_buffer(), 0)
+    
+    def test_02_mide_y_resume(self):
+        """Test que las llamadas se miden, se vuelcan y se resumen."""
+        self.Parametro.set_param('paqueteria.perfilado.activo', '1')
+        self._crear_envios(5)
+        self._crear_envios(2)
+        self.env.flush_all()
+        self.Parametro.set_param('paqueteria.perfilado.activo', '0')
+        
+        self.assertGreater(self.Operacion._volcar_buffer(), 0)
+        creaciones = self.Operacion.search([
+            ('modelo', '=', 'paqueteria.envio'), ('metodo', '=', 'create'),
+        ])
+        self.assertEqual(sorted(creaciones.mapped('registros')), [2, 5])
+        self.assertEqual(set(creaciones.mapped('tipo')), {'crud'})
+        self.assertTrue(all(op.consultas > 0 for op in creaciones))
+        self.assertTrue(self.Operacion.search_count([
+            ('metodo', '=', '_compute_peso_distribuido'), ('tipo', '=', 'compute'),
+        ]))
+        
+        resumen = self.Resumen.search([
+            ('modelo', '=', 'paqueteria.envio'), ('metodo', '=', 'create'),
+        ])
+        self.assertEqual(resumen.llamadas, 2)
+        self.assertLessEqual(resumen.p50, resumen.p95)
+        self.assertLessEqual(resumen.p95, resumen.maximo)
+    
+    def test_03_vuelca_despues_del_commit(self):
+        """Test que el volcado automático espera al commit de la transacción."""
+        self.Parametro.set_param('paqueteria.perfilado.activo', '1')
+        with patch(
+            'odoo.addons.paqueteria_internacional.models.perfilado.LOTE_VOLCADO', 3
+        ):
+            self._crear_envios(2)
+            self._crear_envios(2)
+            self.env.flush_all()
+        self.Parametro.set_param('paqueteria.perfilado.activo', '0')
+        
+        # Nada se escribe durante las llamadas medidas
+        self.assertFalse(self.Operacion.search_count([]))
+        
+        self.env.cr.postcommit.run()
+        self.assertTrue(self.Operacion.search_count([
+            ('modelo', '=', 'paqueteria.envio'), ('metodo', '=', 'create'),
+        ]))
+        self.assertEqual(self.Operacion._volcar_buffer(), 0)
@@ -0,0 +1,224 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Presupuestos de consultas SQL de los flujos más usados.
+
+Cada flujo se ejecuta con 1, 10 y 100 registros y debe costar la misma
+cantidad de consultas, sin superar su presupuesto. Si un cambio
+convierte un camino por lotes en uno por registro, la cantidad crece
+con los registros y el test falla.
+"""
+
+from datetime import date, timedelta
+
+from odoo.fields import Command
+from odoo.tests import tagged
+
+from .common import PaqueteriaCommon
+
+# Cantidades de registros con las que se mide cada flujo
+CANTIDADES = (1, 10, 100)
+
+# Máximo de consultas por flujo, incluido el flush final
+PRESUPUESTOS = {
+    'crear_envios': 30,
+    'leer_lista_envios': 8,
+    'leer_lista_fechas': 6,
+    'leer_lista_maletas': 8,
+    'empacar_maletas': 45,
+    'convertir_recepciones': 40,
+}
+
+CAMPOS_LISTA_ENVIOS = [
+    'name', 'fecha_envio_id', 'remitente_nombre', 'destinatario_nombre',
+    'provincia_id', 'peso_cobrar', 'total_cobrar', 'tipo_cliente',
+    'forma_pago', 'estado_mexico', 'admin_id', 'maleta_count',
+]
+
+CAMPOS_LISTA_FECHAS = [
+    'name', 'fecha', 'total_envios', 'total_maletas', 'peso_total',
+    'total_cobrado', 'total_cobrado_efectivo', 'total_cobrado_transferencia',
+]
+
+CAMPOS_LISTA_MALETAS = [
+    'name', 'numero', 'color', 'envio_count', 'peso_total',
+    'capacidad_peso', 'porcentaje_llenado', 'fecha_creacion', 'admin_id',
+]
+
+
+@tagged('post_install', '-at_install')
+class TestPaqueteriaPresupuestoConsultas(PaqueteriaCommon):
+    """Verifica que los flujos por lotes no escalen con los registros."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Prepara fechas distintas para cada medición."""
+        super().setUpClass()
+        cls.fechas = cls.FechaEnvio.create([
+            {'fecha': '2032-%02d-01' % mes} for mes in range(1, 13)
+        ])
+
+    def _contar(self, funcion):
+        """Cuenta las consultas de la función con la caché vacía."""
+        self.env.flush_all()
+        self.env.invalidate_all()
+        inicio = self.env.cr.sql_log_count
+        funcion()
+        self.env.flush_all()
+        return self.env.cr.sql_log_count - inicio
+
+    def _verificar(self, flujo, preparar, ejecutar):
+        """Mide el flujo con cada cantidad y exige un costo constante.
+
+        Args:
+            flujo: Clave de PRESUPUESTOS
+            preparar: Función cantidad → datos del flujo (no se mide)
+            ejecutar: Función datos → None, la parte medida
+        """
+        # Primera ejecución para llenar cachés del registro (tarifas, reglas)
+        ejecutar(preparar(1))
+
+        conteos = {}
+        for cantidad in CANTIDADES:
+            datos = preparar(cantidad)
+            conteos[cantidad] = self._contar(lambda: ejecutar(datos))
+
+        self.assertEqual(
+            len(set(conteos.values())), 1,
+            f'{flujo}: las consultas crecen con los registros {conteos}',
+        )
+        self.assertLessEqual(
+            conteos[CANTIDADES[-1]], PRESUPUESTOS[flujo],
+            f'{flujo}: {conteos[CANTIDADES[-1]]} consultas superan el '
+            f'presupuesto de {PRESUPUESTOS[flujo]}',
+        )
+
+    def _fecha(self):
+        """Devuelve una fecha sin usar en mediciones anteriores."""
+        fecha, self.fechas = self.fechas[0], self.fechas[1:]
+        return fecha
+
+    def _crear_envios(self, cantidad, fecha=None):
+        """Crea envíos en una fecha nueva."""
+        fecha = fecha or self._fecha()
+        return self.Envio.create([
+            self._vals_envio(
+                fecha_envio_id=fecha.id,
+                remitente_nombre=f'Cliente {numero}',
+                peso_etiqueta=5.0 + numero % 20,
+            )
+            for numero in range(cantidad)
+        ])
+
+    # ========== CREACIÓN ==========
+
+    def test_01_crear_envios(self):
+        """Test que crear envíos cuesta lo mismo para 1, 10 o 100."""
+        def preparar(cantidad):
+            fecha = self._fecha()
+            return [
+                self._vals_envio(
+                    fecha_envio_id=fecha.id,
+                    remitente_nombre=f'Cliente {numero}',
+                )
+                for numero in range(cantidad)
+            ]
+
+        self._verificar('crear_envios', preparar, self.Envio.create)
+
+    # ========== LECTURA DE LISTAS ==========
+
+    def test_02_leer_lista_envios(self):
+        """Test que la lista de envíos se lee en consultas constantes."""
+        self._verificar(
+            'leer_lista_envios',
+            self._crear_envios,
+            lambda envios: envios.read(CAMPOS_LISTA_ENVIOS),
+        )
+
+    def test_03_leer_lista_fechas(self):
+        """Test que la lista de fechas se lee en consultas constantes."""
+        dias = iter(range(1000))
+
+        def preparar(cantidad):
+            fechas = self.FechaEnvio.create([
+                {'fecha': date(2034, 1, 1) + timedelta(days=next(dias))}
+                for _i in range(cantidad)
+            ])
+            for fecha in fechas:
+                self._crear_envios(2, fecha)
+            return fechas
+
+        self._verificar(
+            'leer_lista_fechas',
+            preparar,
+            lambda fechas: fechas.read(CAMPOS_LISTA_FECHAS),
+        )
+
+    def test_04_leer_lista_maletas(self):
+        """Test que la lista de maletas se lee en consultas constantes."""
+        def preparar(cantidad):
+            fecha = self._fecha()
+            envios = self._crear_envios(cantidad, fecha)
+            maletas = self.Maleta.create([
+                {'name': f'Maleta {numero}', 'numero': numero,
+                 'fecha_envio_id': fecha.id}
+                for numero in range(1, cantidad + 1)
+            ])
+            self.EnvioMaleta.create([
+                {'envio_id': envio.id, 'maleta_id': maleta.id,
+                 'peso_en_maleta': 1.0, 'descripcion_empaque': '1 bolsa'}
+                for envio, maleta in zip(envios, maletas)
+            ])
+            return maletas
+
+        self._verificar(
+            'leer_lista_maletas',
+            preparar,
+            lambda maletas: maletas.read(CAMPOS_LISTA_MALETAS),
+        )
+
+    # ========== OPERACIONES ==========
+
+    def test_05_empacar_maletas(self):
+        """Test que empacar cuesta lo mismo sin importar los envíos."""
+        def preparar(cantidad):
+            fecha = self._fecha()
+            self._crear_envios(cantidad, fecha)
+            self.Maleta.create([
+                {'name': f'Maleta {numero}', 'numero': numero,
+                 'fecha_envio_id': fecha.id, 'capacidad_peso': 50.0}
+                for numero in range(1, cantidad // 2 + 3)
+            ])
+            return fecha
+
+        self._verificar(
+            'empacar_maletas',
+            preparar,
+            lambda fecha: fecha._empacar_maletas(),
+        )
+
+    def test_06_convertir_recepciones(self):
+        """Test que convertir recepciones cuesta lo mismo para 1, 10 o 100."""
+        def preparar(cantidad):
+            recepciones = self.Recepcion.create([
+                {
+                    'remitente_nombre': f'Remitente {numero}',
+                    'destinatario_nombre': f'Destino {numero}',
+                    'provincia_id': self.provincia_habana.id,
+                    'peso_etiqueta': 5.0,
+                    'estado_mexico': 'cdmx',
+                    'descripcion_articulos': 'Ropa',
+                }
+                for numero in range(cantidad)
+            ])
+            return self.env['paqueteria.recepcion.convertir'].create({
+                'recepcion_ids': [Command.set(recepciones.ids)],
+                'fecha_envio_id': self._fecha().id,
+            })
+
+        self._verificar(
+            'convertir_recepciones',
+            preparar,
+            lambda asistente: asistente.action_convertir(),
+        )
@@ -0,0 +1,155 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Tests para el asistente de conversión de recepciones en envíos."""
+
+from lxml import etree
+
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+from odoo.tools.safe_eval import safe_eval
+
+from .common import PaqueteriaCommon
+
+
+@tagged('post_install', '-at_install')
+class TestPaqueteriaRecepcionConvertir(PaqueteriaCommon):
+    """Tests para el asistente paqueteria.recepcion.convertir."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Prepara una fecha de envío y tres recepciones."""
+        super().setUpClass()
+        cls.Convertir = cls.env['paqueteria.recepcion.convertir']
+        cls.fecha = cls.FechaEnvio.create({'fecha': '2030-10-01'})
+        cls.recepciones = cls.Recepcion.create([
+            {
+                'remitente_nombre': f'Remitente {numero}',
+                'destinatario_nombre': f'Destino {numero}',
+                'provincia_id': cls.provincia_habana.id,
+                'peso_etiqueta': 5.0 * numero,
+                'estado_mexico': 'cdmx',
+                'descripcion_articulos': 'Ropa',
+            }
+            for numero in (1, 2, 3)
+        ])
+    
+    def _asistente(self, recepciones, **valores):
+        """Crea el asistente como lo abre la acción de la lista."""
+        return self.Convertir.with_context(
+            active_model='paqueteria.recepcion',
+            active_ids=recepciones.ids,
+        ).create(dict({'fecha_envio_id': self.fecha.id}, **valores))
+    
+    def test_01_convertir_en_lote(self):
+        """Test que cada recepción genera un envío con sus datos."""
+        accion = self._asistente(
+            self.recepciones, tipo_cliente='vip', forma_pago='efectivo'
+        ).action_convertir()
+        envios = self.Envio.search(accion['domain'])
+        
+        self.assertEqual(len(envios), 3)
+        self.assertEqual(envios.recepcion_id, self.recepciones)
+        self.assertEqual(set(envios.mapped('tipo_cliente')), {'vip'})
+        self.assertEqual(set(envios.mapped('forma_pago')), {'efectivo'})
+        for envio in envios:
+            self.assertEqual(envio.fecha_envio_id, self.fecha)
+            self.assertEqual(
+                envio.remitente_nombre, envio.recepcion_id.remitente_nombre
+            )
+            self.assertEqual(
+                envio.peso_etiqueta, envio.recepcion_id.peso_etiqueta
+            )
+        self.assertEqual(self.fecha.total_envios, 3)
+    
+    def test_02_omite_recepciones_convertidas(self):
+        """Test que las recepciones ya convertidas no se duplican."""
+        self._asistente(self.recepciones[0]).action_convertir()
+        
+        asistente = self._asistente(self.recepciones)
+        self.assertEqual(asistente.convertidas_count, 1)
+        accion = asistente.action_convertir()
+        self.assertEqual(
+            self.Envio.search(accion['domain']).recepcion_id,
+            self.recepciones[1:],
+        )
+        
+        with self.assertRaises(UserError):
+            self._asistente(self.recepciones).action_convertir()
+    
+    def test_03_cola_recibidas_sin_enviar(self):
+        """Test que la cola lista solo recepciones sin envío por estado."""
+        otra = self.Recepcion.create({
+            'remitente_nombre': 'Remitente Jalisco',
+            'destinatario_nombre': 'Destino Jalisco',
+            'provincia_id': self.provincia_santiago.id,
+            'peso_etiqueta': 8.0,
+            'estado_mexico': 'jalisco',
+            'descripcion_articulos': 'Medicinas',
+        })
+        self._asistente(self.recepciones[0]).action_convertir()
+        self.assertTrue(self.recepciones[0].enviada)
+        self.assertFalse(self.recepciones[1].enviada)
+        
+        dominio = [('id', 'in', (self.recepciones | otra).ids)]
+        pendientes = self.Recepcion.search(
+            dominio + self.Recepcion._dominio_pendientes_envio()
+        )
+        self.assertEqual(pendientes, self.recepciones[1:] | otra)
+        self.assertEqual(
+            self.Recepcion.search(dominio + [('enviada', '=', True)]),
+            self.recepciones[0],
+        )
+        self.assertEqual(
+            self.Recepcion.search(
+                dominio + self.Recepcion._dominio_pendientes_envio('jalisco')
+            ),
+            otra,
+        )
+        
+        grupos = dict(self.Recepcion._read_group(
+            dominio + self.Recepcion._dominio_pendientes_envio(),
+            ['estado_mexico'], ['__count'],
+        ))
+        self.assertEqual(grupos, {'cdmx': 2, 'jalisco': 1})
+    
+    def test_04_dominios_de_las_vistas(self):
+        """Test que la cola y los filtros de la vista buscan por conversión."""
+        self._asistente(self.recepciones[0]).action_convertir()
+        dominio = [('id', 'in', self.recepciones.ids)]
+        
+        accion = self.env.ref(
+            'paqueteria_internacional.action_paqueteria_recepcion_pendiente_envio'
+        )
+        self.assertEqual(
+            self.Recepcion.search(dominio + safe_eval(accion.domain)),
+            self.recepciones[1:],
+        )
+        
+        vista = self.env.ref('paqueteria_internacional.view_paqueteria_recepcion_search')
+        filtros = {
+            filtro.get('name'): safe_eval(filtro.get('domain'))
+            for filtro in etree.fromstring(vista.arch).iter('filter')
+            if filtro.get('domain')
+        }
+        self.assertEqual(
+            self.Recepcion.search(dominio + filtros['filter_pendiente_envio']),
+            self.recepciones[1:],
+        )
+        self.assertEqual(
+            self.Recepcion.search(dominio + filtros['filter_enviada']),
+            self.recepciones[0],
+        )
+        
+        for operador, valor, esperadas in (
+            ('in', [False], self.recepciones[1:]),
+            ('not in', [False], self.recepciones[0]),
+            ('in', (True, False), self.recepciones),
+            ('not in', [True, False], self.Recepcion),
+            ('!=', True, self.recepciones[1:]),
+        ):
+            self.assertEqual(
+                self.Recepcion.search(dominio + [('enviada', operador, valor)]),
+                esperadas,
+                (operador, valor),
+            )
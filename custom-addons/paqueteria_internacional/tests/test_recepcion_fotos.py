@@ -0,0 +1,107 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Tests para el procesamiento de fotos de recepciones."""
+
+import base64
+import io
+
+from PIL import Image
+
+from odoo.fields import Command
+from odoo.tests import tagged
+
+from .common import PaqueteriaCommon
+
+
+@tagged('post_install', '-at_install')
+class TestPaqueteriaRecepcionFotos(PaqueteriaCommon):
+    """Tests para la re-codificación y deduplicación de fotos."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Prepara una foto grande en PNG como la sube un teléfono."""
+        super().setUpClass()
+        cls.Attachment = cls.env['ir.attachment']
+        salida = io.BytesIO()
+        Image.new('RGB', (4000, 3000), (200, 30, 60)).save(salida, 'PNG')
+        cls.foto_png = salida.getvalue()
+    
+    def _subir_foto(self, nombre='foto.png'):
+        """Crea el adjunto como lo hace el widget de carga."""
+        return self.Attachment.create({
+            'name': nombre,
+            'raw': self.foto_png,
+            'res_model': 'paqueteria.recepcion',
+        })
+    
+    def _crear_recepcion(self, fotos):
+        """Crea una recepción con las fotos indicadas."""
+        return self.Recepcion.create({
+            'remitente_nombre': 'Remitente',
+            'destinatario_nombre': 'Destino',
+            'provincia_id': self.provincia_habana.id,
+            'peso_etiqueta': 5.0,
+            'estado_mexico': 'cdmx',
+            'descripcion_articulos': 'Ropa',
+            'fotos_ids': [Command.set(fotos.ids)],
+        })
+    
+    def test_01_recodifica_y_genera_miniatura(self):
+        """Test que la foto se reduce, pasa a JPEG y tiene miniatura."""
+        recepcion = self._crear_recepcion(self._subir_foto())
+        foto = recepcion.fotos_ids
+        
+        self.assertTrue(foto.paqueteria_foto)
+        self.assertEqual(foto.mimetype, 'image/jpeg')
+        self.assertLess(foto.file_size, len(self.foto_png))
+        imagen = Image.open(io.BytesIO(foto.raw))
+        self.assertLessEqual(max(imagen.size), 1920)
+        
+        miniatura = Image.open(io.BytesIO(base64.b64decode(foto.paqueteria_miniatura)))
+        self.assertLessEqual(max(miniatura.size), 256)
+    
+    def test_02_descarta_fotos_duplicadas(self):
+        """Test que las copias de una foto en una recepción quedan como una."""
+        primera = self._crear_recepcion(self._subir_foto() | self._subir_foto())
+        self.assertEqual(len(primera.fotos_ids), 1)
+        
+        # Una foto idéntica en otra recepción conserva su propio adjunto
+        segunda = self._crear_recepcion(self._subir_foto('copia.png'))
+        self.assertNotEqual(segunda.fotos_ids, primera.fotos_ids)
+        self.assertEqual(segunda.fotos_ids.checksum, primera.fotos_ids.checksum)
+        
+        # Los adjuntos que no son imágenes no se tocan
+        texto = self.Attachment.create({'name': 'nota.txt', 'raw': b'hola'})
+        primera.fotos_ids = [Command.link(texto.id)]
+        self.assertFalse(texto.paqueteria_foto)
+        self.assertEqual(len(primera.fotos_ids), 2)
+    
+    def test_03_conteo_de_fotos_en_una_consulta(self):
+        """Test que contar fotos de muchas recepciones no escala."""
+        texto = self.Attachment.create({'name': 'nota.txt', 'raw': b'hola'})
+        recepciones = self._crear_recepcion(self._subir_foto())
+        for _i in range(9):
+            recepciones |= self._crear_recepcion(texto)
+        recepciones |= self._crear_recepcion(self.Attachment)
+        
+        recepciones.invalidate_recordset(['fotos_count'])
+        with self.assertQueryCount(__system__=1):
+            conteos = recepciones.mapped('fotos_count')
+        self.assertEqual(conteos, [1] * 10 + [0])
+    
+    def test_04_eliminar_recepcion_conserva_fotos_ajenas(self):
+        """Test que eliminar una recepción no borra las fotos de otra."""
+        primera = self._crear_recepcion(self.Attachment)
+        primera.fotos_ids = self.Attachment.create({
+            'name': 'foto.png',
+            'raw': self.foto_png,
+            'res_model': 'paqueteria.recepcion',
+            'res_id': primera.id,
+        })
+        segunda = self._crear_recepcion(self._subir_foto('copia.png'))
+        foto_segunda = segunda.fotos_ids
+        
+        primera.unlink()
+        self.assertTrue(foto_segunda.exists())
+        self.assertEqual(segunda.fotos_count, 1)
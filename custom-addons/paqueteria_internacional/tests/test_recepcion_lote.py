@@ -0,0 +1,133 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Tests para la carga de recepciones por lote."""
+
+import base64
+import io
+
+from unittest.mock import patch
+
+from PIL import Image
+
+from odoo.exceptions import ConcurrencyError, UserError
+from odoo.service.model import retrying
+from odoo.tests import tagged
+from odoo.tools import mute_logger
+
+from .common import PaqueteriaCommon
+
+
+@tagged('post_install', '-at_install')
+class TestPaqueteriaRecepcionLote(PaqueteriaCommon):
+    """Tests para paqueteria.recepcion.recibir_lote."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Prepara una foto en base64 como la envía el teléfono."""
+        super().setUpClass()
+        salida = io.BytesIO()
+        Image.new('RGB', (800, 600), (10, 120, 200)).save(salida, 'JPEG')
+        cls.foto = base64.b64encode(salida.getvalue()).decode()
+    
+    def _lote(self, cantidad, prefijo='tel-1'):
+        """Arma un lote de recepciones con claves del dispositivo."""
+        return [
+            {
+                'clave': f'{prefijo}-{numero}',
+                'remitente_nombre': f'Remitente {numero}',
+                'destinatario_nombre': f'Destino {numero}',
+                'provincia_id': self.provincia_habana.id,
+                'peso_etiqueta': 4.0 + numero,
+                'estado_mexico': 'cdmx',
+                'descripcion_articulos': 'Ropa',
+                'fotos': [{'nombre': f'foto-{numero}.jpg', 'datos': self.foto}],
+            }
+            for numero in range(cantidad)
+        ]
+    
+    def test_01_crea_lote_con_fotos(self):
+        """Test que el lote crea recepciones numeradas con sus fotos."""
+        resultado = self.Recepcion.recibir_lote(self._lote(3))
+        
+        self.assertEqual([fila['clave'] for fila in resultado],
+                         ['tel-1-0', 'tel-1-1', 'tel-1-2'])
+        self.assertTrue(all(fila['nueva'] for fila in resultado))
+        recepciones = self.Recepcion.browse([fila['id'] for fila in resultado])
+        self.assertEqual(recepciones.mapped('name'),
+                         [fila['name'] for fila in resultado])
+        self.assertTrue(all(name.startswith('REC') for name in recepciones.mapped('name')))
+        self.assertEqual(recepciones.mapped('fotos_count'), [1, 1, 1])
+    
+    def test_02_reintento_no_duplica(self):
+        """Test que reintentar la carga devuelve las mismas recepciones."""
+        primero = self.Recepcion.recibir_lote(self._lote(2))
+        total = self.Recepcion.search_count([])
+        
+        # Reintento con una recepción más y una clave repetida
+        lote = self._lote(3)
+        reintento = self.Recepcion.recibir_lote(lote + lote[:1])
+        self.assertEqual(self.Recepcion.search_count([]), total + 1)
+        self.assertEqual(
+            [(fila['id'], fila['name']) for fila in reintento[:2]],
+            [(fila['id'], fila['name']) for fila in primero],
+        )
+        self.assertEqual([fila['nueva'] for fila in reintento],
+                         [False, False, True, False])
+        self.assertEqual(reintento[3]['id'], reintento[0]['id'])
+    
+    def test_03_lote_invalido(self):
+        """Test que un lote inválido no registra ninguna recepción."""
+        total = self.Recepcion.search_count([])
+        
+        sin_clave = self._lote(2)
+        sin_clave[1]['clave'] = ''
+        with self.assertRaises(UserError):
+            self.Recepcion.recibir_lote(sin_clave)
+        
+        campo_ajeno = self._lote(1)
+        campo_ajeno[0]['name'] = 'REC-99999'
+        with self.assertRaises(UserError):
+            self.Recepcion.recibir_lote(campo_ajeno)
+        
+        self.assertEqual(self.Recepcion.search_count([]), total)
+    
+    def test_04_carga_simultanea_se_reintenta(self):
+        """Test que una clave registrada en paralelo se resuelve al reintentar."""
+        primero = self.Recepcion.recibir_lote(self._lote(1))
+        total = self.Recepcion.search_count([])
+        
+        Recepcion = type(self.Recepcion)
+        buscar_por_clave = Recepcion._buscar_por_clave
+        lecturas = []
+        
+        def sin_ver_la_otra_carga(modelo, claves):
+            """La primera lectura no ve la clave de la carga simultánea."""
+            lecturas.append(claves)
+            if len(lecturas) == 1:
+                return {}
+            return buscar_por_clave(modelo, claves)
+        
+        with self.assertRaises(ConcurrencyError), \
+                patch.object(Recepcion, '_buscar_por_clave', sin_ver_la_otra_carga), \
+                mute_logger('odoo.sql_db'):
+            self.Recepcion.recibir_lote(self._lote(1))
+        
+        # Odoo reintenta la petición en una transacción nueva, que aquí
+        # es volver al punto de guardado tomado antes de la petición
+        lecturas.clear()
+        with self.env.cr.savepoint(flush=False) as punto, \
+                patch.object(self.env.cr, 'rollback', punto.rollback), \
+                patch.object(Recepcion, '_buscar_por_clave', sin_ver_la_otra_carga), \
+                mute_logger('odoo.sql_db', 'odoo.service.model'):
+            reintento = retrying(
+                lambda: self.env['paqueteria.recepcion'].recibir_lote(self._lote(1)),
+                self.env,
+            )
+        self.assertEqual(len(lecturas), 3)
+        self.assertEqual(self.Recepcion.search_count([]), total)
+        self.assertEqual(
+            (reintento[0]['id'], reintento[0]['name']),
+            (primero[0]['id'], primero[0]['name']),
+        )
+        self.assertFalse(reintento[0]['nueva'])
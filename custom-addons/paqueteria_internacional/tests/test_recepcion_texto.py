@@ -0,0 +1,112 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Tests para la búsqueda de texto completo de artículos declarados."""
+
+from lxml import etree
+
+from odoo.tests import tagged
+
+from .common import PaqueteriaCommon
+
+
+@tagged('post_install', '-at_install')
+class TestPaqueteriaRecepcionTexto(PaqueteriaCommon):
+    """Tests para paqueteria.recepcion.buscar_articulos."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Prepara recepciones con distintos artículos declarados."""
+        super().setUpClass()
+        cls.laptop, cls.laptop_cargador, cls.licuadora, cls.camara = (
+            cls.Recepcion.create([
+                {
+                    'remitente_nombre': 'Remitente',
+                    'destinatario_nombre': 'Destino',
+                    'provincia_id': cls.provincia_habana.id,
+                    'peso_etiqueta': 5.0,
+                    'estado_mexico': 'cdmx',
+                    'fecha_recepcion': fecha,
+                    'descripcion_articulos': descripcion,
+                }
+                for fecha, descripcion in (
+                    ('2030-03-10', '1 laptop Dell\n2 camisas'),
+                    ('2030-04-02', '1 laptop Lenovo\n1 cargador de laptop'),
+                    ('2030-04-05', '1 licuadora Oster'),
+                    ('2030-04-08', '1 cámara fotográfica Canon'),
+                )
+            ])
+        )
+        cls.todas = cls.laptop | cls.laptop_cargador | cls.licuadora | cls.camara
+    
+    def _buscar(self, texto, domain=None):
+        """Busca solo entre las recepciones del test."""
+        return self.Recepcion.buscar_articulos(
+            texto, domain=[('id', 'in', self.todas.ids)] + (domain or [])
+        )
+    
+    def test_01_busqueda_ordenada_por_relevancia(self):
+        """Test que la descripción con más coincidencias aparece primero."""
+        self.assertEqual(
+            self._buscar('laptop').ids,
+            [self.laptop_cargador.id, self.laptop.id],
+        )
+        self.assertEqual(self._buscar('laptop -cargador'), self.laptop)
+        self.assertEqual(self._buscar('"licuadora oster"'), self.licuadora)
+        self.assertFalse(self._buscar('televisor'))
+    
+    def test_02_filtro_por_fecha_y_vista(self):
+        """Test que la búsqueda se combina con otros filtros y vistas."""
+        abril = [
+            ('fecha_recepcion', '>=', '2030-04-01'),
+            ('fecha_recepcion', '<', '2030-05-01'),
+        ]
+        self.assertEqual(self._buscar('laptop', abril), self.laptop_cargador)
+        
+        self.assertEqual(
+            self.Recepcion.search([
+                ('id', 'in', self.todas.ids),
+                ('descripcion_busqueda', 'ilike', 'Camisas'),
+            ]),
+            self.laptop,
+        )
+    
+    def test_03_descripcion_modificada(self):
+        """Test que el índice sigue a la descripción al modificarla."""
+        self.licuadora.descripcion_articulos = '1 laptop HP'
+        self.assertIn(self.licuadora, self._buscar('laptop'))
+        self.assertFalse(self._buscar('licuadora'))
+    
+    def test_04_sin_acentos(self):
+        """Test que los acentos no afectan la búsqueda."""
+        if not self.env.registry.has_unaccent:
+            self.skipTest('La extensión unaccent no está instalada')
+        self.assertEqual(self._buscar('camara'), self.camara)
+        self.assertEqual(self._buscar('FOTOGRAFICA'), self.camara)
+    
+    def test_05_campo_de_la_vista_de_busqueda(self):
+        """Test que el campo de la vista de búsqueda filtra con 'ilike'."""
+        vista = self.env.ref('paqueteria_internacional.view_paqueteria_recepcion_search')
+        campo = next(
+            campo for campo in etree.fromstring(vista.arch).iter('field')
+            if campo.get('name') == 'descripcion_busqueda'
+        )
+        # Sin filter_domain ni operator, el cliente web busca con 'ilike'
+        self.assertIsNone(campo.get('filter_domain'))
+        self.assertIsNone(campo.get('operator'))
+        
+        self.assertEqual(
+            self.Recepcion.search([
+                ('id', 'in', self.todas.ids),
+                ('descripcion_busqueda', 'ilike', 'LAPTOP cargador'),
+            ]),
+            self.laptop_cargador,
+        )
+        self.assertEqual(
+            self.Recepcion.search([
+                ('id', 'in', self.todas.ids),
+                ('descripcion_busqueda', 'ilike', 'laptop'),
+                ('enviada', '=', False),
+            ]),
+            self.laptop | self.laptop_cargador,
+        )
@@ -0,0 +1,174 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Benchmarks de los flujos principales sobre datos sintéticos.
+
+No corren con la suite normal. Se ejecutan explícitamente con::
+
+    odoo-bin -d <base> -i paqueteria_internacional \\
+        --test-tags /paqueteria_internacional:paqueteria_rendimiento
+
+Variables de entorno:
+    PAQUETERIA_BENCHMARK_ENVIOS: Cantidad de envíos generados (100000)
+    PAQUETERIA_BENCHMARK_SEMILLA: Semilla del generador (20240101)
+    PAQUETERIA_BENCHMARK_REPORTE: Ruta del reporte JSON (por defecto
+        paqueteria_benchmark.json en el directorio temporal)
+
+El reporte guarda, por flujo, segundos, consultas SQL y registros
+procesados, para comparar dos versiones del módulo con la misma semilla.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from odoo.fields import Command
+from odoo.modules.module import get_manifest
+from odoo.tests import TransactionCase, tagged
+
+from .datos_sinteticos import GeneradorDatos
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged('paqueteria_rendimiento', '-standard', 'post_install', '-at_install')
+class TestPaqueteriaRendimiento(TransactionCase):
+    """Mide tiempo y consultas de los flujos críticos a gran escala."""
+
+    ENVIOS = int(os.environ.get('PAQUETERIA_BENCHMARK_ENVIOS', 100000))
+    SEMILLA = int(os.environ.get('PAQUETERIA_BENCHMARK_SEMILLA', 20240101))
+    FECHAS = 52
+
+    @classmethod
+    def setUpClass(cls):
+        """Genera el volumen de datos midiendo su creación."""
+        super().setUpClass()
+        cls.Envio = cls.env['paqueteria.envio']
+        cls.FechaEnvio = cls.env['paqueteria.fecha.envio']
+        cls.resultados = {}
+        cls.generador = GeneradorDatos(cls.env, semilla=cls.SEMILLA)
+
+        cls.articulos = cls.generador.articulos()
+        cls.fechas = cls.generador.fechas(cls.FECHAS)
+        with cls._medir('crear_envios', cls.ENVIOS):
+            cls.envios = cls.generador.envios(cls.ENVIOS, cls.fechas)
+        with cls._medir('crear_lineas_articulos') as medicion:
+            lineas = cls.generador.lineas_articulos(cls.envios, cls.articulos)
+            medicion['registros'] = len(lineas)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Escribe el reporte con todas las mediciones."""
+        ruta = os.environ.get('PAQUETERIA_BENCHMARK_REPORTE') or os.path.join(
+            tempfile.gettempdir(), 'paqueteria_benchmark.json'
+        )
+        cls.env.cr.execute('SHOW server_version')
+        reporte = {
+            'version_modulo': get_manifest('paqueteria_internacional')['version'],
+            'version_postgresql': cls.env.cr.fetchone()[0],
+            'fecha': datetime.now(timezone.utc).isoformat(),
+            'semilla': cls.SEMILLA,
+            'envios': cls.ENVIOS,
+            'fechas': cls.FECHAS,
+            'flujos': cls.resultados,
+        }
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump(reporte, archivo, indent=2, sort_keys=True)
+        _logger.info('Reporte de rendimiento escrito en %s', ruta)
+        super().tearDownClass()
+
+    @classmethod
+    @contextmanager
+    def _medir(cls, nombre, registros=0):
+        """Registra segundos y consultas SQL del bloque, incluido el flush."""
+        medicion = {'registros': registros}
+        cls.env.flush_all()
+        consultas = cls.env.cr.sql_log_count
+        inicio = time.perf_counter()
+        yield medicion
+        cls.env.flush_all()
+        segundos = time.perf_counter() - inicio
+        medicion.update(
+            segundos=round(segundos, 4),
+            consultas=cls.env.cr.sql_log_count - consultas,
+            registros_por_segundo=(
+                round(medicion['registros'] / segundos, 1) if segundos else None
+            ),
+        )
+        cls.resultados[nombre] = medicion
+        _logger.info('Rendimiento %s: %s', nombre, medicion)
+
+    # ========== FLUJOS ==========
+
+    def test_01_recalcular_precios(self):
+        """Mide el recálculo masivo de precios y el recálculo por ORM."""
+        with self._medir('recalcular_precios_sql', len(self.envios)):
+            self.fechas._recalcular_precios_sql()
+
+        muestra = self.envios[:10000]
+        with self._medir('recalcular_precios_orm', len(muestra)):
+            for nombre in ('tarifa_por_lb', 'embalaje', 'impuesto_aduanal',
+                           'subtotal_envio', 'total_cobrar'):
+                self.env.add_to_compute(self.Envio._fields[nombre], muestra)
+
+    def test_02_totales_fechas(self):
+        """Mide recalcular y verificar los totales de todas las fechas."""
+        with self._medir('recalcular_totales_fechas', len(self.fechas)):
+            self.fechas._recalcular_totales()
+        with self._medir('verificar_totales_fechas', len(self.fechas)):
+            self.FechaEnvio._cron_verificar_totales()
+
+    def test_03_listas(self):
+        """Mide leer las listas de envíos y fechas como la interfaz."""
+        self.env.invalidate_all()
+        with self._medir('leer_lista_envios', 80):
+            self.Envio.search_fetch(
+                [('fecha_envio_id', 'in', self.fechas.ids)],
+                ['name', 'remitente_nombre', 'destinatario_nombre',
+                 'provincia_id', 'peso_cobrar', 'total_cobrar',
+                 'maleta_count', 'peso_pendiente'],
+                limit=80,
+            ).mapped('provincia_id.display_name')
+
+        self.env.invalidate_all()
+        with self._medir('leer_lista_fechas', len(self.fechas)):
+            self.fechas.read([
+                'name', 'total_envios', 'peso_total', 'total_cobrado',
+                'total_maletas', 'provincias_destino',
+            ])
+
+    def test_04_empaque(self):
+        """Mide el empaque automático de los envíos en maletas."""
+        fechas = self.fechas[:4]
+        cantidad = self.Envio.search_count([('fecha_envio_id', 'in', fechas.ids)])
+        with self._medir('empacar_maletas', cantidad) as medicion:
+            distribuciones = self.generador.distribuir(fechas)
+            medicion['distribuciones'] = len(distribuciones)
+
+    def test_05_convertir_recepciones(self):
+        """Mide convertir recepciones en envíos con el asistente."""
+        recepciones = self.generador.recepciones(1000)
+        with self._medir('convertir_recepciones', len(recepciones)):
+            self.env['paqueteria.recepcion.convertir'].create({
+                'recepcion_ids': [Command.set(recepciones.ids)],
+                'fecha_envio_id': self.fechas[0].id,
+            }).action_convertir()
+
+    def test_06_busquedas(self):
+        """Mide las búsquedas de contacto, directorio y artículos."""
+        self.generador.recepciones(5000)
+        with self._medir('buscar_contacto_envio', 20):
+            self.Envio.buscar_contacto('maria perez')
+        with self._medir('buscar_articulos_recepcion', 80):
+            self.env['paqueteria.recepcion'].buscar_articulos('laptop cargador')
+
+        Cliente = self.env['paqueteria.cliente']
+        with self._medir('actualizar_directorio_clientes', len(self.envios)):
+            Cliente._cron_actualizar_directorio()
+        with self._medir('autocompletar_clientes', 10):
+            Cliente.autocompletar('mar')
+
@@ -0,0 +1,278 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Tests para la matriz de tarifas por libra."""
+
+from odoo.tests import tagged
+
+from .common import PaqueteriaCommon
+
+
+@tagged('post_install', '-at_install')
+class TestPaqueteriaTarifa(PaqueteriaCommon):
+    """Tests para paqueteria.tarifa y el cálculo de tarifa del envío."""
+    
+    def setUp(self):
+        """Setup ejecutado antes de cada test."""
+        super().setUp()
+        
+        self.Tarifa = self.env['paqueteria.tarifa']
+        self.fecha_envio = self.FechaEnvio.create({
+            'fecha': '2026-03-10',
+        })
+    
+    def test_01_tarifas_iniciales(self):
+        """Test que las tarifas precargadas conservan los precios históricos."""
+        casos = [
+            ('vip', self.provincia_habana, 140.0),
+            ('vip', self.provincia_santiago, 170.0),
+            ('normal', self.provincia_habana, 150.0),
+            ('normal', self.provincia_santiago, 180.0),
+        ]
+        for tipo_cliente, provincia, tarifa in casos:
+            envio = self.Envio.create(self._vals_envio(
+                tipo_cliente=tipo_cliente,
+                provincia_id=provincia.id,
+                fecha_envio_id=self.fecha_envio.id,
+            ))
+            self.assertEqual(envio.tarifa_por_lb, tarifa)
+    
+    def test_02_zona_tarifa_por_nombre(self):
+        """Test que la zona de La Habana se asigna sin importar mayúsculas."""
+        self.assertEqual(self.provincia_habana.zona_tarifa, 'habana')
+        self.assertEqual(self.provincia_santiago.zona_tarifa, 'resto')
+        
+        provincia = self.Provincia.create({'name': '  LA HABANA '})
+        self.assertEqual(provincia.zona_tarifa, 'habana')
+    
+    def test_03_nueva_vigencia_sin_despliegue(self):
+        """Test que una tarifa nueva aplica a partir de su fecha de vigencia."""
+        envio_anterior = self.Envio.create(self._vals_envio(
+            fecha_envio_id=self.fecha_envio.id,
+        ))
+        
+        self.Tarifa.create({
+            'tipo_cliente': 'normal',
+            'zona_tarifa': 'habana',
+            'fecha_desde': '2026-04-01',
+            'tarifa_por_lb': 160.0,
+        })
+        fecha_abril = self.FechaEnvio.create({'fecha': '2026-04-15'})
+        envio_nuevo = self.Envio.create(self._vals_envio(
+            fecha_envio_id=fecha_abril.id,
+        ))
+        
+        self.assertEqual(envio_anterior.tarifa_por_lb, 150.0)
+        self.assertEqual(envio_nuevo.tarifa_por_lb, 160.0)
+        self.assertEqual(envio_nuevo.subtotal_envio, 1600.0)
+    
+    def test_04_cache_se_invalida_al_modificar(self):
+        """Test que modificar una tarifa invalida la matriz en caché."""
+        tarifa = self.env.ref('paqueteria_internacional.tarifa_vip_resto')
+        fecha = self.fecha_envio.fecha
+        self.assertEqual(
+            self.Tarifa._obtener_tarifa('vip', 'resto', fecha), 170.0
+        )
+        
+        tarifa.tarifa_por_lb = 175.0
+        self.assertEqual(
+            self.Tarifa._obtener_tarifa('vip', 'resto', fecha), 175.0
+        )
+        
+        tarifa.active = False
+        self.assertEqual(
+            self.Tarifa._obtener_tarifa('vip', 'resto', fecha), 0.0
+        )
+    
+    def test_05_reglas_aduanales(self):
+        """Test del impuesto aduanal según regla, cliente y zona."""
+        celular = self.Articulo.create({
+            'name': 'iPhone',
+            'tipo_articulo': 'celular',
+        })
+        laptop = self.Articulo.create({
+            'name': 'Laptop',
+            'tipo_articulo': 'laptop_tablet',
+        })
+        otro = self.Articulo.create({
+            'name': 'Mando PS5',
+            'tipo_articulo': 'otro',
+            'costo_aduanal': 250.0,
+        })
+        envio = self.Envio.create(self._vals_envio(
+            tipo_cliente='vip',
+            fecha_envio_id=self.fecha_envio.id,
+            articulo_ids=[
+                (0, 0, {'articulo_id': celular.id, 'cantidad': 2}),
+                (0, 0, {'articulo_id': laptop.id}),
+                (0, 0, {'articulo_id': otro.id}),
+            ],
+        ))
+        
+        self.assertEqual(
+            envio.articulo_ids.mapped('costo_unitario'),
+            [700.0, 800.0, 250.0],
+        )
+        self.assertEqual(envio.impuesto_aduanal, 2 * 700.0 + 800.0 + 250.0)
+        
+        envio.provincia_id = self.provincia_santiago
+        self.assertEqual(
+            envio.articulo_ids.mapped('costo_unitario'),
+            [900.0, 1100.0, 250.0],
+        )
+    
+    def test_06_misma_zona_en_tarifa_e_impuesto(self):
+        """Test que tarifa e impuesto coinciden aunque cambie la escritura."""
+        provincia = self.Provincia.create({'name': 'la habana'})
+        celular = self.Articulo.create({
+            'name': 'Samsung',
+            'tipo_articulo': 'celular',
+        })
+        envio = self.Envio.create(self._vals_envio(
+            provincia_id=provincia.id,
+            fecha_envio_id=self.fecha_envio.id,
+            articulo_ids=[(0, 0, {'articulo_id': celular.id})],
+        ))
+        
+        self.assertEqual(envio.tarifa_por_lb, 150.0)
+        self.assertEqual(envio.articulo_ids.costo_unitario, 800.0)
+    
+    def test_07_recalcular_precios_sql(self):
+        """Test que el recálculo SQL coincide con los cálculos del ORM."""
+        envios = self.Envio.create([
+            self._vals_envio(
+                tipo_cliente=tipo_cliente,
+                provincia_id=provincia.id,
+                peso_etiqueta=peso,
+                costo_documentos=documentos,
+                fecha_envio_id=self.fecha_envio.id,
+                forma_pago='efectivo',
+            )
+            for tipo_cliente, provincia, peso, documentos in [
+                ('normal', self.provincia_habana, 6.3, 0.0),
+                ('vip', self.provincia_habana, 10.1, 150.0),
+                ('normal', self.provincia_santiago, 20.0, 0.0),
+                ('vip', self.provincia_santiago, 33.33, 75.5),
+            ]
+        ])
+        
+        # Nuevas tarifas vigentes antes de la fecha de envío
+        for tipo_cliente, zona_tarifa, tarifa in [
+            ('normal', 'habana', 155.5),
+            ('vip', 'habana', 145.25),
+            ('normal', 'resto', 185.0),
+            ('vip', 'resto', 172.75),
+        ]:
+            self.Tarifa.create({
+                'tipo_cliente': tipo_cliente,
+                'zona_tarifa': zona_tarifa,
+                'fecha_desde': '2026-03-01',
+                'tarifa_por_lb': tarifa,
+            })
+        
+        actualizados = self.fecha_envio._recalcular_precios_sql()
+        self.assertEqual(actualizados, 4)
+        
+        # Referencia: los mismos envíos calculados por el ORM
+        campos = ['tarifa_por_lb', 'embalaje', 'subtotal_envio', 'total_cobrar']
+        for envio in envios:
+            referencia = self.Envio.create(self._vals_envio(
+                tipo_cliente=envio.tipo_cliente,
+                provincia_id=envio.provincia_id.id,
+                peso_etiqueta=envio.peso_etiqueta,
+                costo_documentos=envio.costo_documentos,
+                fecha_envio_id=self.FechaEnvio.create({'fecha': '2026-03-10'}).id,
+            ))
+            for campo in campos:
+                self.assertAlmostEqual(envio[campo], referencia[campo], places=2)
+        
+        self.assertAlmostEqual(
+            self.fecha_envio.total_cobrado,
+            sum(envios.mapped('total_cobrar')),
+            places=2,
+        )
+        self.assertAlmostEqual(
+            self.fecha_envio.total_cobrado_efectivo,
+            self.fecha_envio.total_cobrado,
+            places=2,
+        )
+    
+    def test_08_cambio_de_fecha_recalcula_tarifa(self):
+        """Test que mover la fecha de envío reprecia en SQL y cuadra los totales."""
+        envios = self.Envio.create([
+            self._vals_envio(fecha_envio_id=self.fecha_envio.id, forma_pago=pago)
+            for pago in ('efectivo', 'transferencia')
+        ])
+        self.Tarifa.create({
+            'tipo_cliente': 'normal',
+            'zona_tarifa': 'habana',
+            'fecha_desde': '2026-04-01',
+            'tarifa_por_lb': 160.0,
+        })
+        self.assertEqual(envios.mapped('tarifa_por_lb'), [150.0, 150.0])
+        
+        self.fecha_envio.fecha = '2026-04-15'
+        self.assertEqual(envios.mapped('tarifa_por_lb'), [160.0, 160.0])
+        self.assertAlmostEqual(
+            self.fecha_envio.total_cobrado,
+            sum(envios.mapped('total_cobrar')),
+            places=2,
+        )
+        self.assertAlmostEqual(
+            self.fecha_envio.total_cobrado_efectivo,
+            envios[0].total_cobrar,
+            places=2,
+        )
+        self.assertEqual(self.fecha_envio.total_envios, 2)
+    
+    def test_09_impuesto_cobrado_no_cambia(self):
+        """Test que el catálogo y la fecha no reprecian impuestos ya cobrados."""
+        celular = self.Articulo.create({
+            'name': 'Motorola',
+            'tipo_articulo': 'celular',
+        })
+        otro = self.Articulo.create({
+            'name': 'Licuadora',
+            'tipo_articulo': 'otro',
+            'costo_aduanal': 100.0,
+        })
+        envio = self.Envio.create(self._vals_envio(
+            fecha_envio_id=self.fecha_envio.id,
+            articulo_ids=[
+                (0, 0, {'articulo_id': celular.id}),
+                (0, 0, {'articulo_id': otro.id}),
+            ],
+        ))
+        self.env['paqueteria.regla.aduanal'].create({
+            'tipo_articulo': 'celular',
+            'tipo_cliente': 'normal',
+            'zona_tarifa': 'habana',
+            'fecha_desde': '2026-04-01',
+            'costo_unitario': 850.0,
+        })
+        
+        self.fecha_envio.fecha = '2026-04-15'
+        otro.costo_aduanal = 120.0
+        self.assertEqual(
+            envio.articulo_ids.mapped('costo_unitario'), [800.0, 100.0]
+        )
+        self.assertEqual(envio.impuesto_aduanal, 900.0)
+        self.assertAlmostEqual(
+            self.fecha_envio.total_cobrado, envio.total_cobrar, places=2
+        )
+        
+        # Una línea nueva toma el costo vigente del catálogo
+        envio.articulo_ids = [(0, 0, {'articulo_id': otro.id})]
+        self.assertEqual(envio.articulo_ids[-1].costo_unitario, 120.0)
+        self.assertAlmostEqual(
+            self.fecha_envio.total_cobrado, envio.total_cobrar, places=2
+        )
+    
+    def test_10_zona_se_conserva_al_renombrar(self):
+        """Test que la zona elegida a mano no cambia al renombrar la provincia."""
+        provincia = self.Provincia.create({'name': 'Artemisa'})
+        self.assertEqual(provincia.zona_tarifa, 'resto')
+        
+        provincia.zona_tarifa = 'habana'
+        provincia.name = 'Artemisa (Occidente)'
+        self.assertEqual(provincia.zona_tarifa, 'habana')
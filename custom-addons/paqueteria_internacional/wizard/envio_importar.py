@@ -0,0 +1,259 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Asistente de importación masiva de envíos desde CSV/XLSX."""
+
+import base64
+import csv
+import io
+import logging
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+from ..models.constants import ESTADOS_MEXICO, TIPOS_CLIENTE
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+    _logger.debug('openpyxl no disponible: importación XLSX deshabilitada')
+
+
+class PaqueteriaEnvioImportar(models.TransientModel):
+    """Importación de envíos desde hojas de cálculo regionales.
+
+    Lee un archivo CSV o XLSX con una fila por envío, aplica los valores
+    comunes elegidos en el asistente y delega la creación en
+    ``paqueteria.envio.importar_lote``. Las filas con error se reportan
+    sin detener la importación del resto.
+    """
+
+    _name = 'paqueteria.envio.importar'
+    _description = 'Importar Envíos'
+
+    archivo = fields.Binary(
+        string='Archivo',
+        required=True,
+        help='Archivo CSV o XLSX con una fila por envío y encabezados '
+             'con los nombres de columna esperados'
+    )
+
+    nombre_archivo = fields.Char(
+        string='Nombre del Archivo',
+        help='Nombre del archivo cargado (determina el formato)'
+    )
+
+    fecha_envio_id = fields.Many2one(
+        'paqueteria.fecha.envio',
+        string='Fecha de Envío',
+        help='Fecha de envío asignada a todos los envíos importados'
+    )
+
+    tipo_cliente = fields.Selection(
+        selection=TIPOS_CLIENTE,
+        string='Tipo de Cliente',
+        default='normal',
+        help='Tipo de cliente si la fila no indica uno'
+    )
+
+    estado_mexico = fields.Selection(
+        selection=ESTADOS_MEXICO,
+        string='Estado de México',
+        help='Estado de México si la fila no indica uno'
+    )
+
+    tamano_lote = fields.Integer(
+        string='Tamaño de Lote',
+        default=500,
+        help='Cantidad de envíos creados en cada llamada a la base de datos'
+    )
+
+    # ========== RESULTADO ==========
+
+    state = fields.Selection(
+        selection=[
+            ('borrador', 'Borrador'),
+            ('hecho', 'Importado'),
+        ],
+        string='Estado',
+        default='borrador',
+        help='Indica si la importación ya fue ejecutada'
+    )
+
+    total_filas = fields.Integer(
+        string='Filas Leídas',
+        readonly=True,
+        help='Cantidad de filas de datos encontradas en el archivo'
+    )
+
+    total_creados = fields.Integer(
+        string='Envíos Creados',
+        readonly=True,
+        help='Cantidad de envíos creados correctamente'
+    )
+
+    total_errores = fields.Integer(
+        string='Filas con Error',
+        readonly=True,
+        help='Cantidad de filas que no se pudieron importar'
+    )
+
+    filas_por_segundo = fields.Float(
+        string='Filas por Segundo',
+        readonly=True,
+        digits=(10, 1),
+        help='Rendimiento de la importación'
+    )
+
+    detalle_errores = fields.Text(
+        string='Errores',
+        readonly=True,
+        help='Detalle de las filas rechazadas y el motivo'
+    )
+
+    envio_ids = fields.Many2many(
+        'paqueteria.envio',
+        string='Envíos Importados',
+        readonly=True,
+        help='Envíos creados por esta importación'
+    )
+
+    # ========== ACTION METHODS ==========
+
+    def action_importar(self):
+        """Lee el archivo e importa los envíos en bloque.
+
+        Returns:
+            dict: Acción que reabre el asistente mostrando el resultado
+        """
+        self.ensure_one()
+        if self.tamano_lote <= 0:
+            raise UserError(_('El tamaño de lote debe ser mayor a cero.'))
+
+        filas = self._leer_filas()
+        valores_comunes = {}
+        if self.fecha_envio_id:
+            valores_comunes['fecha_envio_id'] = self.fecha_envio_id.id
+        if self.tipo_cliente:
+            valores_comunes['tipo_cliente'] = self.tipo_cliente
+        if self.estado_mexico:
+            valores_comunes['estado_mexico'] = self.estado_mexico
+
+        resultado = self.env['paqueteria.envio'].importar_lote(
+            filas,
+            valores_comunes=valores_comunes,
+            tamano_lote=self.tamano_lote,
+        )
+
+        self.write({
+            'state': 'hecho',
+            'total_filas': resultado['total_filas'],
+            'total_creados': len(resultado['envios']),
+            'total_errores': len(resultado['errores']),
+            'filas_por_segundo': resultado['filas_por_segundo'],
+            'detalle_errores': '\n'.join(
+                _('Fila %(fila)s: %(mensaje)s', fila=fila, mensaje=mensaje)
+                for fila, mensaje in resultado['errores']
+            ),
+            'envio_ids': [fields.Command.set(resultado['envios'].ids)],
+        })
+
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def action_ver_envios(self):
+        """Abre la lista de envíos creados por la importación.
+
+        Returns:
+            dict: Acción de ventana filtrada por los envíos importados
+        """
+        self.ensure_one()
+        return {
+            'name': _('Envíos Importados'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'paqueteria.envio',
+            'view_mode': 'list,form',
+            'domain': [('id', 'in', self.envio_ids.ids)],
+        }
+
+    # ========== LECTURA DE ARCHIVOS ==========
+
+    def _leer_filas(self):
+        """Convierte el archivo cargado en una lista de diccionarios.
+
+        Las filas se numeran antes de descartar las vacías, para que los
+        errores se reporten con el número de fila de la hoja de cálculo.
+
+        Returns:
+            list: Tuplas (número de fila, diccionario con claves
+                normalizadas), una por fila de datos no vacía
+
+        Raises:
+            UserError: Si el formato no es soportado o el archivo está vacío
+        """
+        contenido = base64.b64decode(self.archivo or b'')
+        nombre = (self.nombre_archivo or '').lower()
+
+        if nombre.endswith('.xlsx'):
+            encabezados, filas = self._leer_xlsx(contenido)
+        elif nombre.endswith('.csv') or not nombre:
+            encabezados, filas = self._leer_csv(contenido)
+        else:
+            raise UserError(_('Formato no soportado. Use un archivo CSV o XLSX.'))
+
+        if not encabezados:
+            raise UserError(_('El archivo está vacío.'))
+
+        columnas = [_normalizar_encabezado(encabezado) for encabezado in encabezados]
+        # La fila 1 del archivo es el encabezado
+        return [
+            (numero_fila, dict(zip(columnas, fila)))
+            for numero_fila, fila in enumerate(filas, start=2)
+            if any(valor not in (None, '') for valor in fila)
+        ]
+
+    @api.model
+    def _leer_csv(self, contenido):
+        """Lee un CSV detectando codificación y separador."""
+        try:
+            texto = contenido.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            texto = contenido.decode('latin-1')
+
+        try:
+            dialecto = csv.Sniffer().sniff(texto[:4096], delimiters=',;\t')
+        except csv.Error:
+            dialecto = csv.excel
+
+        lector = csv.reader(io.StringIO(texto), dialecto)
+        encabezados = next(lector, [])
+        return encabezados, list(lector)
+
+    @api.model
+    def _leer_xlsx(self, contenido):
+        """Lee la primera hoja de un libro XLSX."""
+        if openpyxl is None:
+            raise UserError(
+                _('La librería openpyxl no está instalada en el servidor.')
+            )
+        libro = openpyxl.load_workbook(
+            io.BytesIO(contenido), read_only=True, data_only=True
+        )
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        encabezados = [
+            str(valor) if valor is not None else ''
+            for valor in next(filas, ())
+        ]
+        return encabezados, [list(fila) for fila in filas]
+
+
+def _normalizar_encabezado(encabezado):
+    """Convierte 'Remitente Nombre ' en 'remitente_nombre'."""
+    return '_'.join((encabezado or '').strip().lower().split())
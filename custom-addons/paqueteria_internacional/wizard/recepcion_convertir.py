@@ -0,0 +1,122 @@
+# Copyright 2024 Javier Alejandro Pérez <myphoneunlockers@gmail.com>
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+"""Asistente de conversión masiva de recepciones en envíos."""
+
+import logging
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+from ..models.constants import FORMAS_PAGO, TIPOS_CLIENTE
+
+_logger = logging.getLogger(__name__)
+
+
+class PaqueteriaRecepcionConvertir(models.TransientModel):
+    """Convierte recepciones seleccionadas en envíos de una fecha.
+
+    Copia los datos de cada recepción, aplica la fecha de envío y el
+    tipo de cliente elegidos y crea todos los envíos en una sola
+    llamada. Las recepciones ya convertidas se omiten: cada envío
+    guarda su recepción de origen y la base de datos impide repetirla.
+    """
+
+    _name = 'paqueteria.recepcion.convertir'
+    _description = 'Convertir Recepciones en Envíos'
+
+    recepcion_ids = fields.Many2many(
+        'paqueteria.recepcion',
+        string='Recepciones',
+        required=True,
+        default=lambda self: self._default_recepcion_ids(),
+        help='Recepciones a convertir en envíos'
+    )
+
+    fecha_envio_id = fields.Many2one(
+        'paqueteria.fecha.envio',
+        string='Fecha de Envío',
+        required=True,
+        help='Fecha de envío asignada a todos los envíos creados'
+    )
+
+    tipo_cliente = fields.Selection(
+        selection=TIPOS_CLIENTE,
+        string='Tipo de Cliente',
+        required=True,
+        default='normal',
+        help='Tipo de cliente de todos los envíos creados'
+    )
+
+    forma_pago = fields.Selection(
+        selection=FORMAS_PAGO,
+        string='Forma de Pago',
+        help='Forma de pago de todos los envíos creados (opcional)'
+    )
+
+    convertidas_count = fields.Integer(
+        string='Ya Convertidas',
+        compute='_compute_convertidas_count',
+        help='Recepciones seleccionadas que ya tienen envío y se omitirán'
+    )
+
+    @api.model
+    def _default_recepcion_ids(self):
+        """Toma las recepciones seleccionadas en la lista."""
+        if self.env.context.get('active_model') != 'paqueteria.recepcion':
+            return []
+        return [fields.Command.set(self.env.context.get('active_ids', []))]
+
+    @api.depends('recepcion_ids')
+    def _compute_convertidas_count(self):
+        """Cuenta las recepciones seleccionadas que ya tienen envío."""
+        for record in self:
+            record.convertidas_count = len(record._recepciones_convertidas())
+
+    def _recepciones_convertidas(self):
+        """Recepciones seleccionadas que ya tienen envío."""
+        self.ensure_one()
+        return self.recepcion_ids._origin.filtered('enviada')
+
+    # ========== ACTION METHODS ==========
+
+    def action_convertir(self):
+        """Crea los envíos de las recepciones pendientes en un solo lote.
+
+        Returns:
+            dict: Acción de ventana con los envíos creados
+
+        Raises:
+            UserError: Si todas las recepciones ya fueron convertidas
+        """
+        self.ensure_one()
+        pendientes = self.recepcion_ids - self._recepciones_convertidas()
+        if not pendientes:
+            raise UserError(
+                _('Todas las recepciones seleccionadas ya fueron convertidas.')
+            )
+
+        Envio = self.env['paqueteria.envio']
+        comunes = {
+            'fecha_envio_id': self.fecha_envio_id.id,
+            'tipo_cliente': self.tipo_cliente,
+        }
+        if self.forma_pago:
+            comunes['forma_pago'] = self.forma_pago
+
+        envios = Envio.create([
+            dict(Envio._valores_desde_recepcion(recepcion), **comunes)
+            for recepcion in pendientes
+        ])
+        _logger.info(
+            'Convertidas %s recepciones en envíos de %s (%s omitidas)',
+            len(envios), self.fecha_envio_id.name,
+            len(self.recepcion_ids) - len(pendientes),
+        )
+
+        return {
+            'name': _('Envíos Creados'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'paqueteria.envio',
+            'view_mode': 'list,form',
+            'domain': [('id', 'in', envios.ids)],
+        }